@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Any
+
+import toml
+from sqlalchemy import text
+
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.models.last_extracted_user_status import LastExtractedUserStatus
+from src.models.search_results import SearchResults
+from src.models.user import User
+from src.service.dao.extracted_search_dao import ExtractedSearchResultDAO
+from src.service.dao.last_extracted_user_status_dao import LastExtractedUserStatusDAO
+from src.service.dao.raw_search_dao import RawSearchResultDAO
+from src.service.dao.user_dao import UserDAO
+from src.utils.engine_registry import dispose_all_engines, get_async_engine
+
+"""
+Microbenchmark: per call latency of the hot DAO methods, SQLAlchemy vs asyncpg fast path
+
+Needs a database: it INSERTS a benchmark user and its rows, and deletes them at the
+end, so point it at a scratch database
+
+Usage:
+    PYTHONPATH=. python benchmarks/benchmark_dao.py --db-config local_config/config.toml
+"""
+
+
+async def _latencies(
+    call: Callable[[], Awaitable[Any]], calls: int, warmup: int = 10
+) -> list[float]:
+    # warmup checks connections out, and prepares statements, before timing
+    for _ in range(warmup):
+        await call()
+    latencies: list[float] = []
+    for _ in range(calls):
+        start: float = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def _cleanup(db_config: dict[str, Any], user_id: str) -> None:
+    async with get_async_engine(db_config).begin() as connection:
+        for table in (
+            "extracted_search_results",
+            "last_extracted_user_status",
+            "user_watermarks",
+            "search_results",
+            "users",
+        ):
+            await connection.execute(
+                text(f"DELETE FROM {table} WHERE user_id = :user_id"),
+                {"user_id": user_id},
+            )
+
+
+def _dao_benchmarks(
+    dao_config: dict[str, Any], user_id: str, since: datetime, batch_size: int
+) -> dict[str, Callable[[], Awaitable[Any]]]:
+    """
+    1 call of each hot DAO method, by name, on DAOs built from dao_config
+    """
+    raw_dao: RawSearchResultDAO = RawSearchResultDAO(dao_config)
+    status_dao: LastExtractedUserStatusDAO = LastExtractedUserStatusDAO(dao_config)
+    extracted_dao: ExtractedSearchResultDAO = ExtractedSearchResultDAO(dao_config)
+    return {
+        "fetch_searches_for_user": lambda: raw_dao.fetch_searches_for_user(
+            user_id, since
+        ),
+        "fetch_latest_status": lambda: status_dao.fetch_latest_status(user_id),
+        "bulk_insert_status": lambda: status_dao.bulk_insert_status(
+            [
+                LastExtractedUserStatus.create_user_status(user_id)
+                for _ in range(batch_size)
+            ]
+        ),
+        "bulk_insert": lambda: extracted_dao.bulk_insert(
+            [
+                ExtractedSearchResult.create_search_result(
+                    user_id, "www.tesla.com › investors", None, "body"
+                )
+                for _ in range(batch_size)
+            ]
+        ),
+    }
+
+
+async def run(db_config: dict[str, Any], calls: int, batch_size: int) -> None:
+    user: User = User.create_user()
+    await UserDAO(db_config).insert_user(user)
+    raw_search_dao: RawSearchResultDAO = RawSearchResultDAO(db_config)
+    for i in range(10):
+        await raw_search_dao.insert_search(
+            SearchResults.create(user.user_id, f"search term {i}", "<html></html>")
+        )
+    since: datetime = datetime(2000, 1, 1)
+
+    try:
+        for fast_path in (False, True):
+            dao_config: dict[str, Any] = {**db_config, "fast_path": fast_path}
+            benchmarks: dict[str, Callable[[], Awaitable[Any]]] = _dao_benchmarks(
+                dao_config, user.user_id, since, batch_size
+            )
+            for name, call in benchmarks.items():
+                latencies: list[float] = await _latencies(call, calls)
+                percentiles: list[float] = statistics.quantiles(latencies, n=100)
+                print(
+                    f"{name}[{'fast_path' if fast_path else 'sqlalchemy'}]: "
+                    f"p50 {percentiles[49] * 1000:.3f}ms, "
+                    f"p99 {percentiles[98] * 1000:.3f}ms"
+                )
+    finally:
+        await _cleanup(db_config, user.user_id)
+        await dispose_all_engines()
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--db-config", default="local_config/config.toml")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=10)
+    args: argparse.Namespace = parser.parse_args()
+
+    db_config: dict[str, Any] = toml.load(args.db_config)["database"]
+    event_loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+    event_loop.run_until_complete(run(db_config, args.calls, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.models.last_extracted_user_status import LastExtractedUserStatus
+from src.models.search_results import SearchResults
+from src.models.user import User
+from src.utils.model_hydration import RowHydrator
+
+"""
+Microbenchmark: rows/sec hydrated into the DAO models, per hydration mode
+- parse_obj: what the DAOs did before RowHydrator
+- validated: RowHydrator(validate_rows=True)
+- trusted: RowHydrator, the DAOs' default
+
+Usage:
+    PYTHONPATH=. python benchmarks/benchmark_model_hydration.py --rows 100000
+"""
+
+CREATED_AT: datetime = datetime(2024, 5, 21, 13, 30)
+SAMPLE_ROWS: dict[type[BaseModel], tuple[Any, ...]] = {
+    SearchResults: (
+        "search_id",
+        "user_id",
+        "tesla earning reports",
+        "<html>" + "x" * 50_000 + "</html>",
+        CREATED_AT,
+    ),
+    ExtractedSearchResult: (
+        "id",
+        "user_id",
+        "www.tesla.com › investors",
+        "3 days ago",
+        "Tesla body",
+        CREATED_AT,
+    ),
+    LastExtractedUserStatus: ("id", "user_id", CREATED_AT, "search_id"),
+    User: ("user_id", CREATED_AT),
+}
+
+
+def _parse_obj(model_class: type[BaseModel]) -> Callable[[dict[str, Any]], Any]:
+    return lambda row: model_class.parse_obj(dict(row))
+
+
+def _best_rows_per_sec(
+    hydrate: Callable[[dict[str, Any]], Any], rows: list[dict[str, Any]], repeat: int
+) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        for row in rows:
+            hydrate(row)
+        timings.append(time.perf_counter() - start)
+    return len(rows) / min(timings)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args: argparse.Namespace = parser.parse_args()
+
+    for model_class, sample_row in SAMPLE_ROWS.items():
+        # keyed by column name, like the asyncpg Records of the fast path
+        row: dict[str, Any] = dict(zip(model_class.model_fields, sample_row))
+        rows: list[dict[str, Any]] = [row] * args.rows
+        modes: dict[str, Callable[[dict[str, Any]], Any]] = {
+            "parse_obj": _parse_obj(model_class),
+            "validated": RowHydrator(model_class, validate_rows=True),
+            "trusted": RowHydrator(model_class),
+        }
+        rows_per_sec: dict[str, float] = {
+            mode: _best_rows_per_sec(hydrate, rows, args.repeat)
+            for mode, hydrate in modes.items()
+        }
+        print(
+            f"{model_class.__name__}: "
+            + ", ".join(
+                f"{mode} {value:,.0f} rows/s" for mode, value in rows_per_sec.items()
+            )
+            + f", trusted speedup over parse_obj: "
+            f"{rows_per_sec['trusted'] / rows_per_sec['parse_obj']:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import time
+from collections.abc import Callable
+
+from benchmarks.synthetic_serp import generate_corpus
+from src.models.text_classification_enum import TextClassification
+from src.utils.recursive_bs4_extract_text_utils import _bs4_recursive_extract_text
+from src.utils.text_classifier import DATE_PATTERN, URL_PATTERN, classify_texts
+
+"""
+Microbenchmark: fused single-pass classify_texts vs one scan per pattern
+
+Usage:
+    PYTHONPATH=. python benchmarks/benchmark_text_classifier.py --documents 20
+"""
+
+
+def classify_texts_per_pattern(texts: list[str]) -> list[TextClassification]:
+    """
+    The classification as ExtractedText did it before text_classifier
+    """
+    classifications: list[TextClassification] = []
+    for text in texts:
+        if DATE_PATTERN.search(text) is not None:
+            classifications.append(TextClassification.date)
+        elif URL_PATTERN.search(text) is not None or "› " in text:
+            classifications.append(TextClassification.url)
+        else:
+            classifications.append(TextClassification.body)
+    return classifications
+
+
+def _best_of(
+    classify: Callable[[list[str]], list[TextClassification]],
+    texts: list[str],
+    repeat: int,
+) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        classify(texts)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args: argparse.Namespace = parser.parse_args()
+
+    texts: list[str] = [
+        extracted_text.text
+        for html in generate_corpus(
+            args.documents, seed=args.seed, min_size=50_000, max_size=500_000
+        )
+        for extracted_text in _bs4_recursive_extract_text(html)
+    ]
+    if classify_texts(texts) != classify_texts_per_pattern(texts):
+        raise AssertionError("classifiers disagree")
+
+    per_pattern_seconds: float = _best_of(
+        classify_texts_per_pattern, texts, args.repeat
+    )
+    fused_seconds: float = _best_of(classify_texts, texts, args.repeat)
+    print(f"texts: {len(texts)}")
+    print(f"per pattern: {per_pattern_seconds * 1000:.2f}ms")
+    print(f"fused: {fused_seconds * 1000:.2f}ms")
+    print(f"speedup: {per_pattern_seconds / fused_seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+import toml
+
+from benchmarks.synthetic_serp import generate_corpus
+from src.etl_pipeline import ETLPipeline
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.models.parser_backend_enum import ParserBackend
+from src.models.search_results import SearchResults
+from src.service.dao.extracted_search_dao import ExtractedSearchResultDAO
+from src.service.dao.last_extracted_user_status_dao import LastExtractedUserStatusDAO
+from src.service.dao.raw_search_dao import RawSearchResultDAO
+from src.service.dao.user_dao import UserDAO
+from src.service.extractors.bs4_extractor import BS4SearchResultExtractor
+from src.service.extractors.layout_plan_extractor import (
+    LayoutPlanSearchResultExtractor,
+)
+from src.service.extractors.streaming_extractor import StreamingSearchResultExtractor
+from src.utils.engine_registry import dispose_all_engines
+
+"""
+Benchmarks BS4SearchResultExtractor.extract and each stage of ETLPipeline
+
+Usage:
+    PYTHONPATH=. python benchmarks/run_benchmarks.py --documents 50 --output bench.json
+
+Reports, per benchmark: docs/sec, MB/sec, p50/p99 per-document latency, peak RSS
+- Extraction and stage two run on a synthetic corpus (benchmarks/synthetic_serp.py)
+- Stage one and three need a database; pass --db-config to run them. Stage three
+INSERTS rows, so point it at a scratch database
+"""
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KB on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _report(
+    name: str,
+    document_count: int,
+    total_bytes: int,
+    seconds: float,
+    latencies: list[float],
+) -> dict[str, Any]:
+    # quantiles needs 2 points; with 1 document p50 = p99 = its latency
+    percentiles: list[float] = (
+        statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    )
+    return {
+        "name": name,
+        "documents": document_count,
+        "megabytes": total_bytes / 1_000_000,
+        "seconds": seconds,
+        "docs_per_sec": document_count / seconds if seconds else None,
+        "mb_per_sec": total_bytes / 1_000_000 / seconds if seconds else None,
+        "p50_latency_ms": percentiles[49] * 1000 if percentiles else None,
+        "p99_latency_ms": percentiles[98] * 1000 if percentiles else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def benchmark_extract(
+    name: str,
+    extract: Callable[[str, str], list[ExtractedSearchResult]],
+    corpus: list[str],
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    start: float = time.perf_counter()
+    for html in corpus:
+        document_start: float = time.perf_counter()
+        extract(html, "benchmark_user")
+        latencies.append(time.perf_counter() - document_start)
+    seconds: float = time.perf_counter() - start
+    total_bytes: int = sum(len(html.encode()) for html in corpus)
+    return _report(name, len(corpus), total_bytes, seconds, latencies)
+
+
+async def benchmark_stage_two(
+    etl_pipeline: ETLPipeline, corpus: list[str]
+) -> dict[str, Any]:
+    raw_searches: list[SearchResults] = [
+        SearchResults.create("benchmark_user", "tesla earning reports", html)
+        for html in corpus
+    ]
+    start: float = time.perf_counter()
+    await etl_pipeline.stage_two(raw_searches)
+    seconds: float = time.perf_counter() - start
+    total_bytes: int = sum(len(html.encode()) for html in corpus)
+    # Stage two runs as a whole, so per-document latency is the mean
+    return _report(
+        "etl_pipeline.stage_two",
+        len(corpus),
+        total_bytes,
+        seconds,
+        [seconds / len(corpus)] * len(corpus),
+    )
+
+
+async def benchmark_database_stages(
+    etl_pipeline: ETLPipeline,
+) -> list[dict[str, Any]]:
+    start: float = time.perf_counter()
+    raw_results: list[SearchResults] = await etl_pipeline.stage_one()
+    stage_one_seconds: float = time.perf_counter() - start
+    total_bytes: int = sum(
+        len(raw_result.result.encode())
+        for raw_result in raw_results
+        if raw_result.result is not None
+    )
+    stage_one_report: dict[str, Any] = _report(
+        "etl_pipeline.stage_one",
+        len(raw_results),
+        total_bytes,
+        stage_one_seconds,
+        [stage_one_seconds / max(len(raw_results), 1)] * len(raw_results),
+    )
+
+    transformed_results: list[ExtractedSearchResult] = await etl_pipeline.stage_two(
+        raw_results
+    )
+    start = time.perf_counter()
+    await etl_pipeline.stage_three(transformed_results, raw_results)
+    stage_three_seconds: float = time.perf_counter() - start
+    stage_three_report: dict[str, Any] = _report(
+        "etl_pipeline.stage_three",
+        len(raw_results),
+        total_bytes,
+        stage_three_seconds,
+        [stage_three_seconds / max(len(raw_results), 1)] * len(raw_results),
+    )
+    stage_three_report["rows_inserted"] = len(transformed_results)
+    await dispose_all_engines()
+    return [stage_one_report, stage_three_report]
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-size", type=int, default=50_000)
+    parser.add_argument("--max-size", type=int, default=2_000_000)
+    parser.add_argument("--result-count", type=int, default=10)
+    parser.add_argument("--nesting-depth", type=int, default=8)
+    parser.add_argument("--ad-blocks", type=int, default=2)
+    parser.add_argument("--db-config", default=None)
+    parser.add_argument("--output", default="bench_output.json")
+    args: argparse.Namespace = parser.parse_args()
+
+    corpus: list[str] = generate_corpus(
+        args.documents,
+        seed=args.seed,
+        min_size=args.min_size,
+        max_size=args.max_size,
+        result_count=args.result_count,
+        nesting_depth=args.nesting_depth,
+        ad_blocks=args.ad_blocks,
+    )
+
+    reports: list[dict[str, Any]] = [
+        benchmark_extract(
+            f"extract[{parser_backend.value}{'-pruned' if prune else ''}]",
+            BS4SearchResultExtractor(parser_backend, prune).extract,
+            corpus,
+        )
+        for parser_backend in ParserBackend
+        for prune in (False, True)
+    ]
+    reports.append(
+        benchmark_extract(
+            "extract[streaming]", StreamingSearchResultExtractor().extract, corpus
+        )
+    )
+    reports.append(
+        benchmark_extract(
+            "extract[layout-plan]", LayoutPlanSearchResultExtractor().extract, corpus
+        )
+    )
+
+    db_config: dict[str, Any] = (
+        toml.load(args.db_config)["database"]
+        if args.db_config
+        else toml.load("local_config/config.toml")["database"]
+    )
+    etl_pipeline: ETLPipeline = ETLPipeline(
+        RawSearchResultDAO(db_config),
+        LastExtractedUserStatusDAO(db_config),
+        UserDAO(db_config),
+        BS4SearchResultExtractor(),
+        ExtractedSearchResultDAO(db_config),
+    )
+    event_loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+    reports.append(
+        event_loop.run_until_complete(benchmark_stage_two(etl_pipeline, corpus))
+    )
+    if args.db_config:
+        reports.extend(
+            event_loop.run_until_complete(benchmark_database_stages(etl_pipeline))
+        )
+
+    output: dict[str, Any] = {
+        "created_at": datetime.utcnow().isoformat(),
+        "corpus": {
+            "documents": args.documents,
+            "seed": args.seed,
+            "min_size": args.min_size,
+            "max_size": args.max_size,
+            "result_count": args.result_count,
+            "nesting_depth": args.nesting_depth,
+            "ad_blocks": args.ad_blocks,
+        },
+        "results": reports,
+    }
+    with open(args.output, "w") as file:
+        json.dump(output, file, indent=2)
+    for report in reports:
+        print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
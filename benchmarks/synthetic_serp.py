@@ -0,0 +1,148 @@
+import random
+
+"""
+Generates deterministic, Yahoo-like search result pages (SERPs) for benchmarks
+
+Each page mirrors the structure the extractor relies on:
+- <head> with inline <script> / <style> blobs
+- Search results in an <ol>, nested nesting_depth <div>s deep, one <li> per result
+with a title link, a "domain › path" url, a date and a body
+- Ad blocks in their own <ol>, and a footer <ul>
+- Filler sections (navigation, scripts, related searches) until target_size bytes
+"""
+
+WORDS: list[str] = (
+    "tesla earnings revenue quarter report stock shares investors market growth "
+    "profit margin guidance delivery vehicle energy battery analyst estimate "
+    "outlook production factory model price demand china europe musk"
+).split()
+DOMAINS: list[str] = [
+    "ir.tesla.com",
+    "www.reuters.com",
+    "www.cnbc.com",
+    "finance.yahoo.com",
+    "www.bloomberg.com",
+    "electrek.co",
+]
+MONTHS: list[str] = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+]
+
+
+def _sentence(rng: random.Random, word_count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(word_count)).capitalize()
+
+
+def _search_result(rng: random.Random, index: int) -> str:
+    domain: str = rng.choice(DOMAINS)
+    date: str = f"{rng.choice(MONTHS)} {rng.randint(1, 28)}, {rng.randint(2019, 2024)}"
+    return (
+        f'<li class="result result-{index}">'
+        f'<div class="compTitle"><h3><a href="https://{domain}/{index}">'
+        f"{_sentence(rng, 6)}</a></h3>"
+        f"<span>{domain} › {rng.choice(WORDS)}</span></div>"
+        f'<div class="compText"><p><span class="fc-2nd">{date} · </span>'
+        f"{_sentence(rng, 30)}</p></div>"
+        "</li>"
+    )
+
+
+def _ad_block(rng: random.Random) -> str:
+    ads: str = "".join(
+        f'<li class="ad"><a href="https://ads.example.com/{i}">{_sentence(rng, 5)}</a>'
+        f"<p>{_sentence(rng, 12)}</p></li>"
+        for i in range(rng.randint(1, 3))
+    )
+    return f'<ol class="searchCenterTopAds">{ads}</ol>'
+
+
+def _filler_section(rng: random.Random) -> str:
+    kind: int = rng.randrange(3)
+    if kind == 0:
+        return f'<script>var data = {{"q": "{_sentence(rng, 40)}"}};</script>'
+    if kind == 1:
+        links: str = "".join(
+            f'<a href="/nav/{i}">{rng.choice(WORDS)}</a>' for i in range(10)
+        )
+        return f'<div class="nav"><nav>{links}</nav></div>'
+    related: str = "".join(
+        f"<td><a>{_sentence(rng, 3)}</a></td>" for _ in range(rng.randint(2, 8))
+    )
+    return f'<div class="related"><table><tr>{related}</tr></table></div>'
+
+
+def generate_serp(
+    seed: int,
+    result_count: int = 10,
+    nesting_depth: int = 8,
+    ad_blocks: int = 2,
+    target_size: int = 50_000,
+) -> str:
+    """
+    Returns the same page for the same arguments
+
+    The page is padded with filler sections until it is at least target_size bytes
+    """
+    rng: random.Random = random.Random(seed)
+    results: str = "".join(_search_result(rng, i) for i in range(result_count))
+    ads: str = "".join(_ad_block(rng) for _ in range(ad_blocks))
+    opening_divs: str = "".join(
+        f'<div class="layout-{depth}">' for depth in range(nesting_depth)
+    )
+    closing_divs: str = "</div>" * nesting_depth
+    head: str = (
+        "<!DOCTYPE html><html><head><title>Yahoo Search Results</title>"
+        "<style>.compTitle { color: #1a0dab; }</style></head><body>"
+    )
+    body: str = (
+        f'<div id="header">{_filler_section(rng)}</div>'
+        f"{opening_divs}{ads}"
+        f'<ol class="reg searchCenterMiddle">{results}</ol>'
+        f"{closing_divs}"
+    )
+    footer: str = '<ul class="footer"><li>Privacy</li><li>Terms</li></ul></body></html>'
+
+    filler_sections: list[str] = []
+    size: int = len((head + body + footer).encode())
+    while size < target_size:
+        filler_section: str = _filler_section(rng)
+        filler_sections.append(filler_section)
+        size += len(filler_section.encode())
+    return head + body + "".join(filler_sections) + footer
+
+
+def generate_corpus(
+    document_count: int,
+    seed: int = 0,
+    min_size: int = 50_000,
+    max_size: int = 2_000_000,
+    result_count: int = 10,
+    nesting_depth: int = 8,
+    ad_blocks: int = 2,
+) -> list[str]:
+    """
+    Returns document_count pages, with sizes spread log-uniformly between min_size
+    and max_size bytes, so that small pages are as common as on the real site
+    """
+    rng: random.Random = random.Random(seed)
+    return [
+        generate_serp(
+            seed=rng.randrange(2**32),
+            result_count=result_count,
+            nesting_depth=nesting_depth,
+            ad_blocks=ad_blocks,
+            target_size=int(min_size * (max_size / min_size) ** rng.random()),
+        )
+        for _ in range(document_count)
+    ]
@@ -130,6 +130,92 @@ class TestExtractedSearchResultDAO:
         await ClearTables.clear_extracted_search_results_table()
         await ClearTables.clear_users_table()
 
+    @pytest.mark.asyncio_cooperative
+    async def test_bulk_insert_copy(self) -> None:
+        await ClearTables.clear_users_table()
+        await ClearTables.clear_extracted_search_results_table()
+        users: list[User] = [
+            User(
+                user_id=str(dummy_uuid),
+                created_at=datetime(year=2024, month=5, day=15, hour=14),
+            )
+        ]
+        for user in users:
+            await Insert.insert_user(user)
+
+        extracted_search_results: list[ExtractedSearchResult] = [
+            ExtractedSearchResult(
+                id="dummy id",
+                user_id=str(dummy_uuid),
+                url="dummy url",
+                date="2024-05-30",
+                body="dummy result",
+                created_at=datetime(year=2024, month=5, day=14, hour=13),
+            ),
+            ExtractedSearchResult(
+                id="dummy id 2",
+                user_id=str(dummy_uuid),
+                url=None,
+                date=None,
+                body="dummy result 2",
+                created_at=datetime(year=2024, month=5, day=14, hour=13),
+            ),
+        ]
+
+        await EXTRACTED_SEARCH_DAO.bulk_insert(extracted_search_results)
+
+        results_row: list[ExtractedSearchResult] = (
+            await Fetch.fetch_all_searches_from_extracted_search_results()
+        )
+        assert sorted(results_row, key=lambda result: result.id) == (
+            extracted_search_results
+        )
+        await ClearTables.clear_extracted_search_results_table()
+        await ClearTables.clear_users_table()
+
+    @pytest.mark.asyncio_cooperative
+    async def test_bulk_insert_executemany(self) -> None:
+        await ClearTables.clear_users_table()
+        await ClearTables.clear_extracted_search_results_table()
+        users: list[User] = [
+            User(
+                user_id=str(dummy_uuid),
+                created_at=datetime(year=2024, month=5, day=15, hour=14),
+            )
+        ]
+        for user in users:
+            await Insert.insert_user(user)
+
+        extracted_search_results: list[ExtractedSearchResult] = [
+            ExtractedSearchResult(
+                id="dummy id",
+                user_id=str(dummy_uuid),
+                url="dummy url",
+                date="2024-05-30",
+                body="dummy result",
+                created_at=datetime(year=2024, month=5, day=14, hour=13),
+            ),
+            ExtractedSearchResult(
+                id="dummy id 2",
+                user_id=str(dummy_uuid),
+                url=None,
+                date=None,
+                body="dummy result 2",
+                created_at=datetime(year=2024, month=5, day=14, hour=13),
+            ),
+        ]
+
+        await EXTRACTED_SEARCH_DAO.bulk_insert_executemany(extracted_search_results)
+
+        results_row: list[ExtractedSearchResult] = (
+            await Fetch.fetch_all_searches_from_extracted_search_results()
+        )
+        assert sorted(results_row, key=lambda result: result.id) == (
+            extracted_search_results
+        )
+        await ClearTables.clear_extracted_search_results_table()
+        await ClearTables.clear_users_table()
+
     @pytest.mark.asyncio_cooperative
     async def test_fetch_all_searches(self) -> None:
         await ClearTables.clear_users_table()
@@ -9,6 +9,7 @@ from integration_tests.src.utils.fetch import Fetch
 from integration_tests.src.utils.insert import Insert
 from src.models.last_extracted_user_status import LastExtractedUserStatus
 from src.models.user import User
+from src.models.user_watermark import UserWatermark
 from src.service.dao.last_extracted_user_status_dao import LastExtractedUserStatusDAO
 
 
@@ -91,3 +92,95 @@ class TestLastExtractedUserDAO:
         ]
         for user in users:
             await Insert.insert_user(user)
+
+    @pytest.mark.asyncio_cooperative
+    async def test_bulk_upsert_status_only_moves_forward(self) -> None:
+        await ClearTables.clear_users_table()
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_user_watermarks()
+        await Insert.insert_user(
+            User(
+                user_id=str(dummy_uuid),
+                created_at=datetime(year=2024, month=5, day=14, hour=13),
+            )
+        )
+
+        newest_status: LastExtractedUserStatus = LastExtractedUserStatus(
+            id="dummy id 2",
+            user_id=str(dummy_uuid),
+            last_run=datetime(year=2024, month=5, day=14, hour=15),
+            last_search_id="dummy search id 2",
+        )
+        older_status: LastExtractedUserStatus = LastExtractedUserStatus(
+            id="dummy id",
+            user_id=str(dummy_uuid),
+            last_run=datetime(year=2024, month=5, day=14, hour=15),
+            last_search_id="dummy search id 1",
+        )
+        await LAST_EXTRACTED_USER_STATUS_DAO.bulk_upsert_status([newest_status])
+        # a late batch does not move the watermark back
+        await LAST_EXTRACTED_USER_STATUS_DAO.bulk_upsert_status([older_status])
+
+        watermarks: list[UserWatermark] = (
+            await LAST_EXTRACTED_USER_STATUS_DAO.fetch_all_watermarks()
+        )
+        assert [
+            (watermark.user_id, watermark.last_run, watermark.last_search_id)
+            for watermark in watermarks
+        ] == [(str(dummy_uuid), newest_status.last_run, "dummy search id 2")]
+        watermark: UserWatermark | None = (
+            await LAST_EXTRACTED_USER_STATUS_DAO.fetch_watermark(str(dummy_uuid))
+        )
+        assert watermark == watermarks[0]
+        # both are kept as history
+        history: list[LastExtractedUserStatus] = (
+            await Fetch.fetch_all_status_from_last_extracted_user_status()
+        )
+        assert sorted(status.id for status in history) == ["dummy id", "dummy id 2"]
+        await ClearTables.clear_user_watermarks()
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_users_table()
+
+    @pytest.mark.asyncio_cooperative
+    async def test_delete_status_history_before(self) -> None:
+        await ClearTables.clear_users_table()
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_user_watermarks()
+        await Insert.insert_user(
+            User(
+                user_id=str(dummy_uuid),
+                created_at=datetime(year=2024, month=5, day=1),
+            )
+        )
+        statuses: list[LastExtractedUserStatus] = [
+            LastExtractedUserStatus(
+                id=f"dummy id {day}",
+                user_id=str(dummy_uuid),
+                last_run=datetime(year=2024, month=5, day=day),
+                last_search_id=f"dummy search id {day}",
+            )
+            for day in range(1, 4)
+        ]
+        await LAST_EXTRACTED_USER_STATUS_DAO.bulk_upsert_status(statuses)
+
+        # the newest row is the current watermark, so it is kept, even past the cutoff
+        cutoff: datetime = datetime(year=2024, month=6, day=1)
+        assert (
+            await LAST_EXTRACTED_USER_STATUS_DAO.delete_status_history_before(cutoff, 1)
+            == 1
+        )
+        assert (
+            await LAST_EXTRACTED_USER_STATUS_DAO.delete_status_history_before(cutoff, 1)
+            == 1
+        )
+        assert (
+            await LAST_EXTRACTED_USER_STATUS_DAO.delete_status_history_before(cutoff, 1)
+            == 0
+        )
+        history: list[LastExtractedUserStatus] = (
+            await Fetch.fetch_all_status_from_last_extracted_user_status()
+        )
+        assert history == [statuses[2]]
+        await ClearTables.clear_user_watermarks()
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_users_table()
@@ -7,12 +7,17 @@ from integration_tests.src.utils.clear_tables import ClearTables
 from integration_tests.src.utils.engine import dummy_uuid, dummy_uuid_2
 from integration_tests.src.utils.fetch import Fetch
 from integration_tests.src.utils.insert import Insert
+from src.models.last_extracted_user_status import LastExtractedUserStatus
 from src.models.search_results import SearchResults
 from src.models.user import User
+from src.models.user_watermark import UserWatermark
 from src.service.dao.raw_search_dao import RawSearchResultDAO
 
 
 RAW_SEARCH_DAO: RawSearchResultDAO = RawSearchResultDAO(integration_test_db_config())
+FAST_PATH_RAW_SEARCH_DAO: RawSearchResultDAO = RawSearchResultDAO(
+    {**integration_test_db_config(), "fast_path": True}
+)
 
 
 class TestRawSearchResult:
@@ -142,5 +147,280 @@ class TestRawSearchResult:
             str(dummy_uuid_2), datetime(year=2024, month=5, day=15, hour=16)
         )
         assert results_row == expected_search_results
+        # twice, the second call running the statement prepared by the first
+        for _ in range(2):
+            assert (
+                await FAST_PATH_RAW_SEARCH_DAO.fetch_searches_for_user(
+                    str(dummy_uuid_2), datetime(year=2024, month=5, day=15, hour=16)
+                )
+                == expected_search_results
+            )
+        await ClearTables.clear_search_results_table()
+        await ClearTables.clear_users_table()
+
+    @pytest.mark.asyncio_cooperative
+    async def test_stream_searches_since_last_run(self) -> None:
+        await ClearTables.clear_users_table()
+        await ClearTables.clear_search_results_table()
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_user_watermarks()
+        users: list[User] = [
+            User(
+                user_id=str(dummy_uuid),
+                created_at=datetime(year=2024, month=5, day=15, hour=15),
+            ),
+            User(
+                user_id=str(dummy_uuid_2),
+                created_at=datetime(year=2024, month=5, day=15, hour=15),
+            ),
+        ]
+        for user in users:
+            await Insert.insert_user(user)
+
+        # only dummy_uuid has a watermark; its history is not read
+        await Insert.insert_status(
+            LastExtractedUserStatus(
+                id="dummy status id",
+                user_id=str(dummy_uuid),
+                last_run=datetime(year=2024, month=5, day=15, hour=14),
+            )
+        )
+        await Insert.insert_watermark(
+            UserWatermark(
+                user_id=str(dummy_uuid),
+                last_run=datetime(year=2024, month=5, day=15, hour=16),
+            )
+        )
+
+        search_results: list[SearchResults] = [
+            SearchResults(
+                search_id="dummy id",
+                user_id=str(dummy_uuid),
+                search_term="dummy search term",
+                result="dummy results",
+                created_at=datetime(year=2024, month=5, day=15, hour=15),
+            ),
+            SearchResults(
+                search_id="dummy id 2",
+                user_id=str(dummy_uuid),
+                search_term="dummy search term 2",
+                result="dummy results 2",
+                created_at=datetime(year=2024, month=5, day=15, hour=17),
+            ),
+            SearchResults(
+                search_id="dummy id 3",
+                user_id=str(dummy_uuid_2),
+                search_term="dummy search term",
+                result="dummy results",
+                created_at=datetime(year=2024, month=5, day=15, hour=12),
+            ),
+        ]
+        for search_result in search_results:
+            await Insert.insert_search_search_results(search_result)
+
+        expected_search_results: list[list[SearchResults]] = [
+            [search_results[1]],
+            [search_results[2]],
+        ]
+
+        results_rows: list[list[SearchResults]] = [
+            results_row
+            async for results_row in RAW_SEARCH_DAO.stream_searches_since_last_run()
+        ]
+        assert results_rows == expected_search_results
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_user_watermarks()
+        await ClearTables.clear_search_results_table()
+        await ClearTables.clear_users_table()
+
+    @pytest.mark.asyncio_cooperative
+    async def test_stream_searches_since_exact_watermark(self) -> None:
+        await ClearTables.clear_users_table()
+        await ClearTables.clear_search_results_table()
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_user_watermarks()
+        await Insert.insert_user(
+            User(
+                user_id=str(dummy_uuid),
+                created_at=datetime(year=2024, month=5, day=15, hour=15),
+            )
+        )
+        created_at: datetime = datetime(year=2024, month=5, day=15, hour=16)
+        # the watermark is at "dummy id 2"; searches at the same created_at are
+        # ordered by search_id
+        await Insert.insert_watermark(
+            UserWatermark(
+                user_id=str(dummy_uuid),
+                last_run=created_at,
+                last_search_id="dummy id 2",
+            )
+        )
+        search_results: list[SearchResults] = [
+            SearchResults(
+                search_id=f"dummy id {i}",
+                user_id=str(dummy_uuid),
+                search_term="dummy search term",
+                result="dummy results",
+                created_at=created_at,
+            )
+            for i in range(1, 4)
+        ]
+        for search_result in search_results:
+            await Insert.insert_search_search_results(search_result)
+
+        results_rows: list[list[SearchResults]] = [
+            results_row
+            async for results_row in RAW_SEARCH_DAO.stream_searches_since_last_run()
+        ]
+        assert results_rows == [[search_results[2]]]
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_user_watermarks()
+        await ClearTables.clear_search_results_table()
+        await ClearTables.clear_users_table()
+
+    @pytest.mark.asyncio_cooperative
+    async def test_fetch_oldest_unprocessed_created_at(self) -> None:
+        await ClearTables.clear_users_table()
+        await ClearTables.clear_search_results_table()
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_user_watermarks()
+        assert await RAW_SEARCH_DAO.fetch_oldest_unprocessed_created_at() is None
+
+        await Insert.insert_user(
+            User(
+                user_id=str(dummy_uuid),
+                created_at=datetime(year=2024, month=5, day=15, hour=15),
+            )
+        )
+        search_results: list[SearchResults] = [
+            SearchResults(
+                search_id=f"dummy id {i}",
+                user_id=str(dummy_uuid),
+                search_term="dummy search term",
+                result="dummy results",
+                created_at=datetime(year=2024, month=5, day=15, hour=15 + i),
+            )
+            for i in range(1, 4)
+        ]
+        for search_result in search_results:
+            await Insert.insert_search_search_results(search_result)
+        # dummy id 1 is processed, so the oldest unprocessed search is dummy id 2
+        await Insert.insert_watermark(
+            UserWatermark(
+                user_id=str(dummy_uuid),
+                last_run=search_results[0].created_at,
+                last_search_id="dummy id 1",
+            )
+        )
+
+        assert (
+            await RAW_SEARCH_DAO.fetch_oldest_unprocessed_created_at()
+            == search_results[1].created_at
+        )
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_user_watermarks()
+        await ClearTables.clear_search_results_table()
+        await ClearTables.clear_users_table()
+
+    @pytest.mark.asyncio_cooperative
+    async def test_fetch_searches_by_ids(self) -> None:
+        await ClearTables.clear_users_table()
+        await ClearTables.clear_search_results_table()
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_user_watermarks()
+        await Insert.insert_user(
+            User(
+                user_id=str(dummy_uuid),
+                created_at=datetime(year=2024, month=5, day=15, hour=15),
+            )
+        )
+        search_results: list[SearchResults] = [
+            SearchResults(
+                search_id=f"dummy id {i}",
+                user_id=str(dummy_uuid),
+                search_term="dummy search term",
+                result="dummy results",
+                created_at=datetime(year=2024, month=5, day=15, hour=15 + i),
+            )
+            for i in range(1, 4)
+        ]
+        for search_result in search_results:
+            await Insert.insert_search_search_results(search_result)
+        # dummy id 1 committed after dummy id 2, which already moved the watermark
+        await Insert.insert_watermark(
+            UserWatermark(
+                user_id=str(dummy_uuid),
+                last_run=search_results[1].created_at,
+                last_search_id="dummy id 2",
+            )
+        )
+
+        results_rows: list[SearchResults] = await RAW_SEARCH_DAO.fetch_searches_by_ids(
+            ["dummy id 3", "dummy id 1", "unknown id"]
+        )
+        assert results_rows == [search_results[0], search_results[2]]
+        await ClearTables.clear_last_extracted_user_status()
+        await ClearTables.clear_user_watermarks()
+        await ClearTables.clear_search_results_table()
+        await ClearTables.clear_users_table()
+
+    @pytest.mark.asyncio_cooperative
+    async def test_stream_searches_for_user(self) -> None:
+        await ClearTables.clear_users_table()
+        await ClearTables.clear_search_results_table()
+        users: list[User] = [
+            User(
+                user_id=str(dummy_uuid),
+                created_at=datetime(year=2024, month=5, day=15, hour=15),
+            ),
+            User(
+                user_id=str(dummy_uuid_2),
+                created_at=datetime(year=2024, month=5, day=15, hour=15),
+            ),
+        ]
+        for user in users:
+            await Insert.insert_user(user)
+
+        search_results: list[SearchResults] = [
+            SearchResults(
+                search_id=f"dummy id {i}",
+                user_id=str(dummy_uuid),
+                search_term="dummy search term",
+                result=f"dummy results {i}",
+                created_at=datetime(year=2024, month=5, day=15, hour=16, minute=i),
+            )
+            for i in range(5)
+        ] + [
+            SearchResults(
+                search_id="dummy id other user",
+                user_id=str(dummy_uuid_2),
+                search_term="dummy search term",
+                result="dummy results",
+                created_at=datetime(year=2024, month=5, day=15, hour=16),
+            )
+        ]
+        for search_result in search_results:
+            await Insert.insert_search_search_results(search_result)
+
+        # fetch_size smaller than the number of rows, to fetch over several round trips
+        results_row: list[SearchResults] = [
+            search_result
+            async for search_result in RAW_SEARCH_DAO.stream_searches_for_user(
+                str(dummy_uuid),
+                datetime(year=2024, month=5, day=15, hour=16, minute=1),
+                fetch_size=2,
+            )
+        ]
+        assert sorted(results_row, key=lambda result: result.search_id) == (
+            search_results[1:5]
+        )
+
+        all_results_row: list[SearchResults] = [
+            search_result
+            async for search_result in RAW_SEARCH_DAO.stream_all_searches(fetch_size=2)
+        ]
+        assert sorted(all_results_row, key=lambda result: result.search_id) == (
+            sorted(search_results, key=lambda result: result.search_id)
+        )
         await ClearTables.clear_search_results_table()
         await ClearTables.clear_users_table()
@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from integration_tests.conftest import integration_test_db_config
+from integration_tests.src.utils.clear_tables import ClearTables
+from integration_tests.src.utils.engine import dummy_uuid
+from integration_tests.src.utils.insert import Insert
+from src.models.search_results import SearchResults
+from src.models.user import User
+from src.service.dao.search_notification_listener import SearchNotificationListener
+
+"""
+Needs sql/004_search_results_notify.sql applied to the integration test database
+"""
+
+
+class TestSearchNotificationListener:
+    @pytest.mark.asyncio_cooperative
+    async def test_inserts_are_notified(self) -> None:
+        await ClearTables.clear_users_table()
+        await ClearTables.clear_search_results_table()
+        await Insert.insert_user(
+            User(
+                user_id=str(dummy_uuid),
+                created_at=datetime(year=2024, month=5, day=15, hour=15),
+            )
+        )
+        listener: SearchNotificationListener = SearchNotificationListener(
+            integration_test_db_config()
+        )
+        await listener.connect()
+        try:
+            for i in range(1, 3):
+                await Insert.insert_search_search_results(
+                    SearchResults(
+                        search_id=f"dummy id {i}",
+                        user_id=str(dummy_uuid),
+                        search_term="dummy search term",
+                        result="dummy results",
+                        created_at=datetime(year=2024, month=5, day=15, hour=16),
+                    )
+                )
+
+            search_ids: list[str] = await asyncio.wait_for(
+                listener.next_batch(2, 5, asyncio.Event()), 10
+            )
+        finally:
+            await listener.close()
+        assert search_ids == ["dummy id 1", "dummy id 2"]
+        await ClearTables.clear_search_results_table()
+        await ClearTables.clear_users_table()
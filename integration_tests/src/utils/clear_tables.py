@@ -45,3 +45,13 @@ class ClearTables:
         )
         async with engine.begin() as connection:
             await connection.execute(truncate_clause)
+
+    @staticmethod
+    async def clear_user_watermarks() -> None:
+        """
+        Runs at the start of every integration test
+        - Truncate user_watermarks table
+        """
+        truncate_clause: TextClause = text("TRUNCATE TABLE user_watermarks")
+        async with engine.begin() as connection:
+            await connection.execute(truncate_clause)
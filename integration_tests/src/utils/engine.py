@@ -1,13 +1,11 @@
 # utils/integration_utils.py
 
 from uuid import UUID
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 import toml
 from typing import Any
 
-from src.utils.construct_connection_string import (
-    construct_sqlalchemy_url_from_db_config,
-)
+from src.utils.engine_registry import get_async_engine
 
 dummy_uuid: UUID = UUID("12345678123456781234567812345678")
 
@@ -15,6 +13,4 @@ dummy_uuid_2: UUID = UUID("12345678123456781234567812345679")
 
 db_config: dict[str, Any] = toml.load("integration_tests/config.toml")["database"]
 
-engine: AsyncEngine = create_async_engine(
-    construct_sqlalchemy_url_from_db_config(db_config, use_async_pg=True)
-)
+engine: AsyncEngine = get_async_engine(db_config)
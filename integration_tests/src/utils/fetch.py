@@ -84,7 +84,8 @@ class Fetch:
     ):
         async with engine.begin() as connection:
             text_clause: TextClause = text(
-                "SELECT id, user_id, last_run " "FROM last_extracted_user_status"
+                "SELECT id, user_id, last_run, last_search_id "
+                "FROM last_extracted_user_status"
             )
             cursor: CursorResult = await connection.execute(text_clause)
             results: Sequence[Row] = cursor.fetchall()
@@ -94,6 +95,7 @@ class Fetch:
                         "id": curr_row[0],
                         "user_id": curr_row[1],
                         "last_run": curr_row[2],
+                        "last_search_id": curr_row[3],
                     }
                 )
                 for curr_row in results
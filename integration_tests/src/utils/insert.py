@@ -4,6 +4,7 @@ from src.models.extracted_search_results import ExtractedSearchResult
 from src.models.last_extracted_user_status import LastExtractedUserStatus
 from src.models.search_results import SearchResults
 from src.models.user import User
+from src.models.user_watermark import UserWatermark
 from src.service.dao.user_dao import UserDAO
 
 from sqlalchemy import TextClause, text
@@ -102,11 +103,13 @@ class Insert:
                 "INSERT into last_extracted_user_status("
                 "   id, "
                 "   user_id, "
-                "   last_run "
+                "   last_run, "
+                "   last_search_id "
                 ") values ("
                 "   :id, "
                 "   :user_id, "
-                "   :last_run "
+                "   :last_run, "
+                "   :last_search_id "
                 ")"
             )
             # use named-params here to prevent SQL-injection attacks
@@ -116,5 +119,30 @@ class Insert:
                     "id": status.id,
                     "user_id": status.user_id,
                     "last_run": status.last_run,
+                    "last_search_id": status.last_search_id,
+                },
+            )
+
+    @staticmethod
+    async def insert_watermark(watermark: UserWatermark) -> None:
+        async with engine.begin() as connection:
+            insert_clause: TextClause = text(
+                "INSERT into user_watermarks("
+                "   user_id, "
+                "   last_run, "
+                "   last_search_id "
+                ") values ("
+                "   :user_id, "
+                "   :last_run, "
+                "   :last_search_id "
+                ")"
+            )
+            # use named-params here to prevent SQL-injection attacks
+            await connection.execute(
+                insert_clause,
+                {
+                    "user_id": watermark.user_id,
+                    "last_run": watermark.last_run,
+                    "last_search_id": watermark.last_search_id,
                 },
             )
@@ -0,0 +1,15 @@
+-- Exact watermarks: LastExtractedUserStatus.last_search_id
+-- Apply after `alembic upgrade head` in yahoo_search_engine; safe to re-run
+
+-- search_id of the newest search extracted at last_run, to break created_at ties.
+-- NULL for statuses written before watermarks were exact
+ALTER TABLE last_extracted_user_status
+    ADD COLUMN IF NOT EXISTS last_search_id VARCHAR;
+
+-- Newest status per user, for DISTINCT ON (user_id) / ORDER BY ... LIMIT 1
+CREATE INDEX IF NOT EXISTS last_extracted_user_status_user_id_watermark_idx
+    ON last_extracted_user_status (user_id, last_run DESC, last_search_id DESC NULLS LAST);
+
+-- Searches after a (created_at, search_id) watermark, per user
+CREATE INDEX IF NOT EXISTS search_results_user_id_created_at_search_id_idx
+    ON search_results (user_id, created_at, search_id);
@@ -0,0 +1,23 @@
+-- Current watermarks: one row per user, next to the append-only last_extracted_user_status
+-- Apply after 001_exact_watermarks.sql; safe to re-run
+
+-- Same columns as a last_extracted_user_status row, minus its id: a user's newest
+-- (last_run, last_search_id). Written with INSERT ... ON CONFLICT (user_id), and
+-- only ever moved forward
+CREATE TABLE IF NOT EXISTS user_watermarks (
+    user_id VARCHAR PRIMARY KEY,
+    last_run TIMESTAMP NOT NULL,
+    last_search_id VARCHAR,
+    updated_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+);
+
+-- Seeds the current watermarks from the history, once; existing rows are kept
+INSERT INTO user_watermarks (user_id, last_run, last_search_id)
+SELECT DISTINCT ON (user_id) user_id, last_run, last_search_id
+FROM last_extracted_user_status
+ORDER BY user_id, last_run DESC, last_search_id DESC NULLS LAST
+ON CONFLICT (user_id) DO NOTHING;
+
+-- History older than a retention window, for src/compact_status_history.py
+CREATE INDEX IF NOT EXISTS last_extracted_user_status_last_run_idx
+    ON last_extracted_user_status (last_run);
@@ -0,0 +1,14 @@
+-- One row per ETL pipeline run, with its run report (src/utils/run_metrics.py)
+-- Apply after 002_user_watermarks.sql; safe to re-run
+
+CREATE TABLE IF NOT EXISTS etl_runs (
+    run_id VARCHAR PRIMARY KEY,
+    started_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP,
+    status VARCHAR NOT NULL,
+    seconds DOUBLE PRECISION NOT NULL,
+    -- RunMetrics.to_report(): stage_seconds, counters and histograms
+    report JSONB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS etl_runs_started_at_idx ON etl_runs (started_at);
@@ -0,0 +1,25 @@
+-- Optional: notifies the ETL pipeline's tail mode (src/service/dao/search_notification_listener.py)
+-- of every search inserted into search_results, so it is extracted within seconds
+-- Apply after 003_etl_runs.sql; safe to re-run. Without it, only the scheduled
+-- watermark scans pick up new searches
+
+-- The payload is small JSON: {"search_id": ..., "user_id": ...}. Notifications are
+-- only delivered when the inserting transaction commits, so the row is visible to
+-- the listener by the time it is notified
+CREATE OR REPLACE FUNCTION notify_search_results_inserted() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'search_results_inserted',
+        json_build_object('search_id', NEW.search_id, 'user_id', NEW.user_id)::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS search_results_inserted ON search_results;
+CREATE TRIGGER search_results_inserted
+AFTER INSERT ON search_results
+FOR EACH ROW EXECUTE FUNCTION notify_search_results_inserted();
+
+-- To turn tail mode's notifications off again:
+-- DROP TRIGGER IF EXISTS search_results_inserted ON search_results;
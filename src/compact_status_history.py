@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any
+
+import toml
+
+from src.service.dao.last_extracted_user_status_dao import LastExtractedUserStatusDAO
+from src.utils.engine_registry import dispose_all_engines
+
+"""
+Compacts yahoo_search_engine.last_extracted_user_status
+
+Every run appends a history row per extracted user, while the ETL pipeline only reads
+the current watermarks (user_watermarks). History older than retention_days is
+deleted in batches of batch_size rows, 1 short transaction per batch, so the job
+never holds locks on the whole table and can be stopped at any time.
+
+Usage:
+    PYTHONPATH=. python src/compact_status_history.py
+"""
+
+
+async def compact_status_history(
+    last_extracted_user_dao: LastExtractedUserStatusDAO,
+    retention_days: int,
+    batch_size: int,
+    now: datetime | None = None,
+) -> int:
+    """
+    Deletes batches until one comes back short
+    :return: the number of history rows deleted
+    """
+    cutoff: datetime = (now if now is not None else datetime.utcnow()) - timedelta(
+        days=retention_days
+    )
+    total_deleted: int = 0
+    while True:
+        deleted: int = await last_extracted_user_dao.delete_status_history_before(
+            cutoff, batch_size
+        )
+        total_deleted += deleted
+        if deleted < batch_size:
+            return total_deleted
+
+
+async def main() -> None:
+    compaction_config: dict[str, Any] = toml.load("local_config/config.toml")[
+        "compaction"
+    ]
+    try:
+        total_deleted: int = await compact_status_history(
+            LastExtractedUserStatusDAO(),
+            compaction_config["retention_days"],
+            compaction_config["batch_size"],
+        )
+        print(f"deleted {total_deleted} last_extracted_user_status rows")
+    finally:
+        await dispose_all_engines()
+
+
+if __name__ == "__main__":
+    event_loop = asyncio.new_event_loop()
+    event_loop.run_until_complete(main())
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import signal
+import time
+from typing import Any
+
+import toml
+
+from src.etl_pipeline import ETLPipeline, build_etl_pipeline
+from src.service.dao.search_notification_listener import SearchNotificationListener
+from src.utils.engine_registry import dispose_all_engines
+from src.utils.prometheus_metrics import serve_metrics, write_textfile
+
+"""
+Runs the ETL pipeline continuously, in 1 long-lived process
+
+Running src/etl_pipeline.py every 5 minutes pays, on every run, for interpreter
+startup, importing bs4 / pydantic / sqlalchemy, parsing the config, opening new
+connections, and starting with empty extraction caches and layout plans. The daemon
+builds the pipeline once, and keeps its engines' connection pools, extraction cache,
+layout plans and extraction worker processes across runs. With extraction workers,
+the layout plans are kept by the parent process's extractor, which merges the plans
+the workers learn and sends them along with every chunk.
+
+- Runs never overlap: the next run is only scheduled once the last one is over
+- A failed run is logged, and the next one is scheduled as usual
+- SIGTERM / SIGINT stop the daemon once the run in progress has finished, so that
+its batches are inserted and its watermarks advanced, rather than abandoned halfway;
+between runs, the daemon stops at once
+
+Usage:
+    PYTHONPATH=. python src/etl_daemon.py
+"""
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+class ETLDaemon:
+    """
+    Schedules etl_pipeline's runs
+    - schedule "interval": a run starts every interval_seconds; a run longer than
+    that is followed by the next one immediately
+    - schedule "adaptive": after a run that found new searches, the next run starts
+    min_interval_seconds after it; every run that found none doubles that delay, up
+    to interval_seconds. Bursts of searches are picked up quickly, while an idle
+    pipeline polls rarely
+    - schedule "tail": no schedule; etl_pipeline.run_tail extracts searches as
+    listener is notified of them, with a watermark scan to catch up on (re)connect
+    """
+
+    def __init__(
+        self,
+        etl_pipeline: ETLPipeline,
+        schedule: str = "interval",
+        interval_seconds: float = 300,
+        min_interval_seconds: float = 10,
+        streaming: bool = False,
+        queue_size: int = 64,
+        metrics_textfile: str | None = None,
+        listener: SearchNotificationListener | None = None,
+        tail_batch_size: int = 1000,
+        tail_batch_window_seconds: float = 0.5,
+        reconnect_delay_seconds: float = 5,
+        tail_out_of_order_seconds: float = 300,
+    ) -> None:
+        if schedule not in ("interval", "adaptive", "tail"):
+            raise ValueError(f"Unknown schedule {schedule}")
+        if schedule == "tail" and listener is None:
+            raise ValueError("The tail schedule needs a listener")
+        self._etl_pipeline: ETLPipeline = etl_pipeline
+        self._schedule: str = schedule
+        self._interval_seconds: float = interval_seconds
+        self._min_interval_seconds: float = min(min_interval_seconds, interval_seconds)
+        self._streaming: bool = streaming
+        self._queue_size: int = queue_size
+        # When set, live metrics are written there after every run
+        self._metrics_textfile: str | None = metrics_textfile
+        self._adaptive_delay: float = self._min_interval_seconds
+        self._listener: SearchNotificationListener | None = listener
+        self._tail_batch_size: int = tail_batch_size
+        self._tail_batch_window_seconds: float = tail_batch_window_seconds
+        self._reconnect_delay_seconds: float = reconnect_delay_seconds
+        self._tail_out_of_order_seconds: float = tail_out_of_order_seconds
+        self._stop_requested: asyncio.Event = asyncio.Event()
+        self.runs: int = 0
+
+    def request_stop(self) -> None:
+        """
+        Stops the daemon once the run in progress, if any, has finished
+        """
+        LOGGER.info("Stop requested")
+        self._stop_requested.set()
+
+    def _next_delay(self, run_seconds: float, found_searches: bool) -> float:
+        """
+        Seconds to wait between the end of the last run and the start of the next
+        """
+        if self._schedule == "interval":
+            return max(0.0, self._interval_seconds - run_seconds)
+        if found_searches:
+            self._adaptive_delay = self._min_interval_seconds
+        else:
+            self._adaptive_delay = min(self._adaptive_delay * 2, self._interval_seconds)
+        return self._adaptive_delay
+
+    async def _run_once(self) -> None:
+        try:
+            if self._streaming:
+                await self._etl_pipeline.run_streaming(self._queue_size)
+            else:
+                await self._etl_pipeline.run()
+        except Exception:
+            # the run's report records the failure; the daemon carries on
+            LOGGER.exception("Run %s failed", self._etl_pipeline.run_metrics.run_id)
+        self.runs += 1
+        for line in self._etl_pipeline.summary():
+            LOGGER.info(line)
+        if self._metrics_textfile is not None:
+            try:
+                write_textfile(self._metrics_textfile)
+            except OSError:
+                LOGGER.exception("Could not write %s", self._metrics_textfile)
+
+    async def run_forever(self) -> None:
+        """
+        Runs the pipeline on schedule until request_stop
+        """
+        if self._listener is not None and self._schedule == "tail":
+            await self._etl_pipeline.run_tail(
+                self._listener,
+                self._stop_requested,
+                self._tail_batch_size,
+                self._tail_batch_window_seconds,
+                self._reconnect_delay_seconds,
+                self._queue_size if self._streaming else None,
+                self._tail_out_of_order_seconds,
+            )
+            return
+        while not self._stop_requested.is_set():
+            started: float = time.perf_counter()
+            await self._run_once()
+            delay: float = self._next_delay(
+                time.perf_counter() - started,
+                self._etl_pipeline.run_metrics.counters.get("raw_searches", 0) > 0,
+            )
+            try:
+                # woken up early by request_stop
+                await asyncio.wait_for(self._stop_requested.wait(), delay)
+            except TimeoutError:
+                pass
+
+
+async def main() -> None:
+    config: dict[str, Any] = toml.load("local_config/config.toml")
+    pipeline_config: dict[str, Any] = config["pipeline"]
+    metrics_config: dict[str, Any] = config["metrics"]
+    daemon_config: dict[str, Any] = config["daemon"]
+    etl_pipeline: ETLPipeline = build_etl_pipeline(
+        config, dispose_engines_after_run=False
+    )
+    daemon: ETLDaemon = ETLDaemon(
+        etl_pipeline,
+        daemon_config["schedule"],
+        daemon_config["interval_seconds"],
+        daemon_config["min_interval_seconds"],
+        pipeline_config["streaming"],
+        pipeline_config["queue_size"],
+        metrics_config["textfile"] or None,
+        SearchNotificationListener() if daemon_config["schedule"] == "tail" else None,
+        daemon_config["tail_batch_size"],
+        daemon_config["tail_batch_window_seconds"],
+        daemon_config["reconnect_delay_seconds"],
+        daemon_config["tail_out_of_order_seconds"],
+    )
+    event_loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGTERM, signal.SIGINT):
+        event_loop.add_signal_handler(signal_number, daemon.request_stop)
+    metrics_server: asyncio.Server | None = (
+        await serve_metrics(metrics_config["http_host"], metrics_config["http_port"])
+        if metrics_config["http_port"]
+        else None
+    )
+    try:
+        await daemon.run_forever()
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        etl_pipeline.shutdown()
+        await dispose_all_engines()
+        LOGGER.info("Stopped after %s runs", daemon.runs)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    event_loop = asyncio.new_event_loop()
+    event_loop.run_until_complete(main())
@@ -1,16 +1,89 @@
 import asyncio
-from datetime import datetime
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from typing import Any
+
+import toml
+from sqlalchemy.exc import SQLAlchemyError
 
 from src.models.extracted_search_results import ExtractedSearchResult
 from src.models.last_extracted_user_status import LastExtractedUserStatus
+from src.models.parser_backend_enum import ParserBackend
 from src.models.search_results import SearchResults
-from src.models.user import User
+from src.service.dao.etl_run_dao import EtlRunDAO
 from src.service.dao.extracted_search_dao import ExtractedSearchResultDAO
 from src.service.dao.last_extracted_user_status_dao import LastExtractedUserStatusDAO
 from src.service.dao.raw_search_dao import RawSearchResultDAO
+from src.service.dao.search_notification_listener import (
+    ListenerDisconnectedError,
+    SearchNotificationListener,
+)
 from src.service.dao.user_dao import UserDAO
 from src.service.extractors.bs4_extractor import BS4SearchResultExtractor
-from src.service.extractors.search_result_extractor_abc import SearchResultExtractor
+from src.service.extractors.cached_extractor import CachedSearchResultExtractor
+from src.service.extractors.extraction_pool import ExtractionPool
+from src.service.extractors.layout_plan_extractor import (
+    LayoutPlanSearchResultExtractor,
+)
+from src.service.extractors.search_result_extractor_abc import (
+    ExtractorGroupStats,
+    SearchResultExtractor,
+)
+from src.service.extractors.streaming_extractor import StreamingSearchResultExtractor
+from src.utils.async_retry import CircuitOpenError
+from src.utils.engine_registry import dispose_all_engines
+from src.utils.prometheus_metrics import (
+    REGISTRY,
+    Counter,
+    CounterChild,
+    Gauge,
+    GaugeChild,
+    HistogramChild,
+    serve_metrics,
+    write_textfile,
+)
+from src.utils.run_metrics import RunMetrics, write_run_report
+
+# Postgres recommended bulk insert record is 10,000
+BULK_INSERT_BATCH_SIZE: int = 10000
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+# Live, process-wide metrics (src/utils/prometheus_metrics.py), bound once here so
+# that the hot path never builds a label dict
+DOCUMENTS_EXTRACTED: CounterChild = REGISTRY.counter(
+    "etl_documents_extracted_total",
+    "Raw HTML documents run through SearchResultExtractor.extract",
+).labels()
+EXTRACT_SECONDS: HistogramChild = REGISTRY.histogram(
+    "etl_extract_seconds",
+    "Seconds per document in SearchResultExtractor.extract, in the event loop",
+).labels()
+ROWS_INSERTED: CounterChild = REGISTRY.counter(
+    "etl_rows_inserted_total", "Extracted search results bulk inserted"
+).labels()
+BULK_INSERT_SECONDS: HistogramChild = REGISTRY.histogram(
+    "etl_bulk_insert_seconds", "Seconds per bulk_insert batch"
+).labels()
+_QUEUE_DEPTH: Gauge = REGISTRY.gauge(
+    "etl_queue_depth", "Items waiting in a queue between stages", ("queue",)
+)
+RAW_SEARCH_QUEUE_DEPTH: GaugeChild = _QUEUE_DEPTH.labels("raw_search")
+EXTRACTED_QUEUE_DEPTH: GaugeChild = _QUEUE_DEPTH.labels("extracted")
+FRESHNESS_LAG: GaugeChild = REGISTRY.gauge(
+    "etl_freshness_lag_seconds",
+    "Now minus the created_at of the oldest search not processed yet",
+).labels()
+TAIL_LATENCY: HistogramChild = REGISTRY.histogram(
+    "etl_tail_latency_seconds",
+    "Seconds from a search's created_at to its results being inserted, in tail mode",
+).labels()
+_RUNS: Counter = REGISTRY.counter("etl_runs_total", "Finished runs", ("status",))
+RUNS_SUCCEEDED: CounterChild = _RUNS.labels("succeeded")
+RUNS_FAILED: CounterChild = _RUNS.labels("failed")
 
 
 class ETLPipeline:
@@ -21,6 +94,11 @@ class ETLPipeline:
         user_dao: UserDAO,
         result_extractor: SearchResultExtractor,
         extracted_search_result_dao: ExtractedSearchResultDAO,
+        extraction_pool: ExtractionPool | None = None,
+        run_report_dir: str | None = None,
+        etl_run_dao: EtlRunDAO | None = None,
+        track_freshness_lag: bool = False,
+        dispose_engines_after_run: bool = True,
     ) -> None:
         self._raw_search_result_dao: RawSearchResultDAO = raw_search_result_dao
         self._last_extracted_user_dao: LastExtractedUserStatusDAO = (
@@ -31,25 +109,50 @@ class ETLPipeline:
         self._extracted_search_result_dao: ExtractedSearchResultDAO = (
             extracted_search_result_dao
         )
+        # When set, stage two parses in worker processes instead of the event loop
+        self._extraction_pool: ExtractionPool | None = extraction_pool
+        # When set, every run's report is written there, and / or into etl_runs
+        self._run_report_dir: str | None = run_report_dir
+        self._etl_run_dao: EtlRunDAO | None = etl_run_dao
+        # When set, FRESHNESS_LAG is refreshed at the end of every run (1 more query)
+        self._track_freshness_lag: bool = track_freshness_lag
+        # A one-shot run closes its connections; a daemon keeps them for the next run
+        self._dispose_engines_after_run: bool = dispose_engines_after_run
+        # Metrics of the current run, or of the last one once it is finished
+        self.run_metrics: RunMetrics = RunMetrics()
+        # Tail mode only: the recent searches its catch-up scan extracted, which may
+        # be notified as well, and the oldest created_at it remembers (see run_tail)
+        self._caught_up_search_ids: set[str] = set()
+        self._caught_up_since: datetime | None = None
 
-    async def stage_one(self) -> tuple[list[SearchResults], list[User]]:
-        all_users: list[User] = await self._user_dao.fetch_all_users()
+    async def stage_one(self) -> list[SearchResults]:
+        """
+        Fetches every user's raw searches since their watermark, in 1 query joining
+        search_results against each user's latest last_extracted_user_status
+        """
         all_raw_searches_since_last_run: list[SearchResults] = []
-        for user in all_users:
-            last_run_status: LastExtractedUserStatus | None = (
-                await self._last_extracted_user_dao.fetch_latest_status(user.user_id)
-            )
-            last_run: datetime = (
-                last_run_status.last_run if last_run_status else datetime(1970, 1, 1)
-            )
-            user_str: str = user.user_id
-            raw_searches_since_last_run: list[SearchResults] = (
-                await self._raw_search_result_dao.fetch_searches_for_user(
-                    user_str, last_run
+        raw_searches_by_user: AsyncIterator[list[SearchResults]] = (
+            self._raw_search_result_dao.stream_searches_since_last_run()
+        )
+        with self.run_metrics.time_stage("stage_one"):
+            async for raw_searches_for_user in raw_searches_by_user:
+                self._count_raw_searches(raw_searches_for_user)
+                self._remember_caught_up_searches(raw_searches_for_user)
+                all_raw_searches_since_last_run.extend(raw_searches_for_user)
+        return all_raw_searches_since_last_run
+
+    def _count_raw_searches(self, raw_searches_for_user: list[SearchResults]) -> None:
+        """
+        raw_searches_for_user: every raw search of 1 user
+        """
+        self.run_metrics.increment("users")
+        self.run_metrics.increment("raw_searches", len(raw_searches_for_user))
+        for raw_search in raw_searches_for_user:
+            if raw_search.result is not None:
+                self.run_metrics.increment("documents")
+                self.run_metrics.increment(
+                    "html_bytes", len(raw_search.result.encode())
                 )
-            )
-            all_raw_searches_since_last_run.extend(raw_searches_since_last_run)
-        return all_raw_searches_since_last_run, all_users
 
     async def stage_two(
         self, pre_transformed_results: list[SearchResults]
@@ -62,48 +165,158 @@ class ETLPipeline:
             run the extractor
         3) Running bs4_extractor:
             transformed_results: list[ExtractedSearchResults] = BS4SearchResultExtractor.extract(pre_transformed_results.result, pre_transformed_results.user_id)
+        4) If an extraction_pool is configured, the documents are extracted in worker processes instead
+        5) Counts the groups the extractor found and filtered, and the search results
+
+        """
+        with self.run_metrics.time_stage("stage_two"):
+            all_transformed_results, group_stats = await self._extract(
+                pre_transformed_results
+            )
+        self.run_metrics.increment("groups_found", group_stats.groups_found)
+        self.run_metrics.increment("groups_filtered", group_stats.groups_filtered)
+        self.run_metrics.increment("search_results", len(all_transformed_results))
+        return all_transformed_results
 
+    async def _extract(
+        self, pre_transformed_results: list[SearchResults]
+    ) -> tuple[list[ExtractedSearchResult], ExtractorGroupStats]:
+        """
+        :return: the search results, and the groups found and filtered for these
+        results only; stage_two may run for several batches at once, which all
+        count in the extractor's group_stats
         """
+        if self._extraction_pool is not None:
+            documents: list[tuple[str, str]] = [
+                (pre_transformed_result.result, pre_transformed_result.user_id)
+                for pre_transformed_result in pre_transformed_results
+                if pre_transformed_result.result is not None
+            ]
+            extracted_results, pool_group_stats = await self._extraction_pool.extract(
+                documents
+            )
+            DOCUMENTS_EXTRACTED.inc(len(documents))
+            return extracted_results, pool_group_stats
+
+        # the loop below never awaits, so no other batch counts in group_stats
+        # until it is over
+        group_stats: ExtractorGroupStats = self._result_extractor.group_stats
+        groups_found: int = group_stats.groups_found
+        groups_filtered: int = group_stats.groups_filtered
         all_transformed_results: list[ExtractedSearchResult] = []
         for pre_transformed_result in pre_transformed_results:
             if pre_transformed_result.result is None:
                 continue
             else:
+                started: float = time.perf_counter()
                 transformed_results: list[ExtractedSearchResult] = (
                     self._result_extractor.extract(
                         pre_transformed_result.result, pre_transformed_result.user_id
                     )
                 )
+                seconds: float = time.perf_counter() - started
+                self.run_metrics.observe("extract_seconds", seconds)
+                EXTRACT_SECONDS.observe(seconds)
+                DOCUMENTS_EXTRACTED.inc()
                 all_transformed_results.extend(transformed_results)
-        return all_transformed_results
+        return all_transformed_results, ExtractorGroupStats(
+            group_stats.groups_found - groups_found,
+            group_stats.groups_filtered - groups_filtered,
+        )
 
     async def stage_three(
-        self, transformed_results: list[ExtractedSearchResult], all_users: list[User]
+        self,
+        transformed_results: list[ExtractedSearchResult],
+        raw_results: list[SearchResults],
     ) -> None:
         """
         1) Postgres recommended bulk insert record is 10,000. Batch the transformed_results into batches of 10,000
-        2) Update last_extracted_user_status
-            - Create a last_extracted_user_status: LastExtractedUserStatus = self._last_extracted_user_dao.create_user_status(all_users)
-            - Convert all_users: list[User into list[LastExtractedUserStatus]
-            - Bulk insert list[ExtractedUserStatus] in batches of 10,000 into last_extracted_user_status table
+        2) Advance last_extracted_user_status, only for users with raw_results
+            - Each user's watermark is the newest (created_at, search_id) in raw_results,
+            not the time of the run: searches inserted while the run was in progress are
+            picked up by the next run, instead of being skipped
+            - Bulk upsert list[ExtractedUserStatus] in batches of 10,000 into user_watermarks,
+            appending them to the last_extracted_user_status history
         """
-        batch_size: int = 10000
+        batch_size: int = BULK_INSERT_BATCH_SIZE
         for i in range(0, len(transformed_results), batch_size):
             current_batch: list[ExtractedSearchResult] = transformed_results[
                 i : i + batch_size
             ]
+            await self._bulk_insert(current_batch)
+
+        await self._update_user_status(
+            LastExtractedUserStatus.from_processed_searches(raw_results)
+        )
+
+    async def _bulk_insert(self, current_batch: list[ExtractedSearchResult]) -> None:
+        with self.run_metrics.time_stage("stage_three"):
+            started: float = time.perf_counter()
             await self._extracted_search_result_dao.bulk_insert(current_batch)
+            seconds: float = time.perf_counter() - started
+            self.run_metrics.observe("bulk_insert_seconds", seconds)
+            BULK_INSERT_SECONDS.observe(seconds)
+        self.run_metrics.increment("rows_inserted", len(current_batch))
+        ROWS_INSERTED.inc(len(current_batch))
 
-        all_user_status: list[LastExtractedUserStatus] = [
-            LastExtractedUserStatus.create_user_status(user.user_id)
-            for user in all_users
-        ]
+    async def _update_user_status(
+        self, all_user_status: list[LastExtractedUserStatus]
+    ) -> None:
+        batch_size: int = BULK_INSERT_BATCH_SIZE
+        with self.run_metrics.time_stage("stage_three"):
+            for i in range(0, len(all_user_status), batch_size):
+                current_user_batch: list[LastExtractedUserStatus] = all_user_status[
+                    i : i + batch_size
+                ]
+                await self._last_extracted_user_dao.bulk_upsert_status(
+                    current_user_batch
+                )
+                self.run_metrics.increment(
+                    "watermarks_advanced", len(current_user_batch)
+                )
 
-        for i in range(0, len(all_user_status), batch_size):
-            current_user_batch: list[LastExtractedUserStatus] = all_user_status[
-                i : i + batch_size
-            ]
-            await self._last_extracted_user_dao.bulk_insert_status(current_user_batch)
+    async def refresh_freshness_lag(self) -> None:
+        """
+        Points FRESHNESS_LAG at the oldest search not processed yet; the lag is
+        computed at scrape time, so it keeps growing until the next refresh
+        """
+        oldest_created_at: datetime | None = (
+            await self._raw_search_result_dao.fetch_oldest_unprocessed_created_at()
+        )
+        if oldest_created_at is None:
+            FRESHNESS_LAG.set_function(None)
+            FRESHNESS_LAG.set(0)
+        else:
+            FRESHNESS_LAG.set_function(
+                lambda: (datetime.utcnow() - oldest_created_at).total_seconds()
+            )
+
+    async def _finish_run(self, status: str) -> None:
+        """
+        Ends run_metrics, then writes its report to run_report_dir and / or etl_runs,
+        and refreshes the freshness lag if it is tracked
+
+        Recording the report never fails the run
+        """
+        self.run_metrics.finish(status)
+        (RUNS_SUCCEEDED if status == "succeeded" else RUNS_FAILED).inc()
+        if self._run_report_dir is not None:
+            try:
+                write_run_report(self.run_metrics, self._run_report_dir)
+            except OSError:
+                LOGGER.exception(
+                    "Could not write the report of run %s", self.run_metrics.run_id
+                )
+        if self._etl_run_dao is not None:
+            try:
+                await self._etl_run_dao.insert_run(self.run_metrics)
+            except (SQLAlchemyError, CircuitOpenError):
+                LOGGER.exception("Could not insert run %s", self.run_metrics.run_id)
+        if self._track_freshness_lag:
+            try:
+                await self.refresh_freshness_lag()
+            except (SQLAlchemyError, CircuitOpenError):
+                LOGGER.exception("Could not refresh the freshness lag")
 
     async def run(self) -> None:
         """
@@ -112,10 +325,8 @@ class ETLPipeline:
         Stage 1: Fetch raw yahoo search results
         - Queries for rows from yahoo_search_engine.search_results table after a specific date rang
 
-            1) Call user_dao.fetch_all_users to fetch all users
-            2) Call last_extracted_user_dao.fetch_latest_status to fetch the last run
-            3) Call raw_search_dao.fetch_searches_for_user to fetch the raw results from search_results
-            table since last_run
+            1) Call raw_search_dao.stream_searches_since_last_run to fetch the raw results from
+            search_results table since each user's watermark, in a single query
 
         Stage 2: Transform results obtained from stage 1 from yahoo search results table (HTML)
             1) Results can be none (check search_results model to see the attribute) If it is a none
@@ -124,35 +335,402 @@ class ETLPipeline:
             list[ExtractedSearchResults].
 
         Stage 3: Batch insert into PSQL (yahoo_search_results.extracted_search_results)
-        - We do a CSV copy if we have millions of rows; the CSV copy would be way faster than bulk inserts
-        - But in this case, since we have very few users at the moment, with very few records
-        - A bulk insert is sufficient
+        - Each batch is a binary COPY into a staging table, followed by a single INSERT ... SELECT
+        - COPY is way faster than bulk inserts once we have millions of rows
             1) Call extracted_search_dao.bulk_insert(list[ExtractedResults) to bulk insert into
             extracted_search_results table
-            2) Update the last_extracted_user_status
+            2) Advance the user_watermarks of the users with raw results
+
+        All DAOs share pooled engines from the engine registry; their connections are
+        closed once the run ends, even if it fails, unless dispose_engines_after_run is
+        unset
+
+        Each run is timed and counted in a fresh run_metrics
+        """
+        self.run_metrics = RunMetrics()
+        status: str = "failed"
+        try:
+            raw_results: list[SearchResults] = await self.stage_one()
+            transformed_results: list[ExtractedSearchResult] = await self.stage_two(
+                raw_results
+            )
+            await self.stage_three(transformed_results, raw_results)
+            status = "succeeded"
+        finally:
+            await self._finish_run(status)
+            if self._dispose_engines_after_run:
+                await dispose_all_engines()
+
+    async def _produce_raw_searches(
+        self,
+        raw_search_queue: asyncio.Queue[SearchResults | None],
+        consumer_count: int,
+        newest_searches: list[SearchResults],
+    ) -> None:
+        """
+        Streaming stage one: puts each raw search with a result onto raw_search_queue
+        - Blocks while the queue is full, so fetching never runs ahead of extraction
+        - Ends with one None sentinel per stage two consumer
+        - Appends each user's newest raw search to newest_searches, for the watermarks
+        """
+        raw_searches_by_user: AsyncIterator[list[SearchResults]] = (
+            self._raw_search_result_dao.stream_searches_since_last_run()
+        )
+        async for raw_searches_for_user in raw_searches_by_user:
+            self._count_raw_searches(raw_searches_for_user)
+            self._remember_caught_up_searches(raw_searches_for_user)
+            # a user's searches come in watermark order
+            newest_searches.append(raw_searches_for_user[-1])
+            for raw_search in raw_searches_for_user:
+                if raw_search.result is not None:
+                    await raw_search_queue.put(raw_search)
+        for _ in range(consumer_count):
+            await raw_search_queue.put(None)
+
+    async def _extract_raw_searches(
+        self,
+        raw_search_queue: asyncio.Queue[SearchResults | None],
+        extracted_queue: asyncio.Queue[list[ExtractedSearchResult] | None],
+    ) -> None:
+        """
+        Streaming stage two: extracts raw searches and puts the results on extracted_queue
+        - With an extraction_pool, up to a chunk of documents is sent to a worker at a time
+        - Ends with a None sentinel once raw_search_queue is exhausted
+        """
+        chunk_size: int = (
+            self._extraction_pool.chunk_size if self._extraction_pool else 1
+        )
+        exhausted: bool = False
+        while not exhausted:
+            documents: list[SearchResults] = []
+            while len(documents) < chunk_size:
+                raw_search: SearchResults | None = await raw_search_queue.get()
+                if raw_search is None:
+                    exhausted = True
+                    break
+                documents.append(raw_search)
+                # only wait for the first document; send whatever else is ready
+                if raw_search_queue.empty():
+                    break
+            if documents:
+                await extracted_queue.put(await self.stage_two(documents))
+        await extracted_queue.put(None)
+
+    async def _load_extracted_results(
+        self,
+        extracted_queue: asyncio.Queue[list[ExtractedSearchResult] | None],
+        producer_count: int,
+    ) -> None:
+        """
+        Streaming stage three: bulk inserts a batch as soon as BULK_INSERT_BATCH_SIZE
+        results are queued, and the remainder once every stage two consumer is done
+        """
+        current_batch: list[ExtractedSearchResult] = []
+        finished_producers: int = 0
+        while finished_producers < producer_count:
+            extracted_results: list[ExtractedSearchResult] | None = (
+                await extracted_queue.get()
+            )
+            if extracted_results is None:
+                finished_producers += 1
+                continue
+            current_batch.extend(extracted_results)
+            if len(current_batch) >= BULK_INSERT_BATCH_SIZE:
+                await self._bulk_insert(current_batch[:BULK_INSERT_BATCH_SIZE])
+                current_batch = current_batch[BULK_INSERT_BATCH_SIZE:]
+        if current_batch:
+            await self._bulk_insert(current_batch)
+
+    async def run_streaming(self, queue_size: int = 64) -> None:
+        """
+        Runs the ETL pipeline, with the 3 stages overlapping in time
+
+        run() holds every raw HTML document, then every extracted result, in memory at
+        once. Here, the stages are connected by bounded queues instead:
+
+        Stage 1 -> raw_search_queue -> Stage 2 (1 consumer per worker) -> extracted_queue -> Stage 3
+
+        - A full queue blocks the stage before it, so memory is capped by queue_size
+        - Fetching, parsing and loading run concurrently
+        - If any stage fails, the TaskGroup cancels the other stages
+        - last_extracted_user_status is only updated once every result is inserted
+        - Stage seconds in run_metrics add up the time each stage was busy; they
+        overlap, so they may add up to more than the run
+        """
+        consumer_count: int = (
+            self._extraction_pool.max_workers if self._extraction_pool else 1
+        )
+        raw_search_queue: asyncio.Queue[SearchResults | None] = asyncio.Queue(
+            maxsize=queue_size
+        )
+        extracted_queue: asyncio.Queue[list[ExtractedSearchResult] | None] = (
+            asyncio.Queue(maxsize=queue_size)
+        )
+        newest_searches: list[SearchResults] = []
+        self.run_metrics = RunMetrics()
+        RAW_SEARCH_QUEUE_DEPTH.set_function(raw_search_queue.qsize)
+        EXTRACTED_QUEUE_DEPTH.set_function(extracted_queue.qsize)
+        status: str = "failed"
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                task_group.create_task(
+                    self._produce_raw_searches(
+                        raw_search_queue, consumer_count, newest_searches
+                    )
+                )
+                for _ in range(consumer_count):
+                    task_group.create_task(
+                        self._extract_raw_searches(raw_search_queue, extracted_queue)
+                    )
+                task_group.create_task(
+                    self._load_extracted_results(extracted_queue, consumer_count)
+                )
+            await self._update_user_status(
+                LastExtractedUserStatus.from_processed_searches(newest_searches)
+            )
+            status = "succeeded"
+        finally:
+            RAW_SEARCH_QUEUE_DEPTH.set_function(None)
+            EXTRACTED_QUEUE_DEPTH.set_function(None)
+            await self._finish_run(status)
+            if self._dispose_engines_after_run:
+                await dispose_all_engines()
+
+    async def run_tail(
+        self,
+        listener: SearchNotificationListener,
+        stop_requested: asyncio.Event,
+        max_batch_size: int = 1000,
+        batch_window_seconds: float = 0.5,
+        reconnect_delay_seconds: float = 5,
+        queue_size: int | None = None,
+        out_of_order_seconds: float = 300,
+    ) -> None:
         """
-        raw_results: list[SearchResults]
-        users: list[User]
-        raw_results, users = await self.stage_one()
+        Tail mode: extracts searches within seconds of their insert, as notified by
+        the search_results_inserted trigger (sql/004_search_results_notify.sql),
+        instead of up to 1 scheduling interval later
+
+        1) LISTEN, then catch up with a watermark scan (run, or run_streaming when
+        queue_size is set) for whatever was inserted while not listening; searches
+        inserted during the scan are notified too, so the scan remembers the ones
+        it processed that were created at most out_of_order_seconds before LISTEN
+        2) Micro-batch notifications, up to max_batch_size search_ids or
+        batch_window_seconds, and extract and insert only those searches, minus the
+        ones the scan remembers. Notifications come in commit order, not watermark
+        order: a search committed after a newer search of the same user is still
+        extracted, although the newer one already moved the watermark past it
+        3) On a lost connection, or missed notifications, go back to 1; failures
+        are retried after reconnect_delay_seconds
+
+        Stops once stop_requested, after the micro-batch in progress; notifications
+        still pending are picked up by the next catch-up scan. The micro-batches
+        between 2 catch-up scans are reported as 1 run
+        """
+        try:
+            while not stop_requested.is_set():
+                try:
+                    await listener.connect()
+                    self._caught_up_search_ids = set()
+                    self._caught_up_since = datetime.utcnow() - timedelta(
+                        seconds=out_of_order_seconds
+                    )
+                    if queue_size is not None:
+                        await self.run_streaming(queue_size)
+                    else:
+                        await self.run()
+                    # later runs are micro-batches, whose searches are never
+                    # notified again
+                    self._caught_up_since = None
+                    await self._tail(
+                        listener, stop_requested, max_batch_size, batch_window_seconds
+                    )
+                except Exception:
+                    LOGGER.exception(
+                        "Tail mode failed; retrying in %ss", reconnect_delay_seconds
+                    )
+                    try:
+                        await asyncio.wait_for(
+                            stop_requested.wait(), reconnect_delay_seconds
+                        )
+                    except TimeoutError:
+                        pass
+        finally:
+            self._caught_up_search_ids = set()
+            self._caught_up_since = None
+            await listener.close()
+
+    async def _tail(
+        self,
+        listener: SearchNotificationListener,
+        stop_requested: asyncio.Event,
+        max_batch_size: int,
+        batch_window_seconds: float,
+    ) -> None:
+        """
+        Processes micro-batches until a stop, a lost connection or missed notifications
+        """
+        self.run_metrics = RunMetrics()
+        status: str = "failed"
+        try:
+            while not stop_requested.is_set():
+                search_ids: list[str] = await listener.next_batch(
+                    max_batch_size, batch_window_seconds, stop_requested
+                )
+                if search_ids:
+                    await self._process_notified_searches(search_ids)
+                elif listener.missed_notifications:
+                    LOGGER.warning("Missed notifications; catching up")
+                    break
+            status = "succeeded"
+        except ListenerDisconnectedError:
+            LOGGER.warning("Stopped listening; catching up once reconnected")
+            status = "succeeded"
+        finally:
+            await self._finish_run(status)
+
+    async def _process_notified_searches(self, search_ids: list[str]) -> None:
+        """
+        Stage one fetches only the notified searches the catch-up scan did not
+        already process, even those behind their watermark; stages two and three as
+        in run. The watermark upsert is forward-only, so a late search never moves
+        it back
+        """
+        self.run_metrics.increment("notified_searches", len(search_ids))
+        # each search is notified once, so it needs remembering only until then
+        caught_up_search_ids: set[str] = self._caught_up_search_ids.intersection(
+            search_ids
+        )
+        self._caught_up_search_ids.difference_update(caught_up_search_ids)
+        self.run_metrics.increment("caught_up_searches", len(caught_up_search_ids))
+        with self.run_metrics.time_stage("stage_one"):
+            raw_results: list[SearchResults] = (
+                await self._raw_search_result_dao.fetch_searches_by_ids(
+                    [
+                        search_id
+                        for search_id in search_ids
+                        if search_id not in caught_up_search_ids
+                    ]
+                )
+                if len(caught_up_search_ids) < len(search_ids)
+                else []
+            )
+        # ordered by user
+        for _, raw_searches_for_user in itertools.groupby(
+            raw_results, key=lambda raw_search: raw_search.user_id
+        ):
+            self._count_raw_searches(list(raw_searches_for_user))
+        if not raw_results:
+            return
         transformed_results: list[ExtractedSearchResult] = await self.stage_two(
             raw_results
         )
-        await self.stage_three(transformed_results, users)
+        await self.stage_three(transformed_results, raw_results)
+        now: datetime = datetime.utcnow()
+        for raw_search in raw_results:
+            TAIL_LATENCY.observe((now - raw_search.created_at).total_seconds())
 
+    def summary(self) -> list[str]:
+        """
+        Lines describing the last run, and the extractor's caches
+        """
+        run_line: str = (
+            f"run {self.run_metrics.run_id} {self.run_metrics.status} "
+            f"in {self.run_metrics.seconds:.2f}s: "
+            f"{self.run_metrics.stage_seconds} "
+            f"{self.run_metrics.counters}"
+        )
+        lines: list[str] = [run_line]
+        result_extractor: SearchResultExtractor = self._result_extractor
+        if isinstance(result_extractor, CachedSearchResultExtractor):
+            lines.append(f"extraction cache: {result_extractor.stats}")
+            result_extractor = result_extractor.result_extractor
+        # with an extraction pool, the workers' stats are merged in here too
+        if isinstance(result_extractor, LayoutPlanSearchResultExtractor):
+            lines.append(f"layout plans: {result_extractor.stats}")
+        return lines
 
-if __name__ == "__main__":
-    raw_search_dao: RawSearchResultDAO = RawSearchResultDAO()
-    last_extracted_user_dao: LastExtractedUserStatusDAO = LastExtractedUserStatusDAO()
-    user_dao: UserDAO = UserDAO()
-    result_extractor: BS4SearchResultExtractor = BS4SearchResultExtractor()
-    extracted_search_result_dao: ExtractedSearchResultDAO = ExtractedSearchResultDAO()
-
-    etl_pipeline: ETLPipeline = ETLPipeline(
-        raw_search_dao,
-        last_extracted_user_dao,
-        user_dao,
+    def shutdown(self) -> None:
+        """
+        Stops the extraction pool's worker processes, if any
+        """
+        if self._extraction_pool is not None:
+            self._extraction_pool.shutdown()
+
+
+def build_etl_pipeline(
+    config: dict[str, Any], dispose_engines_after_run: bool = True
+) -> ETLPipeline:
+    """
+    config: local_config/config.toml; the pipeline is built from its [pipeline] and
+    [metrics] sections, and its DAOs from the default [database] section
+    """
+    pipeline_config: dict[str, Any] = config["pipeline"]
+    metrics_config: dict[str, Any] = config["metrics"]
+    result_extractor: SearchResultExtractor
+    if pipeline_config["extractor"] == "streaming":
+        result_extractor = StreamingSearchResultExtractor()
+    elif pipeline_config["extractor"] == "layout-plan":
+        result_extractor = LayoutPlanSearchResultExtractor()
+    else:
+        result_extractor = BS4SearchResultExtractor(
+            ParserBackend(pipeline_config["parser"]), pipeline_config["prune"]
+        )
+    if pipeline_config["extraction_cache_size"] > 0:
+        result_extractor = CachedSearchResultExtractor(
+            result_extractor,
+            pipeline_config["extraction_cache_size"],
+            pipeline_config["extraction_cache_dir"] or None,
+            pipeline_config["extraction_cache_max_disk_mb"] * 1024 * 1024,
+        )
+    extraction_pool: ExtractionPool | None = (
+        ExtractionPool(
+            result_extractor,
+            pipeline_config["extraction_workers"],
+            pipeline_config["extraction_chunk_size"],
+        )
+        if pipeline_config["extraction_workers"] > 0
+        else None
+    )
+    return ETLPipeline(
+        RawSearchResultDAO(),
+        LastExtractedUserStatusDAO(),
+        UserDAO(),
         result_extractor,
-        extracted_search_result_dao,
+        ExtractedSearchResultDAO(),
+        extraction_pool,
+        pipeline_config["run_report_dir"] or None,
+        EtlRunDAO() if pipeline_config["record_runs"] else None,
+        bool(metrics_config["http_port"] or metrics_config["textfile"]),
+        dispose_engines_after_run,
     )
+
+
+if __name__ == "__main__":
+    config: dict[str, Any] = toml.load("local_config/config.toml")
+    pipeline_config: dict[str, Any] = config["pipeline"]
+    metrics_config: dict[str, Any] = config["metrics"]
+    etl_pipeline: ETLPipeline = build_etl_pipeline(config)
     event_loop = asyncio.new_event_loop()
-    event_loop.run_until_complete(etl_pipeline.run())
+    metrics_server: asyncio.Server | None = (
+        event_loop.run_until_complete(
+            serve_metrics(metrics_config["http_host"], metrics_config["http_port"])
+        )
+        if metrics_config["http_port"]
+        else None
+    )
+    try:
+        if pipeline_config["streaming"]:
+            event_loop.run_until_complete(
+                etl_pipeline.run_streaming(pipeline_config["queue_size"])
+            )
+        else:
+            event_loop.run_until_complete(etl_pipeline.run())
+    finally:
+        etl_pipeline.shutdown()
+        if metrics_server is not None:
+            metrics_server.close()
+        if metrics_config["textfile"]:
+            write_textfile(metrics_config["textfile"])
+        for line in etl_pipeline.summary():
+            print(line)
@@ -1,9 +1,10 @@
-import uuid
+from collections.abc import Iterable
 from datetime import datetime
 
 from pydantic import BaseModel
 
 from src.models.extracted_text_group import ExtractedTextGroup
+from src.utils.uuid7 import uuid7, uuid7_batch
 
 
 class ExtractedSearchResult(BaseModel):
@@ -28,7 +29,7 @@ class ExtractedSearchResult(BaseModel):
         Smart constructor to create a single search result from ExtractedTextGroup
         """
         return ExtractedSearchResult(
-            id=str(uuid.uuid4()),
+            id=uuid7(),
             user_id=user_id,
             url=text_group.link_str,
             date=text_group.date_str,
@@ -44,10 +45,56 @@ class ExtractedSearchResult(BaseModel):
         Smart constructor to create a search result
         """
         return ExtractedSearchResult(
-            id=str(uuid.uuid4()),
+            id=uuid7(),
             user_id=user_id,
             url=url,
             date=date,
             body=body,
             created_at=datetime.utcnow(),
         )
+
+    @staticmethod
+    def from_extracted_text_groups(
+        user_id: str,
+        text_groups: list[ExtractedTextGroup],
+    ) -> list["ExtractedSearchResult"]:
+        """
+        from_extracted_text_group for a whole page: ids are minted in 1 batch, and
+        the results share 1 created_at
+        """
+        created_at: datetime = datetime.utcnow()
+        return [
+            ExtractedSearchResult(
+                id=result_id,
+                user_id=user_id,
+                url=text_group.link_str,
+                date=text_group.date_str,
+                body=text_group.body_str,
+                created_at=created_at,
+            )
+            for result_id, text_group in zip(uuid7_batch(len(text_groups)), text_groups)
+        ]
+
+    @staticmethod
+    def create_search_results(
+        user_id: str, fields: Iterable[tuple[str | None, str | None, str | None]]
+    ) -> list["ExtractedSearchResult"]:
+        """
+        create_search_result for each (url, date, body): ids are minted in 1 batch,
+        and the results share 1 created_at
+        """
+        fields_list: list[tuple[str | None, str | None, str | None]] = list(fields)
+        created_at: datetime = datetime.utcnow()
+        return [
+            ExtractedSearchResult(
+                id=result_id,
+                user_id=user_id,
+                url=url,
+                date=date,
+                body=body,
+                created_at=created_at,
+            )
+            for result_id, (url, date, body) in zip(
+                uuid7_batch(len(fields_list)), fields_list
+            )
+        ]
@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import re
+import sys
 
 from src.models.text_classification_enum import TextClassification
+from src.utils.text_classifier import URL_PATTERN, classify_text
 
 """
 Improvements: Can be improve using spacy's name entity recognition. It is capable to
@@ -28,16 +30,10 @@ if classification is None:
     classification = Classification.BODY
 """
 
-DATE_PATTERN: re.Pattern = re.compile(
-    r"\b(Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s\d{1,2},\s\d{4}\b"
-)
 LI_PATTERN: re.Pattern = re.compile(r"[0-9]+_li")
-URL_PATTERN: re.Pattern = re.compile(
-    r"\b(?:www\.)?[\w-]+\.(?:[\w-]+\.)?[a-zA-Z]{2,6}\b"
-)
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtractedText:
     """
     Intermediate raw text (unclassified), from the HTML
@@ -49,7 +45,8 @@ class ExtractedText:
     1. From RAW HTML -> Extract only text, ignore the html (ExtractedText)
     - We do this by recursively traversing the HTML as a tree
     - Get all <p> / <span> components containing strings -> text: str
-    - The parent components of this <p> / <span> is in parent_tags list[str]
+    - The parent components of this <p> / <span> is in parent_tags tuple[str, ...]
+        - Texts in the same component share the same tuple
         - This is a key feature, to decide which extracted text should be grouped together
 
     2. Grouping ExtractedText together by search result -> ExtractedTextGroup
@@ -65,38 +62,46 @@ class ExtractedText:
     4. Return the final transformed type ExtractedTextGroup
     """
 
-    parent_tags: list[str]
+    parent_tags: tuple[str, ...]
     text: str
+    # Computed once, on first read; ExtractedText is immutable in practice
+    _identifier_tags: str | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _classification: TextClassification | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
     def is_search_result(self) -> bool:
         """
         Assume only search results have "[0-9]+_li" in them
         """
-        for tag in self.parent_tags:
-            if LI_PATTERN.match(tag):
-                return True
-        return False
+        return self.identifier_tags != ""
 
     @property
     def identifier_tags(self) -> str:
         """
-        Represents the identifier of the extractedpip3  text
+        Represents the identifier of the extracted text
         Text of the same identifier tags are of the same search result
 
         All tags before and including "[0-9]+_li" is part of the identifier tag
+        - Interned, so that grouping compares identifiers by identity first
+        - "" if the text is not part of a search result
         :return: E.G "html-body-div-div-div-div-div-div-div-div-ul-1_li"
         """
-        identifier_tags: list[str] = []
-        for tag in self.parent_tags:
-            identifier_tags.append(tag)
-            if LI_PATTERN.match(tag):
-                break
-        return "-".join(identifier_tags)
+        if self._identifier_tags is None:
+            identifier_tags: str = ""
+            for i, tag in enumerate(self.parent_tags):
+                if LI_PATTERN.match(tag):
+                    identifier_tags = sys.intern("-".join(self.parent_tags[: i + 1]))
+                    break
+            self._identifier_tags = identifier_tags
+        return self._identifier_tags
 
     @property
     def is_date(self) -> bool:
-        return DATE_PATTERN.search(self.text) is not None
+        return self.classification == TextClassification.date
 
     @property
     def is_url(self) -> bool:
@@ -104,9 +109,6 @@ class ExtractedText:
 
     @property
     def classification(self) -> TextClassification:
-        if self.is_date:
-            return TextClassification.date
-        elif self.is_url:
-            return TextClassification.url
-        else:
-            return TextClassification.body
+        if self._classification is None:
+            self._classification = classify_text(self.text)
+        return self._classification
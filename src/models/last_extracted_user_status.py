@@ -1,16 +1,63 @@
-import uuid
+from collections.abc import Iterable
 from datetime import datetime
 
 from pydantic import BaseModel
 
+from src.models.search_results import SearchResults
+from src.utils.uuid7 import uuid7, uuid7_batch
+
 
 class LastExtractedUserStatus(BaseModel):
+    """
+    A user's watermark: every search up to (last_run, last_search_id) is extracted
+    - last_run: created_at of the newest search extracted for the user
+    - last_search_id: search_id of that search, to break ties between searches
+    created at the same time. None for statuses written before watermarks were
+    exact, whose last_run is the time the ETL pipeline ran
+    """
+
     id: str
     user_id: str
     last_run: datetime
+    last_search_id: str | None = None
 
     @staticmethod
-    def create_user_status(user_id: str) -> "LastExtractedUserStatus":
+    def create_user_status(
+        user_id: str,
+        last_run: datetime | None = None,
+        last_search_id: str | None = None,
+        status_id: str | None = None,
+    ) -> "LastExtractedUserStatus":
         return LastExtractedUserStatus(
-            id=str(uuid.uuid4()), user_id=user_id, last_run=datetime.utcnow()
+            id=status_id if status_id is not None else uuid7(),
+            user_id=user_id,
+            last_run=last_run if last_run is not None else datetime.utcnow(),
+            last_search_id=last_search_id,
         )
+
+    @staticmethod
+    def from_processed_searches(
+        raw_searches: Iterable[SearchResults],
+    ) -> list["LastExtractedUserStatus"]:
+        """
+        One status per user with searches, at the newest (created_at, search_id)
+        """
+        newest_searches: dict[str, SearchResults] = {}
+        for raw_search in raw_searches:
+            newest_search: SearchResults | None = newest_searches.get(
+                raw_search.user_id
+            )
+            if newest_search is None or (
+                raw_search.created_at,
+                raw_search.search_id,
+            ) > (newest_search.created_at, newest_search.search_id):
+                newest_searches[raw_search.user_id] = raw_search
+        # ids minted in 1 batch
+        return [
+            LastExtractedUserStatus.create_user_status(
+                user_id, newest_search.created_at, newest_search.search_id, status_id
+            )
+            for status_id, (user_id, newest_search) in zip(
+                uuid7_batch(len(newest_searches)), newest_searches.items()
+            )
+        ]
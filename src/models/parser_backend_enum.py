@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class ParserBackend(str, Enum):
+    """
+    HTML parsers available to BS4SearchResultExtractor, from slowest to fastest
+    - html_parser: BS4 on top of python's html.parser, pure python
+    - lxml: BS4 on top of lxml's C parser
+    - lxml_native: lxml's C parser, walking lxml's own tree without building BS4 objects
+    """
+
+    html_parser = "html.parser"
+    lxml = "lxml"
+    lxml_native = "lxml-native"
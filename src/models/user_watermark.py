@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class UserWatermark(BaseModel):
+    """
+    A user's current watermark, from yahoo_search_engine.user_watermarks
+    - Same (last_run, last_search_id) as the user's newest LastExtractedUserStatus
+    - updated_at: when the watermark last moved forward
+    """
+
+    user_id: str
+    last_run: datetime
+    last_search_id: str | None = None
+    updated_at: datetime | None = None
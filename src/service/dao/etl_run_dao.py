@@ -0,0 +1,77 @@
+import json
+from typing import Any
+
+import toml
+from sqlalchemy import TextClause, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.utils.async_retry import DATABASE_CIRCUIT_BREAKER, async_retry
+from src.utils.asyncpg_fast_path import is_transient_database_error
+from src.utils.engine_registry import get_async_engine
+from src.utils.run_metrics import RunMetrics
+
+
+class EtlRunDAO:
+    """
+    Used for:
+    - Keeping the run report of every ETL pipeline run, to compare runs over time
+
+    CRUD to yahoo_search_engine.etl_runs
+    - Insert the report of a finished run
+    """
+
+    def __init__(
+        self,
+        db_config: dict[str, Any] = toml.load("local_config/config.toml")["database"],
+    ):
+        self.__db_config: dict[str, Any] = db_config
+        self._engine: AsyncEngine = get_async_engine(self.__db_config)
+
+    @async_retry(
+        exceptions=SQLAlchemyError,
+        tries=5,
+        delay=0.01,
+        jitter=(-0.01, 0.01),
+        backoff=2,
+        budget_seconds=5,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
+    )
+    async def insert_run(self, run_metrics: RunMetrics) -> None:
+        """
+        A retried insert of the same run is ignored, as run_id is the primary key
+
+        TODO: Integration test this
+        """
+        async with self._engine.begin() as connection:
+            insert_clause: TextClause = text(
+                "INSERT into etl_runs("
+                "   run_id, "
+                "   started_at, "
+                "   finished_at, "
+                "   status, "
+                "   seconds, "
+                "   report"
+                ") values ("
+                "   :run_id, "
+                "   :started_at, "
+                "   :finished_at, "
+                "   :status, "
+                "   :seconds, "
+                "   CAST(:report AS JSONB)"
+                ") "
+                "ON CONFLICT (run_id) DO NOTHING"
+            )
+            # use named-params here to prevent SQL-injection attacks
+            await connection.execute(
+                insert_clause,
+                {
+                    "run_id": run_metrics.run_id,
+                    "started_at": run_metrics.started_at,
+                    "finished_at": run_metrics.finished_at,
+                    "status": run_metrics.status,
+                    "seconds": run_metrics.seconds,
+                    "report": json.dumps(run_metrics.to_report()),
+                },
+            )
@@ -1,20 +1,39 @@
 import asyncio
 from collections.abc import Sequence
 
+import asyncpg
 import toml
-from retry import retry
+from asyncpg.prepared_stmt import PreparedStatement
 from sqlalchemy import CursorResult, Row, TextClause, text
 from typing import Any
 
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import PoolProxiedConnection
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from src.models.extracted_search_results import ExtractedSearchResult
 from src.models.user import User
 from src.service.dao.user_dao import UserDAO
-from src.utils.construct_connection_string import (
-    construct_sqlalchemy_url_from_db_config,
+from src.utils.async_retry import DATABASE_CIRCUIT_BREAKER, async_retry
+from src.utils.asyncpg_fast_path import (
+    DRIVER_ERRORS,
+    driver_connection,
+    is_transient_database_error,
+    prepare,
+    supports_fast_path,
 )
+from src.utils.engine_registry import get_async_engine
+from src.utils.model_hydration import RowHydrator
+
+
+EXTRACTED_SEARCH_RESULTS_COLUMNS: list[str] = [
+    "id",
+    "user_id",
+    "url",
+    "date",
+    "body",
+    "created_at",
+]
 
 
 class ExtractedSearchResultDAO:
@@ -23,24 +42,55 @@ class ExtractedSearchResultDAO:
     - Inserting the processed result into the final table
     - Fetch all processed results from the final table
 
-    CSV COPY a dataframe into postgres
+    Bulk inserts binary COPY into a staging table, then INSERT ... SELECT into postgres
     """
 
     def __init__(
         self,
         db_config: dict[str, Any] = toml.load("local_config/config.toml")["database"],
+        use_copy: bool = True,
     ):
         self.__db_config: dict[str, Any] = db_config
-        self._engine: AsyncEngine = create_async_engine(
-            construct_sqlalchemy_url_from_db_config(self.__db_config, use_async_pg=True)
+        # False falls back to an executemany of parameter dicts
+        self._use_copy: bool = use_copy
+        self._engine: AsyncEngine = get_async_engine(self.__db_config)
+        # hot methods run prepared statements on the asyncpg connection underneath
+        self._use_fast_path: bool = db_config.get(
+            "fast_path", False
+        ) and supports_fast_path(self._engine)
+        # rows are built without validation, unless validate_rows is set
+        self._extracted_search_result_from_row: RowHydrator[ExtractedSearchResult] = (
+            RowHydrator(ExtractedSearchResult, db_config.get("validate_rows", False))
         )
 
-    @retry(
+    @staticmethod
+    def _copy_records(
+        results: list[ExtractedSearchResult],
+    ) -> list[tuple[Any, ...]]:
+        """
+        Rows for COPY, in EXTRACTED_SEARCH_RESULTS_COLUMNS order
+        """
+        return [
+            (
+                result.id,
+                result.user_id,
+                result.url,
+                result.date,
+                result.body,
+                result.created_at,
+            )
+            for result in results
+        ]
+
+    @async_retry(
         exceptions=SQLAlchemyError,
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=5,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def insert_user(self, user: User) -> None:
         """
@@ -61,12 +111,15 @@ class ExtractedSearchResultDAO:
                 insert_clause, {"user_id": user.user_id, "created_at": user.created_at}
             )
 
-    @retry(
+    @async_retry(
         exceptions=SQLAlchemyError,
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=5,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def insert_search(self, result: ExtractedSearchResult) -> None:
         """
@@ -104,21 +157,136 @@ class ExtractedSearchResultDAO:
                 },
             )
 
-    @retry(
-        exceptions=SQLAlchemyError,
+    @async_retry(
+        # COPY runs on the asyncpg connection, whose errors are not wrapped by SQLAlchemy
+        exceptions=(SQLAlchemyError, *DRIVER_ERRORS),
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=30,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def bulk_insert(self, results: list[ExtractedSearchResult]) -> None:
         """
-        CSV copy into a temporary table
+        Binary COPY into a temporary staging table
         Then, insert from temporary table into yahoo_search_engine.extracted_search_results
 
+        - COPY skips per-row statement parsing and parameter binding, which dominates an
+        executemany at stage three's batch size of 10,000 rows
+        - Temporary tables are never WAL-logged, so the staging table costs no more than
+        an unlogged one, and it is private to the connection
+        - ON COMMIT DELETE ROWS empties the staging table after each batch, while keeping
+        it around for the next batch on the same pooled connection
+
+        Falls back to bulk_insert_executemany when use_copy is False
+
+        When fast_path is set under [database], the whole batch runs on the asyncpg
+        connection, with the INSERT ... SELECT prepared once per connection
+
+        TODO: Integration test this
+        - Retry unit test -> does it catch the SQLAlchemyError
+        """
+        if not self._use_copy:
+            await self._bulk_insert_executemany(results)
+            return
+
+        if self._use_fast_path:
+            async with driver_connection(
+                self._engine, transaction=True
+            ) as asyncpg_connection:
+                await asyncpg_connection.execute(
+                    "CREATE TEMPORARY TABLE IF NOT EXISTS "
+                    "extracted_search_results_staging "
+                    "(LIKE extracted_search_results INCLUDING DEFAULTS) "
+                    "ON COMMIT DELETE ROWS"
+                )
+                await asyncpg_connection.copy_records_to_table(
+                    "extracted_search_results_staging",
+                    records=self._copy_records(results),
+                    columns=EXTRACTED_SEARCH_RESULTS_COLUMNS,
+                )
+                # prepared after the staging table exists, which it then does for
+                # as long as the connection
+                insert_statement: PreparedStatement = await prepare(
+                    asyncpg_connection,
+                    "INSERT into extracted_search_results("
+                    "   id, "
+                    "   user_id, "
+                    "   url, "
+                    "   date, "
+                    "   body, "
+                    "   created_at"
+                    ") "
+                    "SELECT id, user_id, url, date, body, created_at "
+                    "FROM extracted_search_results_staging",
+                )
+                await insert_statement.fetch()
+            return
+
+        async with self._engine.begin() as connection:
+            create_staging_clause: TextClause = text(
+                "CREATE TEMPORARY TABLE IF NOT EXISTS extracted_search_results_staging "
+                "(LIKE extracted_search_results INCLUDING DEFAULTS) "
+                "ON COMMIT DELETE ROWS"
+            )
+            await connection.execute(create_staging_clause)
+
+            # COPY is not exposed by SQLAlchemy; use the asyncpg connection underneath,
+            # which is inside the same transaction
+            raw_connection: PoolProxiedConnection = (
+                await connection.get_raw_connection()
+            )
+            copy_connection: asyncpg.Connection = raw_connection.driver_connection
+            await copy_connection.copy_records_to_table(
+                "extracted_search_results_staging",
+                records=self._copy_records(results),
+                columns=EXTRACTED_SEARCH_RESULTS_COLUMNS,
+            )
+
+            insert_clause: TextClause = text(
+                "INSERT into extracted_search_results("
+                "   id, "
+                "   user_id, "
+                "   url, "
+                "   date, "
+                "   body, "
+                "   created_at"
+                ") "
+                "SELECT id, user_id, url, date, body, created_at "
+                "FROM extracted_search_results_staging"
+            )
+            await connection.execute(insert_clause)
+
+    @async_retry(
+        exceptions=SQLAlchemyError,
+        tries=5,
+        delay=0.01,
+        jitter=(-0.01, 0.01),
+        backoff=2,
+        budget_seconds=30,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
+    )
+    async def bulk_insert_executemany(
+        self, results: list[ExtractedSearchResult]
+    ) -> None:
+        """
+        Fallback for bulk_insert, for when COPY is unavailable
+        - executemany of parameter dicts
+
         TODO: Integration test this
         - Retry unit test -> does it catch the SQLAlchemyError
         """
+        await self._bulk_insert_executemany(results)
+
+    async def _bulk_insert_executemany(
+        self, results: list[ExtractedSearchResult]
+    ) -> None:
+        """
+        Not decorated, so that bulk_insert's fallback does not retry twice over
+        """
         async with self._engine.begin() as connection:
             insert_clause: TextClause = text(
                 "INSERT into extracted_search_results("
@@ -152,12 +320,15 @@ class ExtractedSearchResultDAO:
             # use named-params here to prevent SQL-injection attacks
             await connection.execute(insert_clause, insert_params)
 
-    @retry(
+    @async_retry(
         exceptions=SQLAlchemyError,
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=30,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def fetch_all_searches(self) -> list[ExtractedSearchResult]:
         """
@@ -173,17 +344,7 @@ class ExtractedSearchResultDAO:
             cursor: CursorResult = await connection.execute(text_clause)
             results: Sequence[Row] = cursor.fetchall()
             results_row: list[ExtractedSearchResult] = [
-                ExtractedSearchResult.parse_obj(
-                    {
-                        "id": curr_row[0],
-                        "user_id": curr_row[1],
-                        "url": curr_row[2],
-                        "date": curr_row[3],
-                        "body": curr_row[4],
-                        "created_at": curr_row[5],
-                    }
-                )
-                for curr_row in results
+                self._extracted_search_result_from_row(curr_row) for curr_row in results
             ]
         return results_row
 
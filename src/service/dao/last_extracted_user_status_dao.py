@@ -1,20 +1,30 @@
 import asyncio
 from collections.abc import Sequence
+from datetime import datetime
 
+import asyncpg
 import toml
-from retry import retry
+from asyncpg.prepared_stmt import PreparedStatement
 from sqlalchemy import CursorResult, Row, TextClause, text
 from typing import Any
 
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from src.models.last_extracted_user_status import LastExtractedUserStatus
 from src.models.user import User
+from src.models.user_watermark import UserWatermark
 from src.service.dao.user_dao import UserDAO
-from src.utils.construct_connection_string import (
-    construct_sqlalchemy_url_from_db_config,
+from src.utils.async_retry import DATABASE_CIRCUIT_BREAKER, async_retry
+from src.utils.asyncpg_fast_path import (
+    DRIVER_ERRORS,
+    driver_connection,
+    is_transient_database_error,
+    prepare,
+    supports_fast_path,
 )
+from src.utils.engine_registry import get_async_engine
+from src.utils.model_hydration import RowHydrator
 
 
 class LastExtractedUserStatusDAO:
@@ -27,6 +37,11 @@ class LastExtractedUserStatusDAO:
     CRUD to yahoo_search_engine.last_extracted_user_status
     - Insert into table
     - Read the latest row for a given user
+    - Delete history older than a retention window
+
+    and to yahoo_search_engine.user_watermarks, its one row per user compaction
+    - Upsert the watermarks of a run, along with their history rows
+    - Read the current watermark of 1 user, or of every user
     """
 
     def __init__(
@@ -34,16 +49,28 @@ class LastExtractedUserStatusDAO:
         db_config: dict[str, Any] = toml.load("local_config/config.toml")["database"],
     ):
         self.__db_config: dict[str, Any] = db_config
-        self._engine: AsyncEngine = create_async_engine(
-            construct_sqlalchemy_url_from_db_config(self.__db_config, use_async_pg=True)
+        self._engine: AsyncEngine = get_async_engine(self.__db_config)
+        # hot methods run prepared statements on the asyncpg connection underneath
+        self._use_fast_path: bool = db_config.get(
+            "fast_path", False
+        ) and supports_fast_path(self._engine)
+        # rows are built without validation, unless validate_rows is set
+        self._status_from_row: RowHydrator[LastExtractedUserStatus] = RowHydrator(
+            LastExtractedUserStatus, db_config.get("validate_rows", False)
+        )
+        self._watermark_from_row: RowHydrator[UserWatermark] = RowHydrator(
+            UserWatermark, db_config.get("validate_rows", False)
         )
 
-    @retry(
+    @async_retry(
         exceptions=SQLAlchemyError,
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=5,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def insert_status(self, status: LastExtractedUserStatus) -> None:
         """
@@ -55,11 +82,13 @@ class LastExtractedUserStatusDAO:
                 "INSERT into last_extracted_user_status("
                 "   id, "
                 "   user_id, "
-                "   last_run "
+                "   last_run, "
+                "   last_search_id "
                 ") values ("
                 "   :id, "
                 "   :user_id, "
-                "   :last_run "
+                "   :last_run, "
+                "   :last_search_id "
                 ")"
             )
             # use named-params here to prevent SQL-injection attacks
@@ -69,24 +98,53 @@ class LastExtractedUserStatusDAO:
                     "id": status.id,
                     "user_id": status.user_id,
                     "last_run": status.last_run,
+                    "last_search_id": status.last_search_id,
                 },
             )
 
+    @async_retry(
+        exceptions=(SQLAlchemyError, *DRIVER_ERRORS),
+        tries=5,
+        delay=0.01,
+        jitter=(-0.01, 0.01),
+        backoff=2,
+        budget_seconds=30,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
+    )
     async def bulk_insert_status(self, statuses: list[LastExtractedUserStatus]) -> None:
         """
+        Used for:
+        - Advancing the watermarks of the users extracted by a run, in 1 batch
+
+        A retried batch may insert a status twice; readers take the newest status
+        per user, so duplicates are harmless
+
+        Runs a prepared statement on the asyncpg connection when fast_path is set
+        under [database]; this SQLAlchemy implementation is the fallback
+
         TODO: Integration test this
         - Retry unit test -> does it catch the SQLAlchemyError
         """
+        if self._use_fast_path:
+            async with driver_connection(
+                self._engine, transaction=True
+            ) as asyncpg_connection:
+                await self._insert_history_fast_path(asyncpg_connection, statuses)
+            return
+
         async with self._engine.begin() as connection:
             insert_clause: TextClause = text(
                 "INSERT into last_extracted_user_status("
                 "   id, "
                 "   user_id, "
-                "   last_run "
+                "   last_run, "
+                "   last_search_id "
                 ") values ("
                 "   :id, "
                 "   :user_id, "
-                "   :last_run "
+                "   :last_run, "
+                "   :last_search_id "
                 ")"
             )
             # use named-params here to prevent SQL-injection attacks
@@ -97,28 +155,50 @@ class LastExtractedUserStatusDAO:
                         "id": status.id,
                         "user_id": status.user_id,
                         "last_run": status.last_run,
+                        "last_search_id": status.last_search_id,
                     }
                     for status in statuses
                 ],
             )
 
-    @retry(
-        exceptions=SQLAlchemyError,
+    @async_retry(
+        exceptions=(SQLAlchemyError, *DRIVER_ERRORS),
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=5,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def fetch_latest_status(self, user_id: str) -> LastExtractedUserStatus | None:
         """
+        Runs a prepared statement on the asyncpg connection when fast_path is set
+        under [database]; this SQLAlchemy implementation is the fallback
+
         Integration test this
         """
+        if self._use_fast_path:
+            async with driver_connection(self._engine) as asyncpg_connection:
+                prepared_statement: PreparedStatement = await prepare(
+                    asyncpg_connection,
+                    "SELECT id, user_id, last_run, last_search_id "
+                    "FROM last_extracted_user_status "
+                    "WHERE user_id = $1 "
+                    "ORDER BY last_run DESC, last_search_id DESC NULLS LAST "
+                    "LIMIT 1",
+                )
+                record: asyncpg.Record | None = await prepared_statement.fetchrow(
+                    user_id
+                )
+            return self._status_from_row(record) if record else None
+
         async with self._engine.begin() as connection:
             text_clause: TextClause = text(
-                "SELECT id, user_id, last_run "
+                "SELECT id, user_id, last_run, last_search_id "
                 "FROM last_extracted_user_status "
                 "WHERE user_id = :user_id "
-                "ORDER BY last_run DESC "
+                "ORDER BY last_run DESC, last_search_id DESC NULLS LAST "
                 "LIMIT 1"
             )
             cursor: CursorResult = await connection.execute(
@@ -127,24 +207,19 @@ class LastExtractedUserStatusDAO:
             results: Row | None = cursor.fetchone()
 
         results_row: LastExtractedUserStatus | None = (
-            LastExtractedUserStatus.parse_obj(
-                {
-                    "id": results[0],
-                    "user_id": results[1],
-                    "last_run": results[2],
-                }
-            )
-            if results
-            else None
+            self._status_from_row(results) if results else None
         )
         return results_row
 
-    @retry(
+    @async_retry(
         exceptions=SQLAlchemyError,
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=10,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def fetch_all_status(self) -> list[LastExtractedUserStatus]:
         """
@@ -152,21 +227,265 @@ class LastExtractedUserStatusDAO:
         """
         async with self._engine.begin() as connection:
             text_clause: TextClause = text(
-                "SELECT id, user_id, last_run " "FROM last_extracted_user_status"
+                "SELECT id, user_id, last_run, last_search_id "
+                "FROM last_extracted_user_status"
             )
             cursor: CursorResult = await connection.execute(text_clause)
             results: Sequence[Row] = cursor.fetchall()
             results_row: list[LastExtractedUserStatus] = [
-                LastExtractedUserStatus.parse_obj(
+                self._status_from_row(curr_row) for curr_row in results
+            ]
+        return results_row
+
+    @async_retry(
+        exceptions=(SQLAlchemyError, *DRIVER_ERRORS),
+        tries=5,
+        delay=0.01,
+        jitter=(-0.01, 0.01),
+        backoff=2,
+        budget_seconds=30,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
+    )
+    async def bulk_upsert_status(self, statuses: list[LastExtractedUserStatus]) -> None:
+        """
+        Used for:
+        - Advancing the watermarks of the users extracted by a run, in 1 batch
+
+        In 1 transaction
+        - Upserts each user's row in user_watermarks. A watermark only moves
+        forward: a row at or after the new (last_run, last_search_id) is left as is,
+        so a late or retried batch cannot move a user back
+        - Appends the statuses to last_extracted_user_status, as history
+
+        Runs prepared statements on the asyncpg connection when fast_path is set
+        under [database]; this SQLAlchemy implementation is the fallback
+
+        TODO: Integration test this
+        - Retry unit test -> does it catch the SQLAlchemyError
+        """
+        if self._use_fast_path:
+            async with driver_connection(
+                self._engine, transaction=True
+            ) as asyncpg_connection:
+                upsert_statement: PreparedStatement = await prepare(
+                    asyncpg_connection,
+                    "INSERT into user_watermarks("
+                    "   user_id, "
+                    "   last_run, "
+                    "   last_search_id, "
+                    "   updated_at "
+                    ") values ($1, $2, $3, $4) "
+                    "ON CONFLICT (user_id) DO UPDATE SET "
+                    "   last_run = EXCLUDED.last_run, "
+                    "   last_search_id = EXCLUDED.last_search_id, "
+                    "   updated_at = EXCLUDED.updated_at "
+                    "WHERE (EXCLUDED.last_run, COALESCE(EXCLUDED.last_search_id, '')) > "
+                    "(user_watermarks.last_run, "
+                    "COALESCE(user_watermarks.last_search_id, ''))",
+                )
+                fast_path_updated_at: datetime = datetime.utcnow()
+                await upsert_statement.executemany(
+                    [
+                        (
+                            status.user_id,
+                            status.last_run,
+                            status.last_search_id,
+                            fast_path_updated_at,
+                        )
+                        for status in statuses
+                    ]
+                )
+                await self._insert_history_fast_path(asyncpg_connection, statuses)
+            return
+
+        async with self._engine.begin() as connection:
+            upsert_clause: TextClause = text(
+                "INSERT into user_watermarks("
+                "   user_id, "
+                "   last_run, "
+                "   last_search_id, "
+                "   updated_at "
+                ") values ("
+                "   :user_id, "
+                "   :last_run, "
+                "   :last_search_id, "
+                "   :updated_at "
+                ") "
+                "ON CONFLICT (user_id) DO UPDATE SET "
+                "   last_run = EXCLUDED.last_run, "
+                "   last_search_id = EXCLUDED.last_search_id, "
+                "   updated_at = EXCLUDED.updated_at "
+                # a NULL last_search_id (not exact yet) sorts before any search_id
+                "WHERE (EXCLUDED.last_run, COALESCE(EXCLUDED.last_search_id, '')) > "
+                "(user_watermarks.last_run, "
+                "COALESCE(user_watermarks.last_search_id, ''))"
+            )
+            updated_at: datetime = datetime.utcnow()
+            # use named-params here to prevent SQL-injection attacks
+            await connection.execute(
+                upsert_clause,
+                [
                     {
-                        "id": curr_row[0],
-                        "user_id": curr_row[1],
-                        "last_run": curr_row[2],
+                        "user_id": status.user_id,
+                        "last_run": status.last_run,
+                        "last_search_id": status.last_search_id,
+                        "updated_at": updated_at,
                     }
-                )
-                for curr_row in results
+                    for status in statuses
+                ],
+            )
+            insert_clause: TextClause = text(
+                "INSERT into last_extracted_user_status("
+                "   id, "
+                "   user_id, "
+                "   last_run, "
+                "   last_search_id "
+                ") values ("
+                "   :id, "
+                "   :user_id, "
+                "   :last_run, "
+                "   :last_search_id "
+                ")"
+            )
+            await connection.execute(
+                insert_clause,
+                [
+                    {
+                        "id": status.id,
+                        "user_id": status.user_id,
+                        "last_run": status.last_run,
+                        "last_search_id": status.last_search_id,
+                    }
+                    for status in statuses
+                ],
+            )
+
+    @async_retry(
+        exceptions=SQLAlchemyError,
+        tries=5,
+        delay=0.01,
+        jitter=(-0.01, 0.01),
+        backoff=2,
+        budget_seconds=5,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
+    )
+    async def fetch_watermark(self, user_id: str) -> UserWatermark | None:
+        """
+        Used for:
+        - The current watermark of 1 user, by primary key; unlike
+        fetch_latest_status, its cost does not grow with the user's history
+
+        Integration test this
+        """
+        async with self._engine.begin() as connection:
+            text_clause: TextClause = text(
+                "SELECT user_id, last_run, last_search_id, updated_at "
+                "FROM user_watermarks "
+                "WHERE user_id = :user_id"
+            )
+            cursor: CursorResult = await connection.execute(
+                text_clause, {"user_id": user_id}
+            )
+            results: Row | None = cursor.fetchone()
+
+        return self._watermark_from_row(results) if results else None
+
+    @async_retry(
+        exceptions=SQLAlchemyError,
+        tries=5,
+        delay=0.01,
+        jitter=(-0.01, 0.01),
+        backoff=2,
+        budget_seconds=10,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
+    )
+    async def fetch_all_watermarks(self) -> list[UserWatermark]:
+        """
+        Used for:
+        - The current watermark of every user, in 1 round trip
+
+        Integration test this
+        """
+        async with self._engine.begin() as connection:
+            text_clause: TextClause = text(
+                "SELECT user_id, last_run, last_search_id, updated_at "
+                "FROM user_watermarks"
+            )
+            cursor: CursorResult = await connection.execute(text_clause)
+            results: Sequence[Row] = cursor.fetchall()
+        return [self._watermark_from_row(curr_row) for curr_row in results]
+
+    @async_retry(
+        exceptions=SQLAlchemyError,
+        tries=5,
+        delay=0.01,
+        jitter=(-0.01, 0.01),
+        backoff=2,
+        budget_seconds=30,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
+    )
+    async def delete_status_history_before(
+        self, cutoff: datetime, batch_size: int
+    ) -> int:
+        """
+        Used for:
+        - Compacting last_extracted_user_status, 1 bounded batch per transaction
+
+        Deletes up to batch_size history rows with last_run before cutoff, and
+        behind their user's current watermark. A user's newest row, and the rows of
+        users without a user_watermarks row, are never deleted, so
+        fetch_latest_status keeps the same answer.
+        Each batch is its own short transaction, so a retry only redoes 1 batch.
+
+        :return: the number of rows deleted; fewer than batch_size when done
+
+        Integration test this
+        """
+        async with self._engine.begin() as connection:
+            delete_clause: TextClause = text(
+                "DELETE FROM last_extracted_user_status "
+                "WHERE id IN ("
+                "   SELECT h.id "
+                "   FROM last_extracted_user_status h "
+                "   JOIN user_watermarks w ON w.user_id = h.user_id "
+                "   WHERE h.last_run < :cutoff "
+                "   AND (h.last_run, COALESCE(h.last_search_id, '')) < "
+                "   (w.last_run, COALESCE(w.last_search_id, '')) "
+                "   LIMIT :batch_size"
+                ")"
+            )
+            cursor: CursorResult = await connection.execute(
+                delete_clause, {"cutoff": cutoff, "batch_size": batch_size}
+            )
+        return cursor.rowcount
+
+    @staticmethod
+    async def _insert_history_fast_path(
+        asyncpg_connection: asyncpg.Connection,
+        statuses: list[LastExtractedUserStatus],
+    ) -> None:
+        """
+        Appends statuses to last_extracted_user_status, on the caller's transaction
+        """
+        prepared_statement: PreparedStatement = await prepare(
+            asyncpg_connection,
+            "INSERT into last_extracted_user_status("
+            "   id, "
+            "   user_id, "
+            "   last_run, "
+            "   last_search_id "
+            ") values ($1, $2, $3, $4)",
+        )
+        await prepared_statement.executemany(
+            [
+                (status.id, status.user_id, status.last_run, status.last_search_id)
+                for status in statuses
             ]
-        return results_row
+        )
 
 
 if __name__ == "__main__":
@@ -1,21 +1,29 @@
 import asyncio
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
 from datetime import datetime
 
+import asyncpg
 import toml
-from retry import retry
+from asyncpg.prepared_stmt import PreparedStatement
 from sqlalchemy import CursorResult, Row, TextClause, text
 from typing import Any
 
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncResult
 
 from src.models.search_results import SearchResults
 from src.models.user import User
 from src.service.dao.user_dao import UserDAO
-from src.utils.construct_connection_string import (
-    construct_sqlalchemy_url_from_db_config,
+from src.utils.async_retry import DATABASE_CIRCUIT_BREAKER, async_retry
+from src.utils.asyncpg_fast_path import (
+    DRIVER_ERRORS,
+    driver_connection,
+    is_transient_database_error,
+    prepare,
+    supports_fast_path,
 )
+from src.utils.engine_registry import get_async_engine
+from src.utils.model_hydration import RowHydrator
 
 
 class RawSearchResultDAO:
@@ -29,16 +37,27 @@ class RawSearchResultDAO:
         db_config: dict[str, Any] = toml.load("local_config/config.toml")["database"],
     ):
         self.__db_config: dict[str, Any] = db_config
-        self._engine: AsyncEngine = create_async_engine(
-            construct_sqlalchemy_url_from_db_config(self.__db_config, use_async_pg=True)
+        self._engine: AsyncEngine = get_async_engine(self.__db_config)
+        # rows buffered per round trip when streaming from a server-side cursor
+        self._fetch_size: int = db_config.get("fetch_size", 100)
+        # hot methods run prepared statements on the asyncpg connection underneath
+        self._use_fast_path: bool = db_config.get(
+            "fast_path", False
+        ) and supports_fast_path(self._engine)
+        # rows are built without validation, unless validate_rows is set
+        self._search_results_from_row: RowHydrator[SearchResults] = RowHydrator(
+            SearchResults, db_config.get("validate_rows", False)
         )
 
-    @retry(
+    @async_retry(
         exceptions=SQLAlchemyError,
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=5,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def insert_search(self, result: SearchResults) -> None:
         """
@@ -77,12 +96,15 @@ class RawSearchResultDAO:
                 },
             )
 
-    @retry(
-        exceptions=SQLAlchemyError,
+    @async_retry(
+        exceptions=(SQLAlchemyError, *DRIVER_ERRORS),
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=10,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def fetch_searches_for_user(
         self, user_id: str, last_run: datetime
@@ -91,8 +113,26 @@ class RawSearchResultDAO:
         Used for:
         - Retrieving search result for 1 user since last run of ETL pipeline
 
+        Runs a prepared statement on the asyncpg connection when fast_path is set
+        under [database]; this SQLAlchemy implementation is the fallback
+
         Integration test this
         """
+        if self._use_fast_path:
+            async with driver_connection(self._engine) as asyncpg_connection:
+                prepared_statement: PreparedStatement = await prepare(
+                    asyncpg_connection,
+                    "SELECT search_id, user_id, "
+                    "search_term, result, created_at "
+                    "FROM search_results "
+                    "WHERE created_at >= $1 "
+                    "AND user_id = $2",
+                )
+                records: list[asyncpg.Record] = await prepared_statement.fetch(
+                    last_run, user_id
+                )
+            return [self._search_results_from_row(record) for record in records]
+
         async with self._engine.begin() as connection:
             text_clause: TextClause = text(
                 "SELECT search_id, user_id, "
@@ -110,25 +150,211 @@ class RawSearchResultDAO:
             )
             results: Sequence[Row] = cursor.fetchall()
             results_row: list[SearchResults] = [
-                SearchResults.parse_obj(
-                    {
-                        "search_id": curr_row[0],
-                        "user_id": curr_row[1],
-                        "search_term": curr_row[2],
-                        "result": curr_row[3],
-                        "created_at": curr_row[4],
-                    }
-                )
-                for curr_row in results
+                self._search_results_from_row(curr_row) for curr_row in results
             ]
         return results_row
 
-    @retry(
+    @async_retry(
+        exceptions=SQLAlchemyError,
+        tries=5,
+        delay=0.01,
+        jitter=(-0.01, 0.01),
+        backoff=2,
+        budget_seconds=10,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
+    )
+    async def fetch_oldest_unprocessed_created_at(self) -> datetime | None:
+        """
+        Used for:
+        - Measuring how far behind the ETL pipeline is (its freshness lag)
+
+        The created_at of the oldest search that stream_searches_since_last_run would
+        return, with the same watermark predicate; None when every search is processed
+
+        Integration test this
+        """
+        async with self._engine.begin() as connection:
+            text_clause: TextClause = text(
+                "SELECT min(s.created_at) "
+                "FROM search_results s "
+                "LEFT JOIN user_watermarks latest_status "
+                "ON latest_status.user_id = s.user_id "
+                "WHERE latest_status.user_id IS NULL "
+                "OR (latest_status.last_search_id IS NULL "
+                "   AND s.created_at >= latest_status.last_run) "
+                "OR (s.created_at, s.search_id) > "
+                "(latest_status.last_run, latest_status.last_search_id)"
+            )
+            cursor: CursorResult = await connection.execute(text_clause)
+            oldest_created_at: datetime | None = cursor.scalar_one()
+        return oldest_created_at
+
+    @async_retry(
+        exceptions=SQLAlchemyError,
+        tries=5,
+        delay=0.01,
+        jitter=(-0.01, 0.01),
+        backoff=2,
+        budget_seconds=10,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
+    )
+    async def fetch_searches_by_ids(
+        self, search_ids: Sequence[str]
+    ) -> list[SearchResults]:
+        """
+        Used for:
+        - The ETL pipeline's tail mode: fetching the searches it was notified of
+
+        Returns every notified search still in search_results, even one behind its
+        user's watermark: a search whose transaction committed after a newer search
+        of the same user was notified late, after the newer one moved the watermark
+        past it, and was never extracted. The pipeline skips the ones its catch-up
+        scan already extracted (see ETLPipeline.run_tail). Ordered by user, then
+        watermark order
+        """
+        async with self._engine.begin() as connection:
+            text_clause: TextClause = text(
+                "SELECT s.search_id, s.user_id, "
+                "s.search_term, s.result, s.created_at "
+                "FROM search_results s "
+                "WHERE s.search_id = ANY(CAST(:search_ids AS VARCHAR[])) "
+                "ORDER BY s.user_id, s.created_at, s.search_id"
+            )
+            # use named-params here to prevent SQL-injection attacks
+            cursor: CursorResult = await connection.execute(
+                text_clause, {"search_ids": list(search_ids)}
+            )
+            results: Sequence[Row] = cursor.fetchall()
+        return [self._search_results_from_row(curr_row) for curr_row in results]
+
+    async def stream_searches_since_last_run(
+        self,
+    ) -> AsyncIterator[list[SearchResults]]:
+        """
+        Used for:
+        - Retrieving the search results of every user since their own last run of
+        the ETL pipeline, in a single statement
+
+        Replaces calling fetch_latest_status + fetch_searches_for_user once per user
+        (2N + 1 round trips) with one join against each user's current watermark.
+        - user_watermarks holds 1 row per user, so the join is a primary key lookup,
+        whatever the size of the last_extracted_user_status history
+        - Users without a watermark get everything
+        - Searches strictly after the (last_run, last_search_id) watermark are
+        returned, so a search is neither skipped nor extracted twice. Statuses
+        without a last_search_id (written before watermarks were exact) keep the old
+        created_at >= last_run behaviour
+        - Rows are ordered by user, then watermark order, so they are yielded grouped
+        by user
+
+        Rows are streamed from a server-side cursor, fetch_size rows per round trip,
+        so only one user's searches are held in memory at a time.
+
+        Not decorated with @async_retry, as an async generator cannot be re-run safely
+        once it has yielded rows downstream.
+
+        Integration test this
+        """
+        async with self._engine.begin() as connection:
+            text_clause: TextClause = text(
+                "SELECT s.search_id, s.user_id, "
+                "s.search_term, s.result, s.created_at "
+                "FROM search_results s "
+                "LEFT JOIN user_watermarks latest_status "
+                "ON latest_status.user_id = s.user_id "
+                "WHERE latest_status.user_id IS NULL "
+                "OR (latest_status.last_search_id IS NULL "
+                "   AND s.created_at >= latest_status.last_run) "
+                "OR (s.created_at, s.search_id) > "
+                "(latest_status.last_run, latest_status.last_search_id) "
+                "ORDER BY s.user_id, s.created_at, s.search_id"
+            )
+            cursor: AsyncResult = await connection.stream(
+                text_clause, execution_options={"yield_per": self._fetch_size}
+            )
+            current_user_id: str | None = None
+            current_user_rows: list[SearchResults] = []
+            async for curr_row in cursor:
+                if curr_row[1] != current_user_id:
+                    if current_user_rows:
+                        yield current_user_rows
+                    current_user_id = curr_row[1]
+                    current_user_rows = []
+                current_user_rows.append(self._search_results_from_row(curr_row))
+            # yields the last user
+            if current_user_rows:
+                yield current_user_rows
+
+    async def stream_searches_for_user(
+        self, user_id: str, last_run: datetime, fetch_size: int | None = None
+    ) -> AsyncIterator[SearchResults]:
+        """
+        Used for:
+        - fetch_searches_for_user, for users with too many searches to hold at once
+
+        Yields each search as it arrives from a server-side cursor, fetching
+        fetch_size rows (default: fetch_size under [database]) per round trip, so
+        memory is bounded by fetch_size raw HTML documents.
+
+        Not decorated with @async_retry, as an async generator cannot be re-run safely
+        once it has yielded rows downstream.
+
+        Integration test this
+        """
+        async with self._engine.begin() as connection:
+            text_clause: TextClause = text(
+                "SELECT search_id, user_id, "
+                "search_term, result, created_at "
+                "FROM search_results "
+                "WHERE created_at >= :last_run "
+                "AND user_id = :user_id"
+            )
+            cursor: AsyncResult = await connection.stream(
+                text_clause,
+                {
+                    "last_run": last_run,
+                    "user_id": user_id,
+                },
+                execution_options={"yield_per": fetch_size or self._fetch_size},
+            )
+            async for curr_row in cursor:
+                yield self._search_results_from_row(curr_row)
+
+    async def stream_all_searches(
+        self, fetch_size: int | None = None
+    ) -> AsyncIterator[SearchResults]:
+        """
+        Used for:
+        - fetch_all_searches, for backfills over the whole table
+
+        Streams like stream_searches_for_user
+
+        Integration test this
+        """
+        async with self._engine.begin() as connection:
+            text_clause: TextClause = text(
+                "SELECT search_id, user_id, "
+                "search_term, result, created_at "
+                "FROM search_results"
+            )
+            cursor: AsyncResult = await connection.stream(
+                text_clause,
+                execution_options={"yield_per": fetch_size or self._fetch_size},
+            )
+            async for curr_row in cursor:
+                yield self._search_results_from_row(curr_row)
+
+    @async_retry(
         exceptions=SQLAlchemyError,
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=30,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def fetch_all_searches(self) -> list[SearchResults]:
         """
@@ -147,16 +373,7 @@ class RawSearchResultDAO:
             cursor: CursorResult = await connection.execute(text_clause)
             results: Sequence[Row] = cursor.fetchall()
             results_row: list[SearchResults] = [
-                SearchResults.parse_obj(
-                    {
-                        "search_id": curr_row[0],
-                        "user_id": curr_row[1],
-                        "search_term": curr_row[2],
-                        "result": curr_row[3],
-                        "created_at": curr_row[4],
-                    }
-                )
-                for curr_row in results
+                self._search_results_from_row(curr_row) for curr_row in results
             ]
         return results_row
 
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any
+
+import asyncpg
+import toml
+
+from src.utils.asyncpg_fast_path import DRIVER_ERRORS
+from src.utils.construct_connection_string import (
+    construct_sqlalchemy_url_from_db_config,
+)
+from src.utils.prometheus_metrics import REGISTRY, CounterChild
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+# Notified by the search_results_inserted trigger (sql/004_search_results_notify.sql)
+SEARCH_RESULTS_CHANNEL: str = "search_results_inserted"
+
+NOTIFICATIONS_RECEIVED: CounterChild = REGISTRY.counter(
+    "etl_notifications_received_total", "search_results inserts notified to tail mode"
+).labels()
+NOTIFICATIONS_DROPPED: CounterChild = REGISTRY.counter(
+    "etl_notifications_dropped_total",
+    "Notifications dropped (too many pending, or malformed); a catch-up scan follows",
+).labels()
+
+# Errors of a listener connection that is gone, or going
+CONNECTION_ERRORS: tuple[type[BaseException], ...] = (OSError, *DRIVER_ERRORS)
+
+
+class ListenerDisconnectedError(Exception):
+    """
+    Raised by next_batch once the listener's connection is lost
+    """
+
+
+class SearchNotificationListener:
+    """
+    Used for:
+    - The ETL pipeline's tail mode: being told of every search inserted into
+    yahoo_search_engine.search_results, instead of scanning for them
+
+    LISTENs on a dedicated asyncpg connection, outside the engines' pools: a pooled
+    connection would be reset (and UNLISTENed) on every check in.
+
+    Notifications are not queued by Postgres for a listener that is not connected,
+    and pending ones are dropped past max_pending; either way, missed_notifications
+    tells the caller to fall back to a watermark scan.
+    """
+
+    def __init__(
+        self,
+        db_config: dict[str, Any] = toml.load("local_config/config.toml")["database"],
+        channel: str = SEARCH_RESULTS_CHANNEL,
+        max_pending: int = 100_000,
+        keepalive_seconds: float = 30,
+    ) -> None:
+        self._dsn: str = construct_sqlalchemy_url_from_db_config(
+            db_config, use_async_pg=False
+        )
+        self._channel: str = channel
+        self._max_pending: int = max_pending
+        # an idle connection is pinged, so a dead one is noticed without waiting
+        # for TCP to time out
+        self._keepalive_seconds: float = keepalive_seconds
+        self._connection: asyncpg.Connection | None = None
+        self._pending: deque[str] = deque()
+        self._wakeup: asyncio.Event = asyncio.Event()
+        # set when a notification was missed; cleared by connect
+        self.missed_notifications: bool = False
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def connect(self) -> None:
+        """
+        (Re)connects, and LISTENs; notifications pending from an earlier connection
+        are dropped, as the caller is expected to catch up with a watermark scan
+        """
+        await self.close()
+        connection: asyncpg.Connection = await asyncpg.connect(self._dsn)
+        await connection.add_listener(self._channel, self._on_notification)
+        connection.add_termination_listener(self._on_termination)
+        self._connection = connection
+        self._pending.clear()
+        self.missed_notifications = False
+
+    async def close(self) -> None:
+        connection: asyncpg.Connection | None = self._connection
+        self._connection = None
+        if connection is not None and not connection.is_closed():
+            try:
+                await connection.close(timeout=5)
+            except CONNECTION_ERRORS:
+                connection.terminate()
+
+    def _on_notification(
+        self, connection: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        try:
+            search_id: str = json.loads(payload)["search_id"]
+        except (ValueError, KeyError, TypeError):
+            LOGGER.warning("Malformed notification on %s: %r", channel, payload)
+            self._drop()
+            return
+        NOTIFICATIONS_RECEIVED.inc()
+        if len(self._pending) >= self._max_pending:
+            self._drop()
+            return
+        self._pending.append(search_id)
+        self._wakeup.set()
+
+    def _drop(self) -> None:
+        NOTIFICATIONS_DROPPED.inc()
+        self.missed_notifications = True
+        self._wakeup.set()
+
+    def _on_termination(self, connection: asyncpg.Connection) -> None:
+        LOGGER.warning("Lost the connection listening on %s", self._channel)
+        self._wakeup.set()
+
+    async def _wait_idle(self, stop_requested: asyncio.Event, timeout: float) -> bool:
+        """
+        Waits up to timeout seconds for a notification, a lost connection, or a stop
+        :return: False if it timed out
+        """
+        waiters: list[asyncio.Task] = [
+            asyncio.ensure_future(self._wakeup.wait()),
+            asyncio.ensure_future(stop_requested.wait()),
+        ]
+        try:
+            done, _ = await asyncio.wait(
+                waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        self._wakeup.clear()
+        return bool(done)
+
+    async def next_batch(
+        self,
+        max_batch_size: int,
+        window_seconds: float,
+        stop_requested: asyncio.Event,
+    ) -> list[str]:
+        """
+        Micro-batches notifications: waits for the first one, then gathers more for
+        up to window_seconds, or until max_batch_size search_ids are pending
+        :return: the search_ids notified, oldest first; empty once stop_requested,
+        or when missed_notifications is set, which calls for a catch-up scan
+        :raises ListenerDisconnectedError: once the connection is lost
+        """
+        while not self._pending:
+            if stop_requested.is_set() or self.missed_notifications:
+                return []
+            if not self.is_connected:
+                raise ListenerDisconnectedError(f"Not listening on {self._channel}")
+            if not await self._wait_idle(stop_requested, self._keepalive_seconds):
+                await self._keepalive()
+
+        # a stop is only noticed between notifications here, as the window is short
+        deadline: float = asyncio.get_running_loop().time() + window_seconds
+        while (
+            len(self._pending) < max_batch_size
+            and not stop_requested.is_set()
+            and self.is_connected
+        ):
+            remaining: float = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), remaining)
+            except TimeoutError:
+                break
+            finally:
+                self._wakeup.clear()
+        return [
+            self._pending.popleft()
+            for _ in range(min(max_batch_size, len(self._pending)))
+        ]
+
+    async def _keepalive(self) -> None:
+        connection: asyncpg.Connection | None = self._connection
+        if connection is None:
+            return
+        try:
+            await connection.fetchval("SELECT 1")
+        except CONNECTION_ERRORS:
+            LOGGER.warning("Listener connection on %s failed its ping", self._channel)
+            connection.terminate()
@@ -2,17 +2,17 @@ import asyncio
 from collections.abc import Sequence
 
 import toml
-from retry import retry
 from sqlalchemy import CursorResult, Row, TextClause, text
 from typing import Any
 
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from src.models.user import User
-from src.utils.construct_connection_string import (
-    construct_sqlalchemy_url_from_db_config,
-)
+from src.utils.async_retry import DATABASE_CIRCUIT_BREAKER, async_retry
+from src.utils.asyncpg_fast_path import is_transient_database_error
+from src.utils.engine_registry import get_async_engine
+from src.utils.model_hydration import RowHydrator
 
 
 class UserDAO:
@@ -31,16 +31,21 @@ class UserDAO:
         db_config: dict[str, Any] = toml.load("local_config/config.toml")["database"],
     ):
         self.__db_config: dict[str, Any] = db_config
-        self._engine: AsyncEngine = create_async_engine(
-            construct_sqlalchemy_url_from_db_config(self.__db_config, use_async_pg=True)
+        self._engine: AsyncEngine = get_async_engine(self.__db_config)
+        # rows are built without validation, unless validate_rows is set
+        self._user_from_row: RowHydrator[User] = RowHydrator(
+            User, db_config.get("validate_rows", False)
         )
 
-    @retry(
+    @async_retry(
         exceptions=SQLAlchemyError,
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=5,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def insert_user(self, user: User) -> None:
         """
@@ -61,12 +66,15 @@ class UserDAO:
                 insert_clause, {"user_id": user.user_id, "created_at": user.created_at}
             )
 
-    @retry(
+    @async_retry(
         exceptions=SQLAlchemyError,
         tries=5,
         delay=0.01,
         jitter=(-0.01, 0.01),
         backoff=2,
+        budget_seconds=10,
+        circuit_breaker=DATABASE_CIRCUIT_BREAKER,
+        retry_if=is_transient_database_error,
     )
     async def fetch_all_users(self) -> list[User]:
         """
@@ -77,13 +85,7 @@ class UserDAO:
             cursor: CursorResult = await connection.execute(text_clause)
             results: Sequence[Row] = cursor.fetchall()
             results_row: list[User] = [
-                User.parse_obj(
-                    {
-                        "user_id": curr_row[0],
-                        "created_at": curr_row[1],
-                    }
-                )
-                for curr_row in results
+                self._user_from_row(curr_row) for curr_row in results
             ]
         return results_row
 
@@ -1,6 +1,10 @@
 from src.models.extracted_text_group import ExtractedTextGroup
 from src.models.extracted_search_results import ExtractedSearchResult
-from src.service.extractors.search_result_extractor_abc import SearchResultExtractor
+from src.models.parser_backend_enum import ParserBackend
+from src.service.extractors.search_result_extractor_abc import (
+    ExtractorGroupStats,
+    SearchResultExtractor,
+)
 from src.utils.recursive_bs4_extract_text_utils import bs4_recursive_extract_text
 
 
@@ -13,20 +17,37 @@ class BS4SearchResultExtractor(SearchResultExtractor):
     Assume Search Results from Yahoo always appears in a <ul> or <ol>
     - Each component within the same <li> are a single search result
     - Search results have at least a body + date; filter out those that don't
+
+    parser picks the HTML parser; every backend produces the same search results on
+    well-formed pages
+    - ParserBackend.lxml_native skips building BS4 objects altogether
+    - Each parser repairs malformed HTML its own way, so each one's results get
+    their own version in the extraction cache
+
+    prune only walks the <ul> / <ol> result containers, skipping the rest of the page
+    - <script> / <style> / <noscript> text inside a result is dropped, so pruned
+    results get their own version in the extraction cache
     """
 
-    def __init__(self) -> None:
-        return
+    def __init__(
+        self, parser: ParserBackend = ParserBackend.html_parser, prune: bool = False
+    ) -> None:
+        self._parser: ParserBackend = parser
+        self._prune: bool = prune
+        self.group_stats: ExtractorGroupStats = ExtractorGroupStats()
+        self.version = f"{self.version}-{parser.value}"
+        if prune:
+            self.version = f"{self.version}-pruned"
 
     def extract(self, html: str, user_id: str) -> list[ExtractedSearchResult]:
-        unfiltered_group: list[ExtractedTextGroup] = bs4_recursive_extract_text(html)
-        filtered_group: list[ExtractedTextGroup] = [
-            # for any group with >= 2 header, append it
-            group for group in unfiltered_group if group.information_count >= 2
-        ]
+        unfiltered_group: list[ExtractedTextGroup] = bs4_recursive_extract_text(
+            html, self._parser, self._prune
+        )
+        filtered_group: list[ExtractedTextGroup] = self._search_result_groups(
+            unfiltered_group
+        )
         # Changing from list[ExtractedTextGroup] to list[ExtractedSearchResult]
-        extracted_search_results: list[ExtractedSearchResult] = [
-            ExtractedSearchResult.from_extracted_text_group(user_id, group)
-            for group in filtered_group
-        ]
+        extracted_search_results: list[ExtractedSearchResult] = (
+            ExtractedSearchResult.from_extracted_text_groups(user_id, filtered_group)
+        )
         return extracted_search_results
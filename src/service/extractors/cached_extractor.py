@@ -0,0 +1,205 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.service.extractors.search_result_extractor_abc import (
+    ExtractorGroupStats,
+    SearchResultExtractor,
+)
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+# (url, date, body) of each search result extracted from a document
+ExtractedFields = tuple[tuple[str | None, str | None, str | None], ...]
+
+# the on-disk tier is checked against max_disk_bytes every this many writes
+DISK_SWEEP_INTERVAL: int = 256
+
+
+@dataclass
+class ExtractionCacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups: int = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class CachedSearchResultExtractor(SearchResultExtractor):
+    """
+    Content-addressed cache in front of another SearchResultExtractor
+
+    Many raw searches are byte-identical HTML (E.G the same user re-running the same
+    search_term minutes apart), so there is no need to parse them again.
+    - Keyed by a blake2b digest of the HTML, plus the wrapped extractor's class and
+    version, which covers its settings that change its output (E.G the parser)
+    - Stores only the extracted (url, date, body) per search result; id, user_id and
+    created_at are generated fresh for every call, like an uncached extract
+    - Evicts the least recently used document past max_entries
+    - Optional on-disk tier in cache_dir, shared across runs and worker processes;
+    past max_disk_bytes, its least recently used files are deleted. A file that
+    cannot be read back (E.G truncated) is a miss, and is deleted
+
+    stats counts hits / misses, to see the savings per run
+    """
+
+    def __init__(
+        self,
+        result_extractor: SearchResultExtractor,
+        max_entries: int = 1024,
+        cache_dir: str | None = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.result_extractor: SearchResultExtractor = result_extractor
+        self.version = result_extractor.version
+        self._max_entries: int = max_entries
+        self._cache_dir: str | None = cache_dir
+        self._max_disk_bytes: int = max_disk_bytes
+        self._disk_writes_since_sweep: int = 0
+        self._entries: OrderedDict[str, ExtractedFields] = OrderedDict()
+        self.stats: ExtractionCacheStats = ExtractionCacheStats()
+        # groups are only found on a miss, by the wrapped extractor: the same
+        # object, so that its counts are the cache's
+        self.group_stats: ExtractorGroupStats = result_extractor.group_stats
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._evict_from_disk()
+
+    def cache_key(self, html: str) -> str:
+        digest: str = hashlib.blake2b(html.encode(), digest_size=16).hexdigest()
+        return f"{type(self.result_extractor).__name__}-{self.version}-{digest}"
+
+    def lookup(self, html: str, user_id: str) -> list[ExtractedSearchResult] | None:
+        """
+        Returns the cached search results for html, or None on a miss
+        """
+        key: str = self.cache_key(html)
+        extracted_fields: ExtractedFields | None = self._entries.get(key)
+        if extracted_fields is not None:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        else:
+            extracted_fields = self._read_from_disk(key)
+            if extracted_fields is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._store_in_memory(key, extracted_fields)
+        return ExtractedSearchResult.create_search_results(user_id, extracted_fields)
+
+    def store(self, html: str, results: list[ExtractedSearchResult]) -> None:
+        key: str = self.cache_key(html)
+        extracted_fields: ExtractedFields = tuple(
+            (result.url, result.date, result.body) for result in results
+        )
+        self._store_in_memory(key, extracted_fields)
+        self._write_to_disk(key, extracted_fields)
+
+    def extract(self, html: str, user_id: str) -> list[ExtractedSearchResult]:
+        cached_results: list[ExtractedSearchResult] | None = self.lookup(html, user_id)
+        if cached_results is not None:
+            return cached_results
+        results: list[ExtractedSearchResult] = self.result_extractor.extract(
+            html, user_id
+        )
+        self.store(html, results)
+        return results
+
+    def _store_in_memory(self, key: str, extracted_fields: ExtractedFields) -> None:
+        self._entries[key] = extracted_fields
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_from_disk(self, key: str) -> ExtractedFields | None:
+        if not self._cache_dir:
+            return None
+        file_path: str = os.path.join(self._cache_dir, f"{key}.json")
+        try:
+            with open(file_path, "r") as file:
+                line_in_file: str = file.readline()
+            extracted_fields: ExtractedFields = tuple(
+                tuple(fields) for fields in json.loads(line_in_file)
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError):
+            LOGGER.warning("Deleting unreadable extraction cache file %s", file_path)
+            self._delete_from_disk(file_path)
+            return None
+        try:
+            # its modification time is its last use, for _evict_from_disk
+            os.utime(file_path)
+        except OSError:
+            pass
+        return extracted_fields
+
+    def _write_to_disk(self, key: str, extracted_fields: ExtractedFields) -> None:
+        if not self._cache_dir:
+            return
+        file_path: str = os.path.join(self._cache_dir, f"{key}.json")
+        # write then rename, so that concurrent readers never see a partial file
+        try:
+            file_descriptor, temporary_file_path = tempfile.mkstemp(
+                dir=self._cache_dir, suffix=".tmp"
+            )
+            try:
+                with os.fdopen(file_descriptor, "w") as file:
+                    file.write(json.dumps(extracted_fields))
+                os.replace(temporary_file_path, file_path)
+            except BaseException:
+                self._delete_from_disk(temporary_file_path)
+                raise
+        except OSError:
+            # E.G a full disk; the results are still cached in memory
+            LOGGER.warning("Could not write extraction cache file %s", file_path)
+            return
+        self._disk_writes_since_sweep += 1
+        if self._disk_writes_since_sweep >= DISK_SWEEP_INTERVAL:
+            self._evict_from_disk()
+
+    def _evict_from_disk(self) -> None:
+        """
+        Deletes the least recently used files of cache_dir, until they fit in
+        max_disk_bytes
+        """
+        self._disk_writes_since_sweep = 0
+        if not self._cache_dir:
+            return
+        files: list[tuple[float, int, str]] = []
+        try:
+            with os.scandir(self._cache_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json"):
+                        continue
+                    try:
+                        stat: os.stat_result = entry.stat()
+                    except FileNotFoundError:
+                        # deleted by another process in between
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            LOGGER.warning("Could not list extraction cache dir %s", self._cache_dir)
+            return
+        disk_bytes: int = sum(size for _, size, _ in files)
+        for _, size, file_path in sorted(files):
+            if disk_bytes <= self._max_disk_bytes:
+                break
+            self._delete_from_disk(file_path)
+            disk_bytes -= size
+
+    @staticmethod
+    def _delete_from_disk(file_path: str) -> None:
+        try:
+            os.unlink(file_path)
+        except OSError:
+            # already deleted, E.G by another process's sweep
+            pass
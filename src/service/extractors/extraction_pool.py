@@ -0,0 +1,146 @@
+import asyncio
+import signal
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.service.extractors.cached_extractor import CachedSearchResultExtractor
+from src.service.extractors.search_result_extractor_abc import (
+    ExtractorGroupStats,
+    SearchResultExtractor,
+)
+
+
+# A chunk's results per document, group_stats, and take_learned_state
+ChunkResult = tuple[list[list[ExtractedSearchResult]], ExtractorGroupStats, Any]
+
+
+def extract_documents(
+    result_extractor: SearchResultExtractor, documents: list[tuple[str, str]]
+) -> ChunkResult:
+    """
+    Runs inside a worker process; extracts a chunk of (html, user_id) documents
+
+    Must stay a module level function, so that it can be pickled to the workers
+
+    The extractor is a copy, so its group_stats and what it learned are returned
+    with the results, to be added to the parent process's extractor
+    """
+    result_extractor.group_stats = ExtractorGroupStats()
+    # forget what the parent had learned, so that only this chunk's is returned
+    result_extractor.take_learned_state()
+    results: list[list[ExtractedSearchResult]] = [
+        result_extractor.extract(html, user_id) for html, user_id in documents
+    ]
+    return (
+        results,
+        result_extractor.group_stats,
+        result_extractor.take_learned_state(),
+    )
+
+
+def _ignore_shutdown_signals() -> None:
+    """
+    Runs as each worker process starts
+
+    SIGTERM / SIGINT sent to the whole process group (systemd, Ctrl+C) would kill the
+    workers in the middle of a chunk; only the parent handles them, and stops the
+    workers with shutdown once the run in progress is over
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class ExtractionPool:
+    """
+    Fans CPU-bound HTML extraction out to a ProcessPoolExecutor
+
+    - BeautifulSoup parsing holds the GIL, so threads do not help; processes do
+    - Documents are sent in chunks of chunk_size, so that pickling the extractor and
+    the results is amortized over many documents
+    - The event loop only awaits the workers, so it is free to fetch and insert
+    while the workers parse
+    - Results are returned in the same order as the documents, regardless of which
+    worker finishes first
+    - What the workers' extractors learn (SearchResultExtractor.take_learned_state)
+    is merged into the parent process's extractor, so that later calls start from it
+    """
+
+    def __init__(
+        self,
+        result_extractor: SearchResultExtractor,
+        max_workers: int,
+        chunk_size: int = 16,
+    ) -> None:
+        self._result_extractor: SearchResultExtractor = result_extractor
+        self.chunk_size: int = chunk_size
+        self.max_workers: int = max_workers
+        self._executor: ProcessPoolExecutor = ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_ignore_shutdown_signals
+        )
+
+    async def extract(
+        self, documents: list[tuple[str, str]]
+    ) -> tuple[list[ExtractedSearchResult], ExtractorGroupStats]:
+        """
+        With a CachedSearchResultExtractor, the cache is checked here in the parent
+        process, and only the cache misses are sent to the workers
+        :return: the search results, and the group stats of this call's documents
+        only; the extractor's group_stats may also count concurrent calls'
+        """
+        cached_extractor: CachedSearchResultExtractor | None = (
+            self._result_extractor
+            if isinstance(self._result_extractor, CachedSearchResultExtractor)
+            else None
+        )
+        results_per_document: list[list[ExtractedSearchResult] | None] = [
+            cached_extractor.lookup(html, user_id) if cached_extractor else None
+            for html, user_id in documents
+        ]
+        missed_documents: list[tuple[str, str]] = [
+            document
+            for document, results in zip(documents, results_per_document)
+            if results is None
+        ]
+        worker_extractor: SearchResultExtractor = (
+            cached_extractor.result_extractor
+            if cached_extractor
+            else self._result_extractor
+        )
+
+        event_loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        futures: list[asyncio.Future[ChunkResult]] = [
+            event_loop.run_in_executor(
+                self._executor,
+                extract_documents,
+                worker_extractor,
+                missed_documents[i : i + self.chunk_size],
+            )
+            for i in range(0, len(missed_documents), self.chunk_size)
+        ]
+        # gather keeps the order of the futures, not the order of completion
+        chunk_results: list[ChunkResult] = await asyncio.gather(*futures)
+        group_stats: ExtractorGroupStats = ExtractorGroupStats()
+        for _, chunk_group_stats, chunk_learned_state in chunk_results:
+            group_stats.add(chunk_group_stats)
+            worker_extractor.group_stats.add(chunk_group_stats)
+            if chunk_learned_state is not None:
+                worker_extractor.merge_learned_state(chunk_learned_state)
+        missed_results: Iterator[list[ExtractedSearchResult]] = (
+            document_results
+            for chunk_result, _, _ in chunk_results
+            for document_results in chunk_result
+        )
+
+        extracted_search_results: list[ExtractedSearchResult] = []
+        for (html, _), results in zip(documents, results_per_document):
+            if results is None:
+                results = next(missed_results)
+                if cached_extractor:
+                    cached_extractor.store(html, results)
+            extracted_search_results.extend(results)
+        return extracted_search_results, group_stats
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
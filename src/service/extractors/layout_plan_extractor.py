@@ -0,0 +1,162 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from lxml import etree
+
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.models.extracted_text_group import ExtractedTextGroup
+from src.service.extractors.search_result_extractor_abc import (
+    ExtractorGroupStats,
+    SearchResultExtractor,
+    filter_search_result_groups,
+)
+from src.utils.layout_plan_utils import (
+    SelectorPlan,
+    layout_fingerprint,
+    unplanned_containers,
+)
+from src.utils.lxml_extract_text_utils import (
+    lxml_extract_container_text,
+    lxml_extract_text_from_root,
+)
+from src.utils.recursive_bs4_extract_text_utils import group_extracted_text
+
+
+@dataclass
+class LayoutPlanStats:
+    plan_hits: int = 0
+    fallbacks: int = 0
+    plans_learned: int = 0
+
+    def add(self, other: "LayoutPlanStats") -> None:
+        self.plan_hits += other.plan_hits
+        self.fallbacks += other.fallbacks
+        self.plans_learned += other.plans_learned
+
+
+class LayoutPlanSearchResultExtractor(SearchResultExtractor):
+    """
+    Approach 1 on lxml (as ParserBackend.lxml_native), skipping the generic walk for
+    page layouts it has seen before
+
+    1. Fingerprint the page's layout (layout_fingerprint)
+    2. With a SelectorPlan for that fingerprint, walk the containers it points to.
+    If that gives fewer than plan.min_groups search results, or any other <ul> /
+    <ol> of the page holds a search result, the layout changed under the same
+    fingerprint; fall back to step 3
+    3. Otherwise walk the whole page, and learn a SelectorPlan from where its search
+    results were
+
+    Keeps the plans of the max_plans most recently used fingerprints. Across an
+    ExtractionPool, every chunk of documents starts from the plans of the parent
+    process's extractor; the plans a worker learns, and its stats, are sent back
+    with its results (take_learned_state), and merged into the parent's, so that
+    later chunks start from them.
+    """
+
+    def __init__(self, max_plans: int = 64, min_group_ratio: float = 0.5) -> None:
+        self._max_plans: int = max_plans
+        self._min_group_ratio: float = min_group_ratio
+        self._plans: OrderedDict[str, SelectorPlan] = OrderedDict()
+        self.stats: LayoutPlanStats = LayoutPlanStats()
+        # learned since the last take_learned_state; always among self._plans
+        self._unshared_fingerprints: set[str] = set()
+        self.group_stats: ExtractorGroupStats = ExtractorGroupStats()
+
+    def extract(self, html: str, user_id: str) -> list[ExtractedSearchResult]:
+        root: etree._Element | None = etree.fromstring(html, etree.HTMLParser())
+        if root is None:
+            return []
+
+        fingerprint: str = layout_fingerprint(html)
+        plan: SelectorPlan | None = self._plans.get(fingerprint)
+        if plan is not None:
+            containers: list[etree._Element] = plan.find_containers(root)
+            plan_groups: list[ExtractedTextGroup] = group_extracted_text(
+                # Keep <script> / <style> text, like the generic walk does
+                lxml_extract_container_text(root, containers, skipped_tags=frozenset())
+            )
+            groups: list[ExtractedTextGroup] = filter_search_result_groups(plan_groups)
+            if len(groups) >= plan.min_groups and not self._has_unplanned_results(
+                root, containers
+            ):
+                self.stats.plan_hits += 1
+                self._plans.move_to_end(fingerprint)
+                # only counted once used, so that a fallback is not counted twice
+                self.group_stats.record(len(plan_groups), len(groups))
+                return self._to_search_results(user_id, groups)
+            self.stats.fallbacks += 1
+
+        groups = self._search_result_groups(
+            group_extracted_text(lxml_extract_text_from_root(root))
+        )
+        if groups:
+            self._learn(
+                fingerprint, SelectorPlan.from_groups(groups, self._min_group_ratio)
+            )
+        return self._to_search_results(user_id, groups)
+
+    @staticmethod
+    def _has_unplanned_results(
+        root: etree._Element, containers: list[etree._Element]
+    ) -> bool:
+        """
+        Whether a list the plan did not reach holds a search result, which the plan
+        would silently drop. Only those lists are walked, usually small navigation
+        lists, rather than the whole page
+        """
+        other_containers: list[etree._Element] = unplanned_containers(root, containers)
+        if not other_containers:
+            return False
+        return bool(
+            filter_search_result_groups(
+                group_extracted_text(
+                    lxml_extract_container_text(
+                        root, other_containers, skipped_tags=frozenset()
+                    )
+                )
+            )
+        )
+
+    def _learn(self, fingerprint: str, plan: SelectorPlan) -> None:
+        self.stats.plans_learned += 1
+        self._unshared_fingerprints.add(fingerprint)
+        self._store(fingerprint, plan)
+
+    def _store(self, fingerprint: str, plan: SelectorPlan) -> None:
+        self._plans[fingerprint] = plan
+        self._plans.move_to_end(fingerprint)
+        while len(self._plans) > self._max_plans:
+            evicted_fingerprint, _ = self._plans.popitem(last=False)
+            self._unshared_fingerprints.discard(evicted_fingerprint)
+
+    def take_learned_state(
+        self,
+    ) -> tuple[dict[str, SelectorPlan], LayoutPlanStats]:
+        """
+        The plans learned since the last call, least recently used first, and the
+        stats counted since then
+        """
+        learned_plans: dict[str, SelectorPlan] = {
+            fingerprint: plan
+            for fingerprint, plan in self._plans.items()
+            if fingerprint in self._unshared_fingerprints
+        }
+        stats: LayoutPlanStats = self.stats
+        self._unshared_fingerprints = set()
+        self.stats = LayoutPlanStats()
+        return learned_plans, stats
+
+    def merge_learned_state(
+        self, state: tuple[dict[str, SelectorPlan], LayoutPlanStats]
+    ) -> None:
+        learned_plans, stats = state
+        for fingerprint, plan in learned_plans.items():
+            self._store(fingerprint, plan)
+        self.stats.add(stats)
+
+    @staticmethod
+    def _to_search_results(
+        user_id: str, groups: list[ExtractedTextGroup]
+    ) -> list[ExtractedSearchResult]:
+        return ExtractedSearchResult.from_extracted_text_groups(user_id, groups)
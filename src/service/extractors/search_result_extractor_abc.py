@@ -1,9 +1,70 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any
 
 from src.models.extracted_search_results import ExtractedSearchResult
+from src.models.extracted_text_group import ExtractedTextGroup
+
+
+@dataclass
+class ExtractorGroupStats:
+    """
+    - groups_found: ExtractedTextGroups found under a "[0-9]+_li"
+    - groups_filtered: groups dropped as search results, with fewer than 2 of
+    link / date / body
+    """
+
+    groups_found: int = 0
+    groups_filtered: int = 0
+
+    def record(self, groups_found: int, search_result_count: int) -> None:
+        self.groups_found += groups_found
+        self.groups_filtered += groups_found - search_result_count
+
+    def add(self, other: "ExtractorGroupStats") -> None:
+        self.record(other.groups_found, other.groups_found - other.groups_filtered)
+
+
+def filter_search_result_groups(
+    groups: list[ExtractedTextGroup],
+) -> list[ExtractedTextGroup]:
+    # for any group with >= 2 header, append it
+    return [group for group in groups if group.information_count >= 2]
 
 
 class SearchResultExtractor(ABC):
+    # Bump whenever a change to extract changes its output, to invalidate cached results
+    version: str = "1"
+    # Set by every extractor's __init__
+    group_stats: ExtractorGroupStats
+
     @abstractmethod
     def extract(self, html: str, user_id: str) -> list[ExtractedSearchResult]:
         raise NotImplementedError("Not Implemented")
+
+    def take_learned_state(self) -> Any:
+        """
+        What extract learned since the last call (E.G layout plans), and forgets it;
+        None for extractors that learn nothing
+
+        An ExtractionPool's workers extract with copies of the parent process's
+        extractor; this is sent back from them, to merge_learned_state
+        """
+        return None
+
+    def merge_learned_state(self, state: Any) -> None:
+        """
+        Adds the take_learned_state of a copy of this extractor
+        """
+
+    def _search_result_groups(
+        self, groups: list[ExtractedTextGroup]
+    ) -> list[ExtractedTextGroup]:
+        """
+        Keeps the groups with >= 2 header, counting them in group_stats
+        """
+        search_result_groups: list[ExtractedTextGroup] = filter_search_result_groups(
+            groups
+        )
+        self.group_stats.record(len(groups), len(search_result_groups))
+        return search_result_groups
@@ -0,0 +1,29 @@
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.service.extractors.search_result_extractor_abc import (
+    ExtractorGroupStats,
+    SearchResultExtractor,
+)
+from src.utils.streaming_extract_text_utils import stream_extracted_text_groups
+
+
+class StreamingSearchResultExtractor(SearchResultExtractor):
+    """
+    Approach 1, without a DOM: same search results as BS4SearchResultExtractor
+
+    Parses the HTML as a stream of tag events (html.parser.HTMLParser), keeping only
+    the currently open elements instead of a BeautifulSoup tree
+    - Memory stays flat regardless of page size
+    - Only finished ExtractedTextGroups are kept, not the elements they came from
+    """
+
+    def __init__(self, chunk_size: int = 64 * 1024) -> None:
+        self._chunk_size: int = chunk_size
+        self.group_stats: ExtractorGroupStats = ExtractorGroupStats()
+
+    def extract(self, html: str, user_id: str) -> list[ExtractedSearchResult]:
+        return ExtractedSearchResult.from_extracted_text_groups(
+            user_id,
+            self._search_result_groups(
+                list(stream_extracted_text_groups(html, self._chunk_size))
+            ),
+        )
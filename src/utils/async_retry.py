@@ -0,0 +1,182 @@
+import asyncio
+import functools
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+"""
+Retry with jittered exponential backoff, for coroutines
+
+retry.retry is synchronous: on an async def it only wraps creating the coroutine, so
+exceptions raised on await are never retried, and its time.sleep would block the
+event loop. async_retry awaits the call itself, and backs off with asyncio.sleep.
+"""
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling through an open circuit breaker
+    """
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a dependency (E.G Postgres) is down
+
+    - closed: calls go through; failure_threshold consecutive failures open it
+    - open: calls raise CircuitOpenError immediately, for reset_timeout seconds
+    - half open: after reset_timeout, one trial call goes through; success closes
+    the circuit, failure opens it again. A trial that ends any other way (an
+    exception that is not a failure of the dependency, or a cancellation) says
+    nothing about it, and lets the next call be the trial
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self._failure_threshold: int = failure_threshold
+        self._reset_timeout: float = reset_timeout
+        self._consecutive_failures: int = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight: bool = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_call(self) -> None:
+        if self._opened_at is None:
+            return
+        if (
+            time.monotonic() - self._opened_at < self._reset_timeout
+            or self._trial_in_flight
+        ):
+            raise CircuitOpenError("Circuit breaker is open")
+        self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """
+        For a call that ended without a success or a failure to record
+        """
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._trial_in_flight or (
+            self._consecutive_failures >= self._failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+@dataclass
+class RetryMetrics:
+    """
+    Per operation counters
+    - attempts: every call of the wrapped coroutine
+    - retries: attempts after the first
+    - failures: operations that raised after giving up
+    - rejections: operations failed fast by an open circuit breaker
+    """
+
+    attempts: int = 0
+    retries: int = 0
+    failures: int = 0
+    rejections: int = 0
+
+
+# operation (qualified function name) -> its RetryMetrics
+RETRY_METRICS: dict[str, RetryMetrics] = {}
+
+# Shared by every DAO, as they all talk to the same Postgres
+DATABASE_CIRCUIT_BREAKER: CircuitBreaker = CircuitBreaker()
+
+
+def async_retry(
+    exceptions: type[BaseException] | tuple[type[BaseException], ...] = Exception,
+    tries: int = 5,
+    delay: float = 0.01,
+    max_delay: float = 1.0,
+    backoff: float = 2,
+    jitter: tuple[float, float] = (0, 0),
+    budget_seconds: float | None = None,
+    circuit_breaker: CircuitBreaker | None = None,
+    retry_if: Callable[[BaseException], bool] | None = None,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Same arguments as retry.retry, plus
+    - max_delay: upper bound for a single backoff
+    - budget_seconds: total time for the operation; no retry starts past it
+    - circuit_breaker: consulted before each attempt, and told about each outcome
+    - retry_if: narrows exceptions down to the transient ones (E.G a lost
+    connection, not a constraint violation)
+
+    Only exceptions matching exceptions, and retry_if if given, are retried and
+    count as circuit breaker failures; anything else is raised at once
+    """
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        metrics: RetryMetrics = RETRY_METRICS.setdefault(
+            func.__qualname__, RetryMetrics()
+        )
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            started_at: float = time.monotonic()
+            current_delay: float = delay
+            for attempt in range(1, tries + 1):
+                if circuit_breaker is not None:
+                    try:
+                        circuit_breaker.before_call()
+                    except CircuitOpenError:
+                        metrics.rejections += 1
+                        raise
+                metrics.attempts += 1
+                if attempt > 1:
+                    metrics.retries += 1
+                try:
+                    result: T = await func(*args, **kwargs)
+                except exceptions as error:
+                    if retry_if is not None and not retry_if(error):
+                        # replaying it would fail the same way, and it says
+                        # nothing about the dependency being down
+                        if circuit_breaker is not None:
+                            circuit_breaker.release_trial()
+                        metrics.failures += 1
+                        raise
+                    if circuit_breaker is not None:
+                        circuit_breaker.record_failure()
+                    sleep_for: float = max(
+                        0.0, min(current_delay + random.uniform(*jitter), max_delay)
+                    )
+                    out_of_budget: bool = (
+                        budget_seconds is not None
+                        and time.monotonic() - started_at + sleep_for > budget_seconds
+                    )
+                    if attempt == tries or out_of_budget:
+                        metrics.failures += 1
+                        raise
+                    await asyncio.sleep(sleep_for)
+                    current_delay *= backoff
+                except BaseException:
+                    # not retried, E.G a ValueError or a CancelledError; without
+                    # this, a half open circuit would wait on its trial forever
+                    if circuit_breaker is not None:
+                        circuit_breaker.release_trial()
+                    raise
+                else:
+                    if circuit_breaker is not None:
+                        circuit_breaker.record_success()
+                    return result
+            raise AssertionError("unreachable; the last attempt returns or raises")
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,116 @@
+import weakref
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import asyncpg
+from asyncpg.prepared_stmt import PreparedStatement
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import PoolProxiedConnection
+
+"""
+Runs hot DAO queries on the asyncpg connection underneath SQLAlchemy's pool
+
+Through SQLAlchemy, every call compiles a text() clause, converts its named params to
+asyncpg's positional ones, and goes through the async adaptation layer, and every
+row is a Row built from asyncpg's Record. For small, frequent queries (1 user's
+status or searches) that overhead is of the same order as the round trip itself.
+
+The fast path checks a connection out of the same pool, and runs statements
+prepared once per connection: later calls on that connection skip parsing and
+planning on the server, and skip SQLAlchemy on the client.
+"""
+
+# Errors raised by asyncpg itself, which SQLAlchemy does not wrap on the fast path
+DRIVER_ERRORS: tuple[type[BaseException], ...] = (
+    asyncpg.PostgresError,
+    asyncpg.InterfaceError,
+)
+
+# Errors of a connection that is lost, or of a server that cannot take it right now;
+# the same statement, retried on another connection, may well succeed
+TRANSIENT_DRIVER_ERRORS: tuple[type[BaseException], ...] = (
+    OSError,
+    asyncpg.InterfaceError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.CannotConnectNowError,
+    asyncpg.AdminShutdownError,
+    asyncpg.CrashShutdownError,
+    asyncpg.TooManyConnectionsError,
+)
+
+
+def is_transient_database_error(error: BaseException) -> bool:
+    """
+    For async_retry's retry_if: whether error is worth retrying
+
+    Deterministic errors (IntegrityError, ProgrammingError, DataError, ...) fail the
+    same way every time: retrying them only delays the caller, and counting them
+    as failures would open the circuit breaker on a database that is up
+    """
+    if isinstance(error, (OperationalError, InterfaceError)):
+        return True
+    if isinstance(error, DBAPIError):
+        if error.connection_invalidated:
+            return True
+        if error.orig is not None:
+            # SQLAlchemy's adapted DBAPI error is raised from asyncpg's own
+            error = error.orig.__cause__ or error.orig
+    return isinstance(error, TRANSIENT_DRIVER_ERRORS)
+
+
+# asyncpg connection -> its prepared statements, by query
+# Weak keys, so that statements go away with connections closed by the pool
+_PREPARED_STATEMENTS: weakref.WeakKeyDictionary[
+    asyncpg.Connection, dict[str, PreparedStatement]
+] = weakref.WeakKeyDictionary()
+
+
+def supports_fast_path(engine: AsyncEngine) -> bool:
+    """
+    Only engines on the asyncpg driver have an asyncpg connection underneath
+    """
+    return engine.dialect.driver == "asyncpg"
+
+
+async def prepare(connection: asyncpg.Connection, query: str) -> PreparedStatement:
+    """
+    Returns query prepared on connection, preparing it on first use
+    """
+    prepared_statements: dict[str, PreparedStatement] = _PREPARED_STATEMENTS.setdefault(
+        connection, {}
+    )
+    prepared_statement: PreparedStatement | None = prepared_statements.get(query)
+    if prepared_statement is None:
+        prepared_statement = await connection.prepare(query)
+        prepared_statements[query] = prepared_statement
+    return prepared_statement
+
+
+def forget_prepared_statements(connection: asyncpg.Connection) -> None:
+    _PREPARED_STATEMENTS.pop(connection, None)
+
+
+@asynccontextmanager
+async def driver_connection(
+    engine: AsyncEngine, transaction: bool = False
+) -> AsyncIterator[asyncpg.Connection]:
+    """
+    Checks an asyncpg connection out of engine's pool, for the duration of the block
+    - transaction: run the block in an asyncpg transaction, committed on exit
+
+    A schema change (E.G ALTER TABLE) invalidates the statements prepared on a
+    connection; they are forgotten, so that a retry prepares them again
+    """
+    async with engine.connect() as connection:
+        raw_connection: PoolProxiedConnection = await connection.get_raw_connection()
+        asyncpg_connection: asyncpg.Connection = raw_connection.driver_connection
+        try:
+            if transaction:
+                async with asyncpg_connection.transaction():
+                    yield asyncpg_connection
+            else:
+                yield asyncpg_connection
+        except asyncpg.InvalidCachedStatementError:
+            forget_prepared_statements(asyncpg_connection)
+            raise
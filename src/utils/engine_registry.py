@@ -0,0 +1,96 @@
+import time
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+
+from src.utils.construct_connection_string import (
+    construct_sqlalchemy_url_from_db_config,
+)
+from src.utils.prometheus_metrics import REGISTRY, Gauge, PrometheusHistogram
+
+"""
+Process-wide registry of AsyncEngines, keyed by DSN
+
+Every DAO used to call create_async_engine itself, so a pipeline held one
+connection pool per DAO against the same database. DAOs sharing a db_config now
+share one engine, and therefore one connection pool.
+"""
+
+_ENGINES: dict[str, AsyncEngine] = {}
+
+POOL_CHECKOUT_WAIT: PrometheusHistogram = REGISTRY.histogram(
+    "etl_db_pool_checkout_wait_seconds",
+    "Seconds from asking the pool for a connection to holding one, pre-ping included",
+)
+POOL_CHECKED_OUT: Gauge = REGISTRY.gauge(
+    "etl_db_pool_checked_out_connections",
+    "Connections checked out of every engine's pool",
+)
+
+
+def _checked_out_connections() -> int:
+    # every engine here is built on TimedAsyncAdaptedQueuePool, a QueuePool
+    return sum(
+        engine.pool.checkedout()
+        for engine in _ENGINES.values()
+        if isinstance(engine.pool, QueuePool)
+    )
+
+
+POOL_CHECKED_OUT.set_function(_checked_out_connections)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    SQLAlchemy's pool for async engines, timing every checkout into
+    POOL_CHECKOUT_WAIT; a pool too small for the pipeline's concurrency shows up as
+    a long tail there, before it shows up as pool timeouts
+
+    connect() is timed rather than _do_get, which calls itself again when it loses a
+    race for an overflow connection
+    """
+
+    def connect(self) -> PoolProxiedConnection:
+        started: float = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+def get_async_engine(db_config: dict[str, Any]) -> AsyncEngine:
+    """
+    Returns the engine for db_config, creating it on first use
+
+    Pool settings are read from the [database] section, with SQLAlchemy's defaults
+    - pool_size: connections kept open in the pool
+    - max_overflow: connections opened beyond pool_size under load, closed on return
+    - pool_pre_ping: test connections on checkout, to survive Postgres restarts
+    - pool_recycle: seconds after which a connection is replaced; -1 never recycles
+
+    Checkouts are timed by TimedAsyncAdaptedQueuePool
+    """
+    url: str = construct_sqlalchemy_url_from_db_config(db_config, use_async_pg=True)
+    engine: AsyncEngine | None = _ENGINES.get(url)
+    if engine is None:
+        engine = create_async_engine(
+            url,
+            pool_size=db_config.get("pool_size", 5),
+            max_overflow=db_config.get("max_overflow", 10),
+            pool_pre_ping=db_config.get("pool_pre_ping", False),
+            pool_recycle=db_config.get("pool_recycle", -1),
+            poolclass=TimedAsyncAdaptedQueuePool,
+        )
+        _ENGINES[url] = engine
+    return engine
+
+
+async def dispose_all_engines() -> None:
+    """
+    Closes every pooled connection
+
+    Engines stay registered; a disposed engine opens a fresh pool if it is used again
+    """
+    for engine in _ENGINES.values():
+        await engine.dispose()
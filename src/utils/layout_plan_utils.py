@@ -0,0 +1,144 @@
+import hashlib
+import re
+from dataclasses import dataclass, field
+
+from lxml import etree
+
+from src.models.extracted_text import LI_PATTERN, ExtractedText
+from src.models.extracted_text_group import ExtractedTextGroup
+
+"""
+Learns where the search results of a page layout are, to skip the generic walk
+
+A page's layout is fingerprinted by the class attributes of its <ul> / <ol>, which
+Yahoo keeps stable across searches (E.G <ol class="reg searchCenterMiddle">).
+
+A SelectorPlan is the parent tags of the containers (the <ul> / <ol> right above
+the "[0-9]+_li") that gave search results on a page of that layout, as a trie. On
+a page of the same layout, only the elements along those paths are visited to find
+the containers again.
+
+A known fingerprint only says which (tag, class) lists a page has, not where: a
+page can hold results in a list the plan never learned. The lists the plan did not
+reach (unplanned_containers) are checked for search results before the plan's are
+trusted.
+"""
+
+LIST_TAG_PATTERN: re.Pattern = re.compile(r"<(ul|ol)\b([^>]*)>", re.IGNORECASE)
+CLASS_ATTRIBUTE_PATTERN: re.Pattern = re.compile(
+    r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE
+)
+
+
+def layout_fingerprint(html_content: str) -> str:
+    """
+    Digest of the distinct (tag, class) of every <ul> / <ol> opening tag
+
+    Scans the raw HTML with a regex, without parsing it. Distinct and sorted, so that
+    the number of results (or of nested lists inside them) does not change it
+    """
+    list_tags: set[str] = set()
+    for match in LIST_TAG_PATTERN.finditer(html_content):
+        class_match: re.Match | None = CLASS_ATTRIBUTE_PATTERN.search(match.group(2))
+        class_name: str = (
+            next(group for group in class_match.groups() if group is not None)
+            if class_match
+            else ""
+        )
+        list_tags.add(f"{match.group(1).lower()} {' '.join(class_name.split())}")
+    return hashlib.blake2b(
+        "\n".join(sorted(list_tags)).encode(), digest_size=16
+    ).hexdigest()
+
+
+def container_parent_tags(extracted_text: ExtractedText) -> tuple[str, ...]:
+    """
+    Parent tags of the <ul> / <ol> containing the search result of extracted_text
+    :return: E.G ("html", "body", "div", "ol") for a text under "html-body-div-ol-1_li"
+    """
+    for i, tag in enumerate(extracted_text.parent_tags):
+        if LI_PATTERN.match(tag):
+            return extracted_text.parent_tags[:i]
+    raise ValueError(f"{extracted_text} is not part of a search result")
+
+
+@dataclass(slots=True)
+class _PlanNode:
+    children: dict[str, "_PlanNode"] = field(default_factory=dict)
+    is_container: bool = False
+
+
+@dataclass
+class SelectorPlan:
+    """
+    Where the search results were, on a page of one layout
+    - container_paths: parent tags of each container that gave a search result
+    - min_groups: fewer search results than this, and the plan is assumed stale;
+    enough of them does not mean that every result was found (unplanned_containers)
+    """
+
+    container_paths: frozenset[tuple[str, ...]]
+    min_groups: int
+    _root: _PlanNode = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._root = _PlanNode()
+        for container_path in self.container_paths:
+            node: _PlanNode = self._root
+            for tag in container_path:
+                node = node.children.setdefault(tag, _PlanNode())
+            node.is_container = True
+
+    @classmethod
+    def from_groups(
+        cls, groups: list[ExtractedTextGroup], min_group_ratio: float = 0.5
+    ) -> "SelectorPlan":
+        """
+        groups: the search results (already filtered) of a generic walk
+        """
+        container_paths: frozenset[tuple[str, ...]] = frozenset(
+            container_parent_tags((group.link + group.date + group.body)[0])
+            for group in groups
+        )
+        return cls(container_paths, max(1, int(len(groups) * min_group_ratio)))
+
+    def find_containers(self, root: etree._Element) -> list[etree._Element]:
+        """
+        The elements of root's document at the plan's container paths
+
+        Children are labelled like lxml_extract_text does (with BS4's indexes under a
+        <ul> / <ol>); only children whose label continues a path are visited
+        """
+        containers: list[etree._Element] = []
+        root_node: _PlanNode | None = self._root.children.get(root.tag)
+        stack: list[tuple[etree._Element, _PlanNode]] = (
+            [(root, root_node)] if root_node is not None else []
+        )
+        while stack:
+            element, node = stack.pop()
+            if node.is_container:
+                containers.append(element)
+            is_list: bool = element.tag == "ul" or element.tag == "ol"
+            # index counts text nodes like BS4, as in lxml_extract_text
+            index: int = 0 if element.text is None else 1
+            for child in element:
+                if isinstance(child.tag, str):
+                    parent_tag: str = f"{index}_{child.tag}" if is_list else child.tag
+                    child_node: _PlanNode | None = node.children.get(parent_tag)
+                    if child_node is not None:
+                        stack.append((child, child_node))
+                index += 1 if child.tail is None else 2
+        return containers
+
+
+def unplanned_containers(
+    root: etree._Element, containers: list[etree._Element]
+) -> list[etree._Element]:
+    """
+    The <ul> / <ol> of root's document that are neither containers found by a plan,
+    nor inside one (their text is already part of that container's)
+    """
+    covered: set[etree._Element] = {
+        element for container in containers for element in container.iter("ul", "ol")
+    }
+    return [element for element in root.iter("ul", "ol") if element not in covered]
@@ -0,0 +1,164 @@
+from collections.abc import Iterable
+
+from lxml import etree
+
+from src.models.extracted_text import ExtractedText
+
+
+# Tags whose contents are never search result text
+SKIPPED_TAGS: frozenset[str] = frozenset({"script", "style", "noscript"})
+
+
+def lxml_extract_text(html_content: str, prune: bool = False) -> list[ExtractedText]:
+    """
+    Same as _bs4_recursive_extract_text, walking lxml's own tree
+
+    Skips building a BeautifulSoup object for every node; the parse itself runs in C
+    and releases the GIL.
+
+    lxml keeps text as .text (before the first child) and .tail (after an element)
+    instead of as child nodes. Children are re-assembled in BS4's order, so that the
+    "[0-9]+_li" indexes count text nodes like BS4 does:
+        [element.text, child_1, child_1.tail, child_2, child_2.tail, ...]
+    Comments are text nodes in BS4, so they are treated as text here too.
+
+    prune only returns search result texts, like _bs4_pruned_extract_text
+    """
+    root: etree._Element | None = etree.fromstring(html_content, etree.HTMLParser())
+    if root is None:
+        return []
+    return lxml_extract_text_from_root(root, prune)
+
+
+def lxml_extract_text_from_root(
+    root: etree._Element, prune: bool = False
+) -> list[ExtractedText]:
+    """
+    lxml_extract_text, on an already parsed document
+    """
+    if prune:
+        return lxml_extract_container_text(root)
+
+    # Comments / processing instructions outside <html> are siblings of the root
+    top_level_nodes: list[etree._Element | str] = [
+        *reversed(list(root.itersiblings(preceding=True))),
+        root,
+        *root.itersiblings(),
+    ]
+
+    extracted_texts: list[ExtractedText] = []
+    # Each entry is a node still to visit, and the parent tags of that node
+    # (for an element, its parent tags end with the element itself)
+    stack: list[tuple[etree._Element | str, tuple[str, ...]]] = [
+        (node, (node.tag,) if isinstance(node.tag, str) else ())
+        for node in reversed(top_level_nodes)
+    ]
+    while stack:
+        node, parent_tags = stack.pop()
+        if isinstance(node, str):
+            text: str = node.strip()
+            if text:  # Avoid capturing empty or whitespace-only strings
+                extracted_texts.append(
+                    ExtractedText(parent_tags=parent_tags, text=text)
+                )
+            continue
+        if not isinstance(node.tag, str):  # comment or processing instruction
+            if node.text:
+                stack.append((node.text, parent_tags + ("str",)))
+            continue
+
+        is_list: bool = node.tag == "ul" or node.tag == "ol"
+        text_parent_tags: tuple[str, ...] = parent_tags + ("str",)
+        children: list[tuple[etree._Element | str, tuple[str, ...]]] = []
+        if node.text is not None:
+            children.append((node.text, text_parent_tags))
+        for child in node:
+            index: int = len(children)
+            if not isinstance(child.tag, str):
+                children.append((child, parent_tags))
+            else:
+                parent_tag: str = f"{index}_{child.tag}" if is_list else child.tag
+                children.append((child, parent_tags + (parent_tag,)))
+            if child.tail is not None:
+                children.append((child.tail, text_parent_tags))
+        # Push children in reverse, so that they are popped in document order
+        stack.extend(reversed(children))
+    return extracted_texts
+
+
+def lxml_extract_container_text(
+    root: etree._Element,
+    containers: Iterable[etree._Element] | None = None,
+    skipped_tags: frozenset[str] = SKIPPED_TAGS,
+) -> list[ExtractedText]:
+    """
+    Only walks the elements on the path to a container, the containers, and their
+    "li" children; see _bs4_pruned_extract_text
+
+    - containers: the <ul> / <ol> to take search results from; every one by default
+    - skipped_tags: elements whose contents are dropped inside a search result
+    """
+    # Holding the elements keeps lxml from handing out new proxy objects for them,
+    # so that membership is stable
+    container_set: set[etree._Element] = set(
+        root.iter("ul", "ol") if containers is None else containers
+    )
+    # Every element that has a container below it
+    on_container_path: set[etree._Element] = set()
+    for container in container_set:
+        for ancestor in container.iterancestors():
+            if ancestor in on_container_path:
+                break
+            on_container_path.add(ancestor)
+
+    extracted_texts: list[ExtractedText] = []
+    # Each entry is a node still to visit, the parent tags of that node, and whether
+    # it is inside a search result
+    stack: list[tuple[etree._Element | str, tuple[str, ...], bool]] = [
+        (root, (root.tag,), False)
+    ]
+    while stack:
+        node, parent_tags, is_search_result = stack.pop()
+        if isinstance(node, str):
+            text: str = node.strip()
+            if text:  # Avoid capturing empty or whitespace-only strings
+                extracted_texts.append(
+                    ExtractedText(parent_tags=parent_tags, text=text)
+                )
+            continue
+        if not isinstance(node.tag, str):  # comment or processing instruction
+            if node.text:
+                stack.append((node.text, parent_tags + ("str",), True))
+            continue
+
+        is_list: bool = node.tag == "ul" or node.tag == "ol"
+        is_container: bool = node in container_set
+        text_parent_tags: tuple[str, ...] = parent_tags + ("str",)
+        children: list[tuple[etree._Element | str, tuple[str, ...], bool]] = []
+        # index counts text nodes like BS4, even those that are not walked
+        index: int = 0
+        if node.text is not None:
+            if is_search_result:
+                children.append((node.text, text_parent_tags, True))
+            index += 1
+        for child in node:
+            if not isinstance(child.tag, str):
+                if is_search_result:
+                    children.append((child, parent_tags, True))
+            else:
+                parent_tag: str = f"{index}_{child.tag}" if is_list else child.tag
+                if is_search_result:
+                    if child.tag not in skipped_tags:
+                        children.append((child, parent_tags + (parent_tag,), True))
+                elif is_container and child.tag.startswith("li"):
+                    children.append((child, parent_tags + (parent_tag,), True))
+                elif child in on_container_path or child in container_set:
+                    children.append((child, parent_tags + (parent_tag,), False))
+            index += 1
+            if child.tail is not None:
+                if is_search_result:
+                    children.append((child.tail, text_parent_tags, True))
+                index += 1
+        # Push children in reverse, so that they are popped in document order
+        stack.extend(reversed(children))
+    return extracted_texts
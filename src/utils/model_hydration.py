@@ -0,0 +1,45 @@
+from collections.abc import Mapping
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import Row
+
+"""
+Builds pydantic models from database rows, with or without validation
+
+Rows read back by the DAOs were written by the DAOs, from models that were already
+validated, and the driver has already decoded every column to its Python type.
+Trusted hydration skips validating them again, with model_construct.
+
+Values are matched to fields by column name, never by position: a SELECT whose
+columns are reordered still fills every field with its own column, and one whose
+columns are not the model's fields is rejected rather than building a model from
+whatever it selected.
+"""
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class RowHydrator(Generic[ModelT]):
+    """
+    Builds model_class from rows whose column names are its fields, in any order
+    - rows: SQLAlchemy Rows, asyncpg Records, or any mapping of column to value
+    - validate_rows: True validates every row, as for externally supplied input
+    """
+
+    def __init__(self, model_class: type[ModelT], validate_rows: bool = False) -> None:
+        self.model_class: type[ModelT] = model_class
+        self.validate_rows: bool = validate_rows
+        self._field_names: frozenset[str] = frozenset(model_class.model_fields)
+
+    def __call__(self, row: Row | Mapping[str, Any]) -> ModelT:
+        # a Row is a tuple; its _mapping is keyed by column name, like a Record
+        values: dict[str, Any] = dict(row._mapping if isinstance(row, Row) else row)
+        if values.keys() != self._field_names:
+            raise ValueError(
+                f"Columns {sorted(values)} are not the fields of "
+                f"{self.model_class.__name__}"
+            )
+        if self.validate_rows:
+            return self.model_class(**values)
+        return self.model_class.model_construct(**values)
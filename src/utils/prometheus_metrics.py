@@ -0,0 +1,346 @@
+import asyncio
+import math
+import os
+import tempfile
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+from src.utils.run_metrics import LATENCY_BUCKETS, Histogram
+
+"""
+Live metrics of a long-running pipeline, in the Prometheus text exposition format
+
+run_metrics reports 1 run once it is over; these are process-wide and cumulative, so
+that Prometheus can derive rates (rate(etl_documents_extracted_total[1m]) is docs/sec)
+while the pipeline is running. They are exposed either
+- over HTTP, by serve_metrics on the pipeline's event loop, for Prometheus to scrape
+- as a file, by write_textfile, for node_exporter's textfile collector
+
+Hot path cost: a labelled metric is bound to its label values once, with labels(),
+at import time; every later inc / observe is an attribute update on the bound child,
+without building a label dict or looking anything up. Values that already exist
+elsewhere (E.G a queue's qsize) are read by a callback, at scrape time only.
+
+Metrics are updated from the event loop thread only, and are not locked.
+"""
+
+# Prometheus text format 0.0.4
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(label_names: tuple[str, ...], label_values: tuple[str, ...]) -> str:
+    if not label_names:
+        return ""
+    return (
+        "{"
+        + ",".join(
+            f'{name}="{_escape_label_value(value)}"'
+            for name, value in zip(label_names, label_values)
+        )
+        + "}"
+    )
+
+
+class CounterChild:
+    """
+    1 counter, bound to its label values
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def samples(self, name: str, labels: str) -> list[str]:
+        return [f"{name}{labels} {_format_value(self.value)}"]
+
+
+class GaugeChild:
+    """
+    1 gauge, bound to its label values; set_function reads it at scrape time instead
+    """
+
+    __slots__ = ("_function", "value")
+
+    def __init__(self) -> None:
+        self.value: float = 0
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        """
+        function: called on every scrape; None goes back to the last set value
+        """
+        self._function = function
+
+    def get(self) -> float:
+        return self._function() if self._function is not None else self.value
+
+    def samples(self, name: str, labels: str) -> list[str]:
+        return [f"{name}{labels} {_format_value(self.get())}"]
+
+
+class HistogramChild:
+    """
+    1 histogram, bound to its label values, counting observations in fixed buckets
+    """
+
+    __slots__ = ("histogram",)
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.histogram: Histogram = Histogram(buckets=buckets)
+
+    def observe(self, value: float) -> None:
+        self.histogram.observe(value)
+
+    def samples(self, name: str, labels: str) -> list[str]:
+        # Histogram counts per bucket; Prometheus buckets are cumulative
+        label_prefix: str = labels[:-1] + "," if labels else "{"
+        lines: list[str] = []
+        cumulative: int = 0
+        for bound, bucket_count in zip(
+            self.histogram.buckets + (math.inf,), self.histogram.bucket_counts
+        ):
+            cumulative += bucket_count
+            lines.append(
+                f'{name}_bucket{label_prefix}le="{_format_value(bound)}"}} {cumulative}'
+            )
+        lines.append(f"{name}_sum{labels} {_format_value(self.histogram.total)}")
+        lines.append(f"{name}_count{labels} {self.histogram.count}")
+        return lines
+
+
+ChildT = TypeVar("ChildT", CounterChild, GaugeChild, HistogramChild)
+
+
+class Metric(Generic[ChildT]):
+    """
+    A metric family: 1 child per combination of label values
+    """
+
+    metric_type: str = ""
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple[str, ...] = ()
+    ) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.label_names: tuple[str, ...] = label_names
+        self._children: dict[tuple[str, ...], ChildT] = {}
+        if not label_names:
+            # exposed from the start, as 0, rather than from the first update
+            self.labels()
+
+    def _new_child(self) -> ChildT:
+        raise NotImplementedError
+
+    def labels(self, *label_values: str) -> ChildT:
+        """
+        The child for label_values, in label_names order; bind it once, and keep it
+        """
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"{self.name} is labelled by {self.label_names}")
+        child: ChildT | None = self._children.get(label_values)
+        if child is None:
+            child = self._children[label_values] = self._new_child()
+        return child
+
+    def render(self) -> list[str]:
+        lines: list[str] = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for label_values, child in self._children.items():
+            lines.extend(
+                child.samples(self.name, _format_labels(self.label_names, label_values))
+            )
+        return lines
+
+
+class Counter(Metric[CounterChild]):
+    """
+    Only goes up; an unlabelled counter is its own only child
+    """
+
+    metric_type = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric[GaugeChild]):
+    metric_type = "gauge"
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        self.labels().set_function(function)
+
+
+class PrometheusHistogram(Metric[HistogramChild]):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.buckets: tuple[float, ...] = buckets
+        super().__init__(name, documentation, label_names)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+
+class MetricsRegistry:
+    """
+    Every metric of the process, by name
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"{metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def counter(
+        self, name: str, documentation: str, label_names: tuple[str, ...] = ()
+    ) -> Counter:
+        counter: Counter = Counter(name, documentation, label_names)
+        self._register(counter)
+        return counter
+
+    def gauge(
+        self, name: str, documentation: str, label_names: tuple[str, ...] = ()
+    ) -> Gauge:
+        gauge: Gauge = Gauge(name, documentation, label_names)
+        self._register(gauge)
+        return gauge
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> PrometheusHistogram:
+        histogram: PrometheusHistogram = PrometheusHistogram(
+            name, documentation, label_names, buckets
+        )
+        self._register(histogram)
+        return histogram
+
+    def render(self) -> str:
+        """
+        Every metric, in the Prometheus text format
+        """
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry, which the pipeline's metrics are registered in
+REGISTRY: MetricsRegistry = MetricsRegistry()
+
+
+def write_textfile(path: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """
+    Writes registry to path, for node_exporter's textfile collector
+
+    Written to a temporary file in the same directory, then renamed over path, so
+    that the collector never reads a half-written file
+    """
+    directory: str = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w") as file:
+            file.write(registry.render())
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+async def _handle_scrape(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    registry: MetricsRegistry,
+) -> None:
+    try:
+        request_line: bytes = await reader.readline()
+        # the headers are not needed, but are read so the client is not reset
+        while (await reader.readline()).strip():
+            pass
+        parts: list[str] = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1] in ("/", "/metrics"):
+            status, content_type, body = "200 OK", CONTENT_TYPE, registry.render()
+        else:
+            status, content_type, body = "404 Not Found", "text/plain", "Not Found\n"
+        encoded_body: bytes = body.encode()
+        writer.write(
+            (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(encoded_body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("latin-1")
+            + encoded_body
+        )
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_metrics(
+    host: str = "127.0.0.1", port: int = 9464, registry: MetricsRegistry = REGISTRY
+) -> asyncio.Server:
+    """
+    Serves registry at http://host:port/metrics, on the running event loop
+
+    A scrape renders the registry between 2 pipeline steps, so it never sees a
+    metric half updated; close the returned server to stop serving
+    """
+    return await asyncio.start_server(
+        lambda reader, writer: _handle_scrape(reader, writer, registry), host, port
+    )
@@ -1,34 +1,84 @@
 import logging
 from typing import Any
 
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, PageElement, Tag
 from src.models.extracted_text import ExtractedText
 from src.models.extracted_text_group import ExtractedTextGroup
+from src.models.parser_backend_enum import ParserBackend
 from src.models.text_classification_enum import TextClassification
 from src.utils.get_search_results import get_search_results
+from src.utils.lxml_extract_text_utils import lxml_extract_text
 from src.utils.logger_utils import setup_logger
 
 
-def bs4_recursive_extract_text(html_content: str) -> list[ExtractedTextGroup]:
+# Tags whose contents are never search result text
+SKIPPED_TAGS: frozenset[str] = frozenset({"script", "style", "noscript"})
+
+
+def bs4_recursive_extract_text(
+    html_content: str,
+    parser: ParserBackend = ParserBackend.html_parser,
+    prune: bool = False,
+) -> list[ExtractedTextGroup]:
     """
     Assume only search results have "[0-9]+_li"
+
+    prune only walks the <ul> / <ol> result containers; see _bs4_pruned_extract_text
+    """
+    extracted_text: list[ExtractedText]
+    if parser == ParserBackend.lxml_native:
+        extracted_text = lxml_extract_text(html_content, prune)
+    elif prune:
+        extracted_text = _bs4_pruned_extract_text(html_content, parser)
+    else:
+        extracted_text = _bs4_recursive_extract_text(html_content, parser)
+    return group_extracted_text(extracted_text)
+
+
+def group_extracted_text(
+    extracted_text: list[ExtractedText],
+) -> list[ExtractedTextGroup]:
+    """
+    Groups consecutive search result texts with the same identifier tags
     """
-    extracted_text: list[ExtractedText] = _bs4_recursive_extract_text(html_content)
-    current_identifier = ""
-    current_group: ExtractedTextGroup | None = None
+    grouper: ExtractedTextGrouper = ExtractedTextGrouper()
     all_groups: list[ExtractedTextGroup] = []
     for current_extracted_text in extracted_text:
+        finished_group: ExtractedTextGroup | None = grouper.add(current_extracted_text)
+        if finished_group is not None:
+            all_groups.append(finished_group)
+    # appends the last group
+    last_group: ExtractedTextGroup | None = grouper.finish()
+    if last_group is not None:
+        all_groups.append(last_group)
+    return all_groups
+
+
+class ExtractedTextGrouper:
+    """
+    group_extracted_text, one extracted text at a time
+
+    add returns the previous group once a text with another identifier starts a new
+    one, so that groups can be handed out while the HTML is still being parsed
+    """
+
+    def __init__(self) -> None:
+        self._current_identifier: str = ""
+        self._current_group: ExtractedTextGroup | None = None
+
+    def add(self, current_extracted_text: ExtractedText) -> ExtractedTextGroup | None:
         # if the tag is not even "0-9_li" continue
         if not current_extracted_text.is_search_result:
-            continue
+            return None
+        finished_group: ExtractedTextGroup | None = None
         # Tags each extracted text to categorize it
         identifier: str = current_extracted_text.identifier_tags
         # if different from prev identifier, create new
-        if current_identifier != identifier:
-            if current_group is not None:
-                all_groups.append(current_group)
-            current_group = ExtractedTextGroup(identifier)
-            current_identifier = identifier
+        if self._current_identifier != identifier:
+            finished_group = self._current_group
+            self._current_group = ExtractedTextGroup(identifier)
+            self._current_identifier = identifier
+        current_group: ExtractedTextGroup | None = self._current_group
         # categorizes the extracted text into different parts of the search result,
         # such as the date, URL, or body text.
         # QUESTION THIS
@@ -46,51 +96,129 @@ def bs4_recursive_extract_text(html_content: str) -> list[ExtractedTextGroup]:
             current_group.link.append(current_extracted_text)
         elif current_group:
             current_group.body.append(current_extracted_text)
-    # appends the last group
-    if current_group is not None:
-        all_groups.append(current_group)
-    return all_groups
+        return finished_group
 
+    def finish(self) -> ExtractedTextGroup | None:
+        """
+        Returns the last group, if any
+        """
+        last_group: ExtractedTextGroup | None = self._current_group
+        self._current_identifier = ""
+        self._current_group = None
+        return last_group
 
-def _bs4_recursive_extract_text(html_content: str) -> list[ExtractedText]:
+
+def _bs4_recursive_extract_text(
+    html_content: str, parser: ParserBackend = ParserBackend.html_parser
+) -> list[ExtractedText]:
     """
-    Approach 3: Use BS4 with recursion
+    Approach 3: Use BS4 with recursion, unrolled into an explicit stack
 
     Gives the feature of the parent HTMl tags a given str belongs to
+
+    - Deeply nested pages can not hit the recursion limit
+    - Each element's parent tags are built once, as an immutable tuple extending its
+    parent's; every text directly inside an element shares the same tuple, instead of
+    every text copying its own list of parent tags at every level
     """
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # This function will recursively walk through the soup tree
-    def recurse_through_soup(
-        soup_element: BeautifulSoup | Tag,
-    ) -> list[ExtractedText]:
-        texts: list[ExtractedText] = []
-        for index, element in enumerate(soup_element.children):
-            if isinstance(
-                element, str
-            ):  # If the element is a NavigableString, capture it
-                text: str = element.strip()
-                if text:  # Avoid capturing empty or whitespace-only strings
-                    texts.append(ExtractedText(parent_tags=["str"], text=text))
-            else:  # You can add more tags as needed
-                # Recursively process each element and join its texts with a newline
+    soup = BeautifulSoup(html_content, parser.value)
+
+    extracted_texts: list[ExtractedText] = []
+    # Each entry is a node still to visit, and the parent tags of that node
+    stack: list[tuple[PageElement, tuple[str, ...]]] = [(soup, ())]
+    while stack:
+        node, parent_tags = stack.pop()
+        if isinstance(node, str):  # If the node is a NavigableString, capture it
+            text: str = node.strip()
+            if text:  # Avoid capturing empty or whitespace-only strings
+                extracted_texts.append(
+                    ExtractedText(parent_tags=parent_tags, text=text)
+                )
+            continue
+
+        # we are sure that the node here is always a Tag, and will have .contents
+        element: Tag = node  # type: ignore[assignment]
+        is_list: bool = element.name == "ul" or element.name == "ol"
+        text_parent_tags: tuple[str, ...] | None = None
+        # Push children in reverse, so that they are popped in document order
+        for index in range(len(element.contents) - 1, -1, -1):
+            child: PageElement = element.contents[index]
+            if isinstance(child, str):
+                if text_parent_tags is None:
+                    text_parent_tags = parent_tags + ("str",)
+                stack.append((child, text_parent_tags))
+            else:
                 parent_tag: str = (
-                    f"{index}_{element.name}"  # type: ignore[attr-defined]
-                    if soup_element.name == "ul" or soup_element.name == "ol"
-                    else element.name  # type: ignore[attr-defined]
+                    f"{index}_{child.name}"  # type: ignore[attr-defined]
+                    if is_list
+                    else child.name  # type: ignore[attr-defined]
+                )
+                stack.append((child, parent_tags + (parent_tag,)))
+
+    return extracted_texts
+
+
+def _bs4_pruned_extract_text(
+    html_content: str, parser: ParserBackend = ParserBackend.html_parser
+) -> list[ExtractedText]:
+    """
+    Same as _bs4_recursive_extract_text, but only returns search result texts
+
+    group_extracted_text drops every text without a "[0-9]+_li" parent tag, and only
+    children of a <ul> / <ol> whose name starts with "li" get such a tag. So
+    1. Locate every <ul> / <ol> container, and mark the elements on the path from the
+    root to each of them
+    2. Walk from the root in document order, only descending into marked elements,
+    containers, and the "li" children of containers. Parent tags (and the indexes in
+    them) are the same as in the full walk
+    3. Inside a "li" child, take every text, except <script> / <style> / <noscript>
+    contents, which the full walk would keep as body text
+    """
+    soup = BeautifulSoup(html_content, parser.value)
+
+    # ids of every element that has a <ul> / <ol> below it
+    on_container_path: set[int] = set()
+    for container in soup.find_all(["ul", "ol"]):
+        for ancestor in container.parents:
+            if id(ancestor) in on_container_path:
+                break
+            on_container_path.add(id(ancestor))
+
+    extracted_texts: list[ExtractedText] = []
+    # Each entry is a node still to visit, the parent tags of that node, and whether
+    # it is inside a search result
+    stack: list[tuple[PageElement, tuple[str, ...], bool]] = [(soup, (), False)]
+    while stack:
+        node, parent_tags, is_search_result = stack.pop()
+        if isinstance(node, str):
+            text: str = node.strip()
+            if text:  # Avoid capturing empty or whitespace-only strings
+                extracted_texts.append(
+                    ExtractedText(parent_tags=parent_tags, text=text)
                 )
-                # we are sure that the element here is always a Tag, and will have the .children attribute
-                # so, we tell mypy to ignore this error
-                sub_texts: list[ExtractedText] = recurse_through_soup(element)  # type: ignore[arg-type]
-                for sub_text in sub_texts:
-                    sub_text.parent_tags.append(parent_tag)
-                if sub_texts:
-                    texts.extend(sub_texts)
-        return texts
-
-    extracted_texts: list[ExtractedText] = recurse_through_soup(soup)
-    for extracted_text in extracted_texts:
-        extracted_text.parent_tags = list(reversed(extracted_text.parent_tags))
+            continue
+
+        element: Tag = node  # type: ignore[assignment]
+        is_list: bool = element.name == "ul" or element.name == "ol"
+        text_parent_tags: tuple[str, ...] | None = None
+        # Push children in reverse, so that they are popped in document order
+        for index in range(len(element.contents) - 1, -1, -1):
+            child: PageElement = element.contents[index]
+            if isinstance(child, str):
+                if is_search_result:
+                    if text_parent_tags is None:
+                        text_parent_tags = parent_tags + ("str",)
+                    stack.append((child, text_parent_tags, True))
+                continue
+            name: str = child.name  # type: ignore[attr-defined]
+            parent_tag: str = f"{index}_{name}" if is_list else name
+            if is_search_result:
+                if name not in SKIPPED_TAGS:
+                    stack.append((child, parent_tags + (parent_tag,), True))
+            elif is_list and name.startswith("li"):
+                stack.append((child, parent_tags + (parent_tag,), True))
+            elif id(child) in on_container_path or name == "ul" or name == "ol":
+                stack.append((child, parent_tags + (parent_tag,), False))
 
     return extracted_texts
 
@@ -0,0 +1,190 @@
+import bisect
+import json
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from src.utils.async_retry import RETRY_METRICS
+from src.utils.uuid7 import uuid7
+
+"""
+Instrumentation of 1 ETL pipeline run: where its time goes, and what it processed
+
+- Stage timers: seconds spent in each stage; a stage entered several times (E.G
+stage two once per chunk, when streaming) accumulates
+- Counters: documents, HTML bytes, search result groups, rows inserted, ...
+- Histograms: latencies (E.G per document extraction), in fixed buckets
+
+At the end of a run, to_report gives them as 1 JSON-serializable dict, which
+write_run_report saves as a file, and EtlRunDAO as a row of etl_runs.
+"""
+
+# Upper bounds, in seconds; the last bucket is unbounded
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+@dataclass
+class Histogram:
+    """
+    Counts of observations per bucket: bucket_counts[i] counts observations
+    <= buckets[i] (and > buckets[i - 1]); the last count is for everything above
+    """
+
+    buckets: tuple[float, ...] = LATENCY_BUCKETS
+    bucket_counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    max_value: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.bucket_counts:
+            self.bucket_counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max_value = max(self.max_value, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the q-th quantile; max_value for the last
+        bucket
+        """
+        rank: float = q * self.count
+        cumulative: int = 0
+        for i, bucket_count in enumerate(self.bucket_counts):
+            cumulative += bucket_count
+            if cumulative >= rank and bucket_count:
+                return self.buckets[i] if i < len(self.buckets) else self.max_value
+        return 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max_value,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                str(bound): bucket_count
+                for bound, bucket_count in zip(
+                    self.buckets + (float("inf"),), self.bucket_counts
+                )
+            },
+        }
+
+
+class RunMetrics:
+    """
+    Metrics of 1 run, identified by a time-ordered run_id
+    """
+
+    def __init__(self) -> None:
+        self.run_id: str = uuid7()
+        self.started_at: datetime = datetime.utcnow()
+        self.finished_at: datetime | None = None
+        self.status: str = "running"
+        self.stage_seconds: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self._started: float = time.perf_counter()
+        self._seconds: float | None = None
+        # RETRY_METRICS is process-wide; only this run's share is reported
+        self._retries_at_start: int = _total_retries()
+        self._retry_failures_at_start: int = _total_retry_failures()
+
+    @contextmanager
+    def time_stage(self, stage: str) -> Iterator[None]:
+        started: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[stage] = (
+                self.stage_seconds.get(stage, 0.0) + time.perf_counter() - started
+            )
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def observe(self, histogram: str, value: float) -> None:
+        current_histogram: Histogram | None = self.histograms.get(histogram)
+        if current_histogram is None:
+            current_histogram = self.histograms[histogram] = Histogram()
+        current_histogram.observe(value)
+
+    def finish(self, status: str) -> None:
+        """
+        status: "succeeded" or "failed"
+        """
+        self.status = status
+        self.finished_at = datetime.utcnow()
+        self._seconds = time.perf_counter() - self._started
+        self.counters["database_retries"] = _total_retries() - self._retries_at_start
+        self.counters["database_failures"] = (
+            _total_retry_failures() - self._retry_failures_at_start
+        )
+
+    @property
+    def seconds(self) -> float:
+        """
+        Wall clock seconds of the run, so far if it is not finished
+        """
+        return (
+            self._seconds
+            if self._seconds is not None
+            else time.perf_counter() - self._started
+        )
+
+    def to_report(self) -> dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "seconds": self.seconds,
+            "stage_seconds": self.stage_seconds,
+            "counters": self.counters,
+            "histograms": {
+                name: histogram.to_dict() for name, histogram in self.histograms.items()
+            },
+        }
+
+
+def _total_retries() -> int:
+    return sum(retry_metrics.retries for retry_metrics in RETRY_METRICS.values())
+
+
+def _total_retry_failures() -> int:
+    return sum(retry_metrics.failures for retry_metrics in RETRY_METRICS.values())
+
+
+def write_run_report(run_metrics: RunMetrics, report_dir: str) -> str:
+    """
+    Writes run_metrics as report_dir/etl_run_<run_id>.json; run_ids are time
+    ordered, so the files sort by start time
+    :return: the path of the report
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    path: str = os.path.join(report_dir, f"etl_run_{run_metrics.run_id}.json")
+    with open(path, "w") as file:
+        json.dump(run_metrics.to_report(), file, indent=2)
+    return path
@@ -0,0 +1,216 @@
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from html.parser import HTMLParser
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+from src.models.extracted_text import ExtractedText
+from src.models.extracted_text_group import ExtractedTextGroup
+from src.utils.recursive_bs4_extract_text_utils import ExtractedTextGrouper
+
+"""
+Extracts ExtractedTextGroups from tag events, without building a tree
+
+_bs4_recursive_extract_text needs the whole BeautifulSoup tree in memory before it
+can walk it. SearchResultTextParser gets the same parent tags from html.parser's
+start / end tag events instead, keeping only the currently open elements, so its
+memory does not grow with the size of the page.
+
+To give the same parent tags (and "[0-9]+_li" indexes) as BS4 on html.parser, it
+follows the tree BS4 would have built
+- No implicit closing: an end tag closes the most recent open element of its name,
+and everything opened after it; an end tag with no open element is ignored
+- Void elements (E.G <br>) close immediately, and their redundant end tag is ignored
+- Consecutive data is one text node; comments, declarations and processing
+instructions are one text node each
+- Character references are resolved like BS4 does
+"""
+
+# Elements BS4 closes as soon as they open
+EMPTY_ELEMENT_TAGS: frozenset[str] = frozenset(
+    HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS
+)
+DECIMAL_REFERENCE_WITH_FOLLOWING_DATA: re.Pattern = re.compile("^([0-9]+)(.*)")
+HEX_REFERENCE_WITH_FOLLOWING_DATA: re.Pattern = re.compile("^([0-9a-f]+)(.*)")
+
+
+@dataclass(slots=True)
+class _OpenElement:
+    """
+    An element that has started, but not ended yet
+    - child_count: child nodes so far (elements and text), to index the next child
+    - text_parent_tags: shared by every text directly inside, only for search results
+    """
+
+    name: str
+    parent_tags: tuple[str, ...]
+    is_list: bool
+    is_search_result: bool
+    text_parent_tags: tuple[str, ...] | None
+    child_count: int = 0
+
+
+class SearchResultTextParser(HTMLParser):
+    """
+    Feeds ExtractedTexts into an ExtractedTextGrouper as the HTML is parsed
+
+    Only texts below a "[0-9]+_li" are built, as group_extracted_text drops the rest.
+    Finished groups are collected until pop_groups is called.
+    """
+
+    def __init__(self) -> None:
+        # Character references are resolved in handle_charref / handle_entityref
+        super().__init__(convert_charrefs=False)
+        # The document itself is the outermost element, like the BeautifulSoup object
+        self._open_elements: list[_OpenElement] = [
+            _OpenElement("[document]", (), False, False, None)
+        ]
+        self._pending_data: list[str] = []
+        self._already_closed_empty_elements: list[str] = []
+        self._grouper: ExtractedTextGrouper = ExtractedTextGrouper()
+        self._groups: list[ExtractedTextGroup] = []
+
+    def pop_groups(self) -> list[ExtractedTextGroup]:
+        """
+        Returns the groups finished since the last call
+        """
+        groups: list[ExtractedTextGroup] = self._groups
+        self._groups = []
+        return groups
+
+    def close(self) -> None:
+        super().close()
+        self._end_data()
+        last_group: ExtractedTextGroup | None = self._grouper.finish()
+        if last_group is not None:
+            self._groups.append(last_group)
+
+    def handle_starttag(
+        self,
+        tag: str,
+        attrs: list[tuple[str, str | None]],
+        handle_empty_element: bool = True,
+    ) -> None:
+        self._end_data()
+        parent: _OpenElement = self._open_elements[-1]
+        parent_tag: str = f"{parent.child_count}_{tag}" if parent.is_list else tag
+        parent.child_count += 1
+        parent_tags: tuple[str, ...] = parent.parent_tags + (parent_tag,)
+        is_search_result: bool = parent.is_search_result or (
+            parent.is_list and tag.startswith("li")
+        )
+        self._open_elements.append(
+            _OpenElement(
+                tag,
+                parent_tags,
+                tag == "ul" or tag == "ol",
+                is_search_result,
+                parent_tags + ("str",) if is_search_result else None,
+            )
+        )
+        if handle_empty_element and tag in EMPTY_ELEMENT_TAGS:
+            self.handle_endtag(tag, check_already_closed=False)
+            # An explicit end tag may still follow; it must be ignored
+            self._already_closed_empty_elements.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_endtag(self, tag: str, check_already_closed: bool = True) -> None:
+        if check_already_closed and tag in self._already_closed_empty_elements:
+            self._already_closed_empty_elements.remove(tag)
+            return
+        self._end_data()
+        # index 0 is the document, which never closes
+        for i in range(len(self._open_elements) - 1, 0, -1):
+            if self._open_elements[i].name == tag:
+                del self._open_elements[i:]
+                break
+
+    def handle_data(self, data: str) -> None:
+        self._pending_data.append(data)
+
+    def handle_charref(self, name: str) -> None:
+        # Same as BeautifulSoupHTMLParser: unterminated references keep what follows
+        base: int = 10
+        reference_pattern: re.Pattern = DECIMAL_REFERENCE_WITH_FOLLOWING_DATA
+        if name.startswith(("x", "X")):
+            name = name[1:]
+            base = 16
+            reference_pattern = HEX_REFERENCE_WITH_FOLLOWING_DATA
+        code_point: int | None = None
+        extra_data: str = ""
+        try:
+            code_point = int(name, base)
+        except ValueError:
+            match: re.Match | None = reference_pattern.search(name)
+            if match is not None:
+                code_point = int(match.group(1), base)
+                extra_data = match.group(2)
+        if code_point is None:
+            self.handle_data(name)
+            return
+        self.handle_data(UnicodeDammit.numeric_character_reference(code_point)[0])
+        self.handle_data(extra_data)
+
+    def handle_entityref(self, name: str) -> None:
+        character: str | None = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.handle_data(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data: str) -> None:
+        self._add_text_node(data)
+
+    def handle_decl(self, decl: str) -> None:
+        self._add_text_node(decl[len("DOCTYPE ") :])
+
+    def unknown_decl(self, data: str) -> None:
+        if data.upper().startswith("CDATA["):
+            data = data[len("CDATA[") :]
+        self._add_text_node(data)
+
+    def handle_pi(self, data: str) -> None:
+        self._add_text_node(data)
+
+    def _add_text_node(self, data: str) -> None:
+        self._end_data()
+        self._pending_data.append(data)
+        self._end_data()
+
+    def _end_data(self) -> None:
+        """
+        Ends the current text node, if there is one
+        """
+        if not self._pending_data:
+            return
+        element: _OpenElement = self._open_elements[-1]
+        element.child_count += 1
+        if element.is_search_result:
+            text: str = "".join(self._pending_data).strip()
+            if text:  # Avoid capturing empty or whitespace-only strings
+                finished_group: ExtractedTextGroup | None = self._grouper.add(
+                    ExtractedText(
+                        parent_tags=element.text_parent_tags,  # type: ignore[arg-type]
+                        text=text,
+                    )
+                )
+                if finished_group is not None:
+                    self._groups.append(finished_group)
+        self._pending_data = []
+
+
+def stream_extracted_text_groups(
+    html_content: str, chunk_size: int = 64 * 1024
+) -> Iterator[ExtractedTextGroup]:
+    """
+    Same groups as bs4_recursive_extract_text, yielded as they finish
+
+    The HTML is fed chunk_size characters at a time
+    """
+    parser: SearchResultTextParser = SearchResultTextParser()
+    for i in range(0, len(html_content), chunk_size):
+        parser.feed(html_content[i : i + chunk_size])
+        yield from parser.pop_groups()
+    parser.close()
+    yield from parser.pop_groups()
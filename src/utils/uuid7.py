@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+
+"""
+Time-ordered, UUIDv7 primary keys (RFC 9562), as strings
+
+uuid.uuid4() ids are random, so every insert lands on a random page of the primary
+key's B-tree: at stage three's batch size, index maintenance dominates bulk_insert,
+and the half-filled pages bloat the index. UUIDv7 ids start with a millisecond
+timestamp, so a batch's ids are adjacent, and appended to the right of the index.
+
+Layout, most significant bits first (RFC 9562, section 6.2, method 1)
+- 48 bits: Unix timestamp in milliseconds
+- 4 bits: version (7)
+- 42 bits: counter, split around the 2 variant bits; seeded at random every new
+millisecond, with its top bit cleared so that it has room to increment
+- 32 bits: random
+Ids minted in the same process are strictly increasing: within a millisecond the
+counter increments, and when it overflows (or the clock goes backwards) the
+timestamp is moved forward by 1ms instead.
+"""
+
+_COUNTER_BITS: int = 42
+_MAX_COUNTER: int = (1 << _COUNTER_BITS) - 1
+_VERSION: int = 0x7
+_VARIANT: int = 0b10
+
+_lock: threading.Lock = threading.Lock()
+_last_timestamp_ms: int = -1
+_last_counter: int = 0
+
+
+def _random_counter() -> int:
+    # top bit cleared: at least 2^41 increments before an overflow
+    return int.from_bytes(os.urandom(6), "big") >> (48 - _COUNTER_BITS + 1)
+
+
+def _next_timestamps_and_counters(count: int) -> list[tuple[int, int]]:
+    global _last_timestamp_ms, _last_counter
+    timestamps_and_counters: list[tuple[int, int]] = []
+    with _lock:
+        timestamp_ms: int = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_timestamp_ms:
+            counter: int = _random_counter()
+        else:
+            # same millisecond, or the clock went backwards: continue from the last id
+            timestamp_ms = _last_timestamp_ms
+            counter = _last_counter + 1
+        for _ in range(count):
+            if counter > _MAX_COUNTER:
+                timestamp_ms += 1
+                counter = _random_counter()
+            timestamps_and_counters.append((timestamp_ms, counter))
+            counter += 1
+        if timestamps_and_counters:
+            _last_timestamp_ms, _last_counter = timestamps_and_counters[-1]
+    return timestamps_and_counters
+
+
+def _format(timestamp_ms: int, counter: int, random_bits: int) -> str:
+    value: int = (
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | _VERSION << 76
+        # 12 high bits of the counter, then the variant, then its 30 low bits
+        | (counter >> 30) << 64
+        | _VARIANT << 62
+        | (counter & 0x3FFF_FFFF) << 32
+        | random_bits
+    )
+    hex_value: str = f"{value:032x}"
+    return (
+        f"{hex_value[:8]}-{hex_value[8:12]}-{hex_value[12:16]}-"
+        f"{hex_value[16:20]}-{hex_value[20:]}"
+    )
+
+
+def uuid7_batch(count: int) -> list[str]:
+    """
+    count ids, increasing, and all greater than any id minted before in this process
+
+    The clock is read once, and the random bits drawn in 1 call, for the whole batch
+    """
+    random_bytes: bytes = os.urandom(4 * count)
+    return [
+        _format(
+            timestamp_ms,
+            counter,
+            int.from_bytes(random_bytes[4 * i : 4 * i + 4], "big"),
+        )
+        for i, (timestamp_ms, counter) in enumerate(
+            _next_timestamps_and_counters(count)
+        )
+    ]
+
+
+def uuid7() -> str:
+    return uuid7_batch(1)[0]
@@ -0,0 +1,29 @@
+from benchmarks.synthetic_serp import generate_corpus, generate_serp
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.service.extractors.bs4_extractor import BS4SearchResultExtractor
+
+
+def test_generate_serp_is_deterministic_and_padded_to_size() -> None:
+    html: str = generate_serp(seed=7, target_size=200_000)
+
+    assert html == generate_serp(seed=7, target_size=200_000)
+    assert html != generate_serp(seed=8, target_size=200_000)
+    assert len(html.encode()) >= 200_000
+
+
+def test_generate_serp_results_are_extracted() -> None:
+    html: str = generate_serp(seed=7, result_count=12, ad_blocks=3)
+
+    results: list[ExtractedSearchResult] = BS4SearchResultExtractor().extract(
+        html, "dummy_user_id"
+    )
+
+    assert len(results) == 12
+    assert all(result.url and result.date and result.body for result in results)
+
+
+def test_generate_corpus_sizes_stay_in_range() -> None:
+    corpus: list[str] = generate_corpus(5, seed=1, min_size=50_000, max_size=100_000)
+
+    assert len(corpus) == 5
+    assert all(50_000 <= len(html.encode()) < 110_000 for html in corpus)
@@ -0,0 +1,28 @@
+from src.models.extracted_search_results import ExtractedSearchResult
+
+"""
+High Level: results built as a batch share 1 created_at, and get increasing ids.
+"""
+
+
+def test_create_search_results_shares_created_at() -> None:
+    results: list[ExtractedSearchResult] = ExtractedSearchResult.create_search_results(
+        "user_id",
+        [
+            ("www.tesla.com › investors", "3 days ago", "Tesla body"),
+            ("reuters.com", None, "Reuters body"),
+        ],
+    )
+
+    assert [(result.url, result.date, result.body) for result in results] == [
+        ("www.tesla.com › investors", "3 days ago", "Tesla body"),
+        ("reuters.com", None, "Reuters body"),
+    ]
+    assert len({result.created_at for result in results}) == 1
+    assert [result.id for result in results] == sorted(
+        {result.id for result in results}
+    )
+
+
+def test_create_search_results_with_no_fields() -> None:
+    assert ExtractedSearchResult.create_search_results("user_id", []) == []
@@ -0,0 +1,52 @@
+from src.models.extracted_text import ExtractedText
+from src.models.text_classification_enum import TextClassification
+
+
+def test_extracted_text_is_slotted() -> None:
+    extracted_text: ExtractedText = ExtractedText(parent_tags=("div", "str"), text="a")
+
+    assert not hasattr(extracted_text, "__dict__")
+
+
+def test_identifier_tags_stop_at_the_first_li() -> None:
+    extracted_text: ExtractedText = ExtractedText(
+        parent_tags=("div", "ol", "0_li", "ul", "1_li", "str"), text="Tesla body"
+    )
+    other_text: ExtractedText = ExtractedText(
+        parent_tags=("div", "ol", "0_li", "p", "str"), text="other"
+    )
+
+    assert extracted_text.is_search_result
+    assert extracted_text.identifier_tags == "div-ol-0_li"
+    # interned, so texts of the same search result share one identifier string
+    assert extracted_text.identifier_tags is other_text.identifier_tags
+
+
+def test_text_outside_a_list_is_not_a_search_result() -> None:
+    extracted_text: ExtractedText = ExtractedText(
+        parent_tags=("div", "str"), text="intro"
+    )
+
+    assert not extracted_text.is_search_result
+    assert extracted_text.identifier_tags == ""
+
+
+def test_classification_is_cached_and_ignored_by_equality() -> None:
+    date_text: ExtractedText = ExtractedText(
+        parent_tags=("0_li", "str"), text="www.tesla.com · May 5, 2024"
+    )
+
+    # a date wins over a url in the same text
+    assert date_text.classification == TextClassification.date
+    assert date_text.is_date
+    assert date_text == ExtractedText(
+        parent_tags=("0_li", "str"), text="www.tesla.com · May 5, 2024"
+    )
+    assert (
+        ExtractedText(parent_tags=("0_li", "str"), text="tesla.com › ir").classification
+        == TextClassification.url
+    )
+    assert (
+        ExtractedText(parent_tags=("0_li", "str"), text="Tesla body").classification
+        == TextClassification.body
+    )
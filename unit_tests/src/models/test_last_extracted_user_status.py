@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from src.models.last_extracted_user_status import LastExtractedUserStatus
+from src.models.search_results import SearchResults
+
+
+def _raw_search(search_id: str, user_id: str, created_at: datetime) -> SearchResults:
+    return SearchResults(
+        search_id=search_id,
+        user_id=user_id,
+        search_term="tesla",
+        result=None,
+        created_at=created_at,
+    )
+
+
+def test_from_processed_searches_uses_the_newest_search_per_user() -> None:
+    raw_searches: list[SearchResults] = [
+        _raw_search("b", "user_1", datetime(2024, 5, 21, 10)),
+        # same created_at: the search_id breaks the tie
+        _raw_search("c", "user_1", datetime(2024, 5, 21, 10)),
+        _raw_search("a", "user_1", datetime(2024, 5, 21, 9)),
+        _raw_search("a", "user_2", datetime(2024, 5, 20)),
+    ]
+
+    statuses: list[LastExtractedUserStatus] = (
+        LastExtractedUserStatus.from_processed_searches(raw_searches)
+    )
+
+    assert [
+        (status.user_id, status.last_run, status.last_search_id) for status in statuses
+    ] == [
+        ("user_1", datetime(2024, 5, 21, 10), "c"),
+        ("user_2", datetime(2024, 5, 20), "a"),
+    ]
+
+
+def test_from_processed_searches_skips_users_without_searches() -> None:
+    assert LastExtractedUserStatus.from_processed_searches([]) == []
@@ -0,0 +1,99 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.service.dao.search_notification_listener import (
+    SEARCH_RESULTS_CHANNEL,
+    ListenerDisconnectedError,
+    SearchNotificationListener,
+)
+
+"""
+High Level: notifications are micro-batched in arrival order; a missed notification,
+a lost connection or a stop end the batching, so that the caller can catch up.
+"""
+
+DB_CONFIG: dict = {"host": "localhost", "port": 5432, "database": "test_db"}
+
+
+def _connected_listener(max_pending: int = 100) -> SearchNotificationListener:
+    listener: SearchNotificationListener = SearchNotificationListener(
+        DB_CONFIG, max_pending=max_pending
+    )
+    connection: MagicMock = MagicMock()
+    connection.is_closed.return_value = False
+    listener._connection = connection
+    return listener
+
+
+def _notify(listener: SearchNotificationListener, search_id: str) -> None:
+    listener._on_notification(
+        listener._connection,
+        1,
+        SEARCH_RESULTS_CHANNEL,
+        json.dumps({"search_id": search_id, "user_id": "user_1"}),
+    )
+
+
+@pytest.mark.asyncio_cooperative
+async def test_next_batch_is_capped_and_in_arrival_order() -> None:
+    listener: SearchNotificationListener = _connected_listener()
+    for i in range(3):
+        _notify(listener, f"search_{i}")
+
+    stop_requested: asyncio.Event = asyncio.Event()
+    assert await listener.next_batch(2, 60, stop_requested) == [
+        "search_0",
+        "search_1",
+    ]
+    assert await listener.next_batch(2, 0, stop_requested) == ["search_2"]
+
+
+@pytest.mark.asyncio_cooperative
+async def test_next_batch_gathers_notifications_arriving_in_its_window() -> None:
+    listener: SearchNotificationListener = _connected_listener()
+    event_loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    for i in range(3):
+        event_loop.call_soon(_notify, listener, f"search_{i}")
+
+    # the batch is full before the window ends
+    assert await listener.next_batch(3, 60, asyncio.Event()) == [
+        "search_0",
+        "search_1",
+        "search_2",
+    ]
+
+
+@pytest.mark.asyncio_cooperative
+async def test_missed_notifications_end_batching() -> None:
+    listener: SearchNotificationListener = _connected_listener(max_pending=1)
+    _notify(listener, "search_0")
+    _notify(listener, "search_1")
+    listener._on_notification(listener._connection, 1, SEARCH_RESULTS_CHANNEL, "{")
+
+    assert listener.missed_notifications
+    assert await listener.next_batch(10, 0, asyncio.Event()) == ["search_0"]
+    assert await listener.next_batch(10, 60, asyncio.Event()) == []
+
+
+@pytest.mark.asyncio_cooperative
+async def test_lost_connection_is_raised_once_drained() -> None:
+    listener: SearchNotificationListener = _connected_listener()
+    _notify(listener, "search_0")
+    listener._connection.is_closed.return_value = True
+    listener._on_termination(listener._connection)
+
+    assert await listener.next_batch(10, 60, asyncio.Event()) == ["search_0"]
+    with pytest.raises(ListenerDisconnectedError):
+        await listener.next_batch(10, 60, asyncio.Event())
+
+
+@pytest.mark.asyncio_cooperative
+async def test_stop_ends_an_idle_wait() -> None:
+    listener: SearchNotificationListener = _connected_listener()
+    stop_requested: asyncio.Event = asyncio.Event()
+    asyncio.get_running_loop().call_soon(stop_requested.set)
+
+    assert await asyncio.wait_for(listener.next_batch(10, 60, stop_requested), 5) == []
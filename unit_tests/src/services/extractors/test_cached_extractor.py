@@ -0,0 +1,200 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.models.parser_backend_enum import ParserBackend
+from src.service.extractors.bs4_extractor import BS4SearchResultExtractor
+from src.service.extractors import cached_extractor as cached_extractor_module
+from src.service.extractors.cached_extractor import CachedSearchResultExtractor
+from src.service.extractors.extraction_pool import ExtractionPool
+
+SEARCH_RESULT_HTML: str = """
+<ol>
+    <li><a href="link">www.tesla.com › investors</a><p>Tesla body {index}</p></li>
+    <li><a href="link">reuters.com</a><span>May 5, 2024</span></li>
+</ol>
+"""
+
+
+def _spy_extractor() -> MagicMock:
+    extractor: BS4SearchResultExtractor = BS4SearchResultExtractor()
+    spy: MagicMock = MagicMock(wraps=extractor)
+    spy.version = extractor.version
+    return spy
+
+
+def test_cache_hit_skips_extraction_and_restamps_results() -> None:
+    spy_extractor: MagicMock = _spy_extractor()
+    cached_extractor: CachedSearchResultExtractor = CachedSearchResultExtractor(
+        spy_extractor
+    )
+    html: str = SEARCH_RESULT_HTML.format(index=0)
+
+    first_results: list[ExtractedSearchResult] = cached_extractor.extract(
+        html, "user_1"
+    )
+    second_results: list[ExtractedSearchResult] = cached_extractor.extract(
+        html, "user_2"
+    )
+
+    assert spy_extractor.extract.call_count == 1
+    assert cached_extractor.stats.hits == 1
+    assert cached_extractor.stats.misses == 1
+    assert [(result.url, result.date, result.body) for result in second_results] == [
+        (result.url, result.date, result.body) for result in first_results
+    ]
+    assert {result.user_id for result in second_results} == {"user_2"}
+    assert {result.id for result in second_results}.isdisjoint(
+        {result.id for result in first_results}
+    )
+
+
+def test_cache_counts_the_groups_of_its_misses_only() -> None:
+    cached_extractor: CachedSearchResultExtractor = CachedSearchResultExtractor(
+        BS4SearchResultExtractor()
+    )
+    html: str = SEARCH_RESULT_HTML.format(index=0)
+
+    cached_extractor.extract(html, "user_1")
+    cached_extractor.extract(html, "user_2")
+
+    assert cached_extractor.group_stats.groups_found == 2
+    assert cached_extractor.group_stats is cached_extractor.result_extractor.group_stats
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    spy_extractor: MagicMock = _spy_extractor()
+    cached_extractor: CachedSearchResultExtractor = CachedSearchResultExtractor(
+        spy_extractor, max_entries=2
+    )
+    html_0, html_1, html_2 = (SEARCH_RESULT_HTML.format(index=i) for i in range(3))
+
+    cached_extractor.extract(html_0, "user")
+    cached_extractor.extract(html_1, "user")
+    cached_extractor.extract(html_0, "user")  # html_1 is now least recently used
+    cached_extractor.extract(html_2, "user")  # evicts html_1
+    cached_extractor.extract(html_0, "user")
+    cached_extractor.extract(html_1, "user")
+
+    assert cached_extractor.stats.hits == 2
+    assert cached_extractor.stats.misses == 4
+
+
+def test_cache_disk_tier_survives_a_new_cache(tmp_path) -> None:
+    html: str = SEARCH_RESULT_HTML.format(index=0)
+    CachedSearchResultExtractor(_spy_extractor(), cache_dir=str(tmp_path)).extract(
+        html, "user"
+    )
+
+    spy_extractor: MagicMock = _spy_extractor()
+    cached_extractor: CachedSearchResultExtractor = CachedSearchResultExtractor(
+        spy_extractor, cache_dir=str(tmp_path)
+    )
+    results: list[ExtractedSearchResult] = cached_extractor.extract(html, "user")
+
+    spy_extractor.extract.assert_not_called()
+    assert cached_extractor.stats.disk_hits == 1
+    assert [result.body for result in results] == ["Tesla body 0", ""]
+
+
+def test_cache_disk_tier_is_not_shared_across_parsers(tmp_path) -> None:
+    html: str = SEARCH_RESULT_HTML.format(index=0)
+    CachedSearchResultExtractor(
+        BS4SearchResultExtractor(ParserBackend.html_parser), cache_dir=str(tmp_path)
+    ).extract(html, "user")
+
+    cached_extractor: CachedSearchResultExtractor = CachedSearchResultExtractor(
+        BS4SearchResultExtractor(ParserBackend.lxml), cache_dir=str(tmp_path)
+    )
+    cached_extractor.extract(html, "user")
+
+    assert cached_extractor.stats.misses == 1
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_cache_disk_tier_treats_an_unreadable_file_as_a_miss(tmp_path) -> None:
+    html: str = SEARCH_RESULT_HTML.format(index=0)
+    writer: CachedSearchResultExtractor = CachedSearchResultExtractor(
+        _spy_extractor(), cache_dir=str(tmp_path)
+    )
+    writer.extract(html, "user")
+    # truncated, E.G by a crash mid-write on a filesystem without atomic rename
+    (tmp_path / f"{writer.cache_key(html)}.json").write_text('[["www.tesla')
+
+    spy_extractor: MagicMock = _spy_extractor()
+    cached_extractor: CachedSearchResultExtractor = CachedSearchResultExtractor(
+        spy_extractor, cache_dir=str(tmp_path)
+    )
+    results: list[ExtractedSearchResult] = cached_extractor.extract(html, "user")
+
+    spy_extractor.extract.assert_called_once()
+    assert cached_extractor.stats.misses == 1
+    assert [result.body for result in results] == ["Tesla body 0", ""]
+    # rewritten from the fresh extraction
+    assert CachedSearchResultExtractor(
+        _spy_extractor(), cache_dir=str(tmp_path)
+    ).lookup(html, "user")
+
+
+def test_cache_disk_tier_evicts_least_recently_used_files(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(cached_extractor_module, "DISK_SWEEP_INTERVAL", 1)
+    html_0, html_1, html_2 = (SEARCH_RESULT_HTML.format(index=i) for i in range(3))
+    unbounded_extractor: CachedSearchResultExtractor = CachedSearchResultExtractor(
+        _spy_extractor(), cache_dir=str(tmp_path)
+    )
+    unbounded_extractor.extract(html_0, "user")
+    unbounded_extractor.extract(html_1, "user")
+    file_0, file_1 = (
+        tmp_path / f"{unbounded_extractor.cache_key(html)}.json"
+        for html in (html_0, html_1)
+    )
+    os.utime(file_0, (0, 0))
+    os.utime(file_1, (1, 1))
+
+    # room for 2 of the 3 files, which are of the same size
+    cached_extractor: CachedSearchResultExtractor = CachedSearchResultExtractor(
+        _spy_extractor(),
+        cache_dir=str(tmp_path),
+        max_disk_bytes=int(2.5 * file_0.stat().st_size),
+    )
+    cached_extractor.extract(html_2, "user")
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        f"{cached_extractor.cache_key(html)}.json" for html in (html_1, html_2)
+    )
+
+
+@pytest.mark.asyncio_cooperative
+async def test_extraction_pool_only_sends_cache_misses_to_workers() -> None:
+    cached_extractor: CachedSearchResultExtractor = CachedSearchResultExtractor(
+        BS4SearchResultExtractor()
+    )
+    documents: list[tuple[str, str]] = [
+        (SEARCH_RESULT_HTML.format(index=index % 2), f"user_{index}")
+        for index in range(4)
+    ]
+    extraction_pool: ExtractionPool = ExtractionPool(
+        cached_extractor, max_workers=1, chunk_size=1
+    )
+    try:
+        await extraction_pool.extract(documents[:2])
+        results, _ = await extraction_pool.extract(documents)
+    finally:
+        extraction_pool.shutdown()
+
+    assert cached_extractor.stats.misses == 2
+    assert cached_extractor.stats.hits == 4
+    assert [(result.user_id, result.body) for result in results] == [
+        ("user_0", "Tesla body 0"),
+        ("user_0", ""),
+        ("user_1", "Tesla body 1"),
+        ("user_1", ""),
+        ("user_2", "Tesla body 0"),
+        ("user_2", ""),
+        ("user_3", "Tesla body 1"),
+        ("user_3", ""),
+    ]
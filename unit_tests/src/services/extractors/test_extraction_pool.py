@@ -0,0 +1,87 @@
+import pytest
+
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.service.extractors.bs4_extractor import BS4SearchResultExtractor
+from src.service.extractors.extraction_pool import ExtractionPool
+from src.service.extractors.layout_plan_extractor import (
+    LayoutPlanSearchResultExtractor,
+)
+
+"""
+High Level: ExtractionPool must produce the same results as extracting serially,
+in the same order as the documents, no matter how they are chunked, and hand what its workers learned back to the
+parent process's extractor.
+"""
+
+SEARCH_RESULT_HTML: str = """
+<html><body><div><ol>
+    <li>
+        <div><a href="link">www.tesla.com › investors</a></div>
+        <span>May 5, 2024</span>
+        <p>Tesla reports earnings {index}</p>
+    </li>
+    <li>
+        <a href="link">reuters.com</a>
+        <p>Reuters body {index}</p>
+    </li>
+</ol></div></body></html>
+"""
+
+
+def _without_generated_fields(
+    results: list[ExtractedSearchResult],
+) -> list[tuple[str, str | None, str | None, str | None]]:
+    # id and created_at are generated per result, so they are not compared
+    return [
+        (result.user_id, result.url, result.date, result.body) for result in results
+    ]
+
+
+@pytest.mark.asyncio_cooperative
+async def test_extraction_pool_matches_serial_extraction() -> None:
+    extractor: BS4SearchResultExtractor = BS4SearchResultExtractor()
+    documents: list[tuple[str, str]] = [
+        (SEARCH_RESULT_HTML.format(index=index), f"user_{index}") for index in range(7)
+    ]
+    expected_results: list[ExtractedSearchResult] = [
+        result
+        for html, user_id in documents
+        for result in extractor.extract(html, user_id)
+    ]
+
+    extraction_pool: ExtractionPool = ExtractionPool(
+        extractor, max_workers=2, chunk_size=3
+    )
+    try:
+        results, group_stats = await extraction_pool.extract(documents)
+    finally:
+        extraction_pool.shutdown()
+
+    assert len(results) == 14
+    # 2 groups per document, none filtered
+    assert (group_stats.groups_found, group_stats.groups_filtered) == (14, 0)
+    assert _without_generated_fields(results) == _without_generated_fields(
+        expected_results
+    )
+
+
+@pytest.mark.asyncio_cooperative
+async def test_extraction_pool_merges_the_layout_plans_learned_by_its_workers() -> None:
+    extractor: LayoutPlanSearchResultExtractor = LayoutPlanSearchResultExtractor()
+    documents: list[tuple[str, str]] = [
+        (SEARCH_RESULT_HTML.format(index=index), f"user_{index}") for index in range(4)
+    ]
+
+    extraction_pool: ExtractionPool = ExtractionPool(
+        extractor, max_workers=2, chunk_size=2
+    )
+    try:
+        await extraction_pool.extract(documents)
+    finally:
+        extraction_pool.shutdown()
+
+    # each chunk learned the plan from its first document, and reused it
+    assert (extractor.stats.plans_learned, extractor.stats.plan_hits) == (2, 2)
+    # the parent process's extractor now starts from that plan
+    extractor.extract(SEARCH_RESULT_HTML.format(index=4), "user_4")
+    assert (extractor.stats.plans_learned, extractor.stats.plan_hits) == (2, 3)
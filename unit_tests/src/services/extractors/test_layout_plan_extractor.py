@@ -0,0 +1,89 @@
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.models.parser_backend_enum import ParserBackend
+from src.service.extractors.bs4_extractor import BS4SearchResultExtractor
+from src.service.extractors.layout_plan_extractor import (
+    LayoutPlanSearchResultExtractor,
+)
+from src.utils.layout_plan_utils import layout_fingerprint
+
+"""
+High Level: LayoutPlanSearchResultExtractor must extract the same search results as
+BS4SearchResultExtractor on lxml, whether it walks the whole page (and learns a
+plan), reuses a plan, or finds the plan stale and falls back.
+"""
+
+
+def _serp(results: list[tuple[str, str]], wrapper: str = "div") -> str:
+    items: str = "".join(f"<li><a>{url}</a><p>{body}</p></li>" for url, body in results)
+    return (
+        f'<html><body><{wrapper}><ol class="reg">{items}</ol></{wrapper}>'
+        '<ol class="ads"><li>ad.com</li></ol></body></html>'
+    )
+
+
+def _extracted_fields(
+    results: list[ExtractedSearchResult],
+) -> list[tuple[str | None, str | None, str | None]]:
+    return [(result.url, result.date, result.body) for result in results]
+
+
+def _expected_fields(html: str) -> list[tuple[str | None, str | None, str | None]]:
+    return _extracted_fields(
+        BS4SearchResultExtractor(ParserBackend.lxml_native).extract(html, "user")
+    )
+
+
+def test_layout_fingerprint_ignores_result_count() -> None:
+    assert layout_fingerprint(_serp([("a.com", "A")])) == layout_fingerprint(
+        _serp([("a.com", "A"), ("b.com", "B")])
+    )
+    assert layout_fingerprint(_serp([("a.com", "A")])) != layout_fingerprint(
+        "<ul class='other'><li>a.com</li></ul>"
+    )
+
+
+def test_reuses_the_plan_learned_from_a_page_of_the_same_layout() -> None:
+    extractor: LayoutPlanSearchResultExtractor = LayoutPlanSearchResultExtractor()
+    first_page: str = _serp([("a.com", "A"), ("b.com", "B")])
+    second_page: str = _serp([("c.com", "C"), ("d.com", "D"), ("e.com", "E")])
+
+    assert _extracted_fields(extractor.extract(first_page, "user")) == (
+        _expected_fields(first_page)
+    )
+    assert _extracted_fields(extractor.extract(second_page, "user")) == (
+        _expected_fields(second_page)
+    )
+    assert (extractor.stats.plans_learned, extractor.stats.plan_hits) == (1, 1)
+
+
+def test_falls_back_to_the_full_walk_when_the_plan_is_stale() -> None:
+    extractor: LayoutPlanSearchResultExtractor = LayoutPlanSearchResultExtractor()
+    extractor.extract(_serp([("a.com", "A"), ("b.com", "B")]), "user")
+    # same lists, but the results moved into another element
+    moved_page: str = _serp([("c.com", "C"), ("d.com", "D")], wrapper="section")
+
+    results: list[ExtractedSearchResult] = extractor.extract(moved_page, "user")
+
+    assert _extracted_fields(results) == _expected_fields(moved_page)
+    assert (extractor.stats.fallbacks, extractor.stats.plans_learned) == (1, 2)
+
+
+def test_falls_back_to_the_full_walk_when_another_list_holds_search_results() -> None:
+    extractor: LayoutPlanSearchResultExtractor = LayoutPlanSearchResultExtractor()
+    extractor.extract(_serp([("a.com", "A"), ("b.com", "B")]), "user")
+    # same fingerprint, but the list the plan learned as ads now holds results too
+    extra_container_page: str = _serp([("c.com", "C"), ("d.com", "D")]).replace(
+        '<ol class="ads"><li>ad.com</li></ol>',
+        '<ol class="ads"><li><a>e.com</a><p>E</p></li></ol>',
+    )
+    assert layout_fingerprint(extra_container_page) == layout_fingerprint(
+        _serp([("a.com", "A")])
+    )
+
+    results: list[ExtractedSearchResult] = extractor.extract(
+        extra_container_page, "user"
+    )
+
+    assert _extracted_fields(results) == _expected_fields(extra_container_page)
+    assert "e.com" in [result.url for result in results]
+    assert (extractor.stats.plan_hits, extractor.stats.fallbacks) == (0, 1)
@@ -0,0 +1,100 @@
+import pytest
+
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.models.parser_backend_enum import ParserBackend
+from src.service.extractors.bs4_extractor import BS4SearchResultExtractor
+
+"""
+High Level: Every parser backend must extract the same search results as the
+default html.parser backend, on the same HTML.
+"""
+
+YAHOO_LIKE_HTML: str = """<!DOCTYPE html>
+<html>
+<head><title>tesla earning reports - Yahoo Search Results</title>
+<script>var config = {"host": "search.yahoo.com"};</script></head>
+<body>
+<!-- results -->
+<div id="main"><div class="searchCenterMiddle"><ol class="reg searchCenterMiddle">
+    <li>
+        <div class="compTitle"><h3><a href="https://ir.tesla.com">Tesla Investor Relations</a></h3>
+        <span>ir.tesla.com › press</span></div>
+        <div class="compText"><p>Tesla &amp; its <b>Q1 2024</b> update</p></div>
+        <span class="fc-2nd">Apr 23, 2024</span>
+    </li>
+    <li>
+        <div class="compTitle"><a href="https://reuters.com">www.reuters.com</a></div>
+        <p>Tesla misses estimates</p>
+    </li>
+    <li><p>Ad without a link or date</p></li>
+</ol></div>
+<ul class="footer"><li>Privacy</li><li>Terms</li></ul>
+</div>
+</body>
+</html>
+"""
+
+
+def _extracted_fields(
+    results: list[ExtractedSearchResult],
+) -> list[tuple[str | None, str | None, str | None]]:
+    # id and created_at are generated per result, so they are not compared
+    return [(result.url, result.date, result.body) for result in results]
+
+
+@pytest.mark.parametrize("parser", list(ParserBackend))
+def test_parser_backends_extract_the_same_search_results(
+    parser: ParserBackend,
+) -> None:
+    expected_results: list[ExtractedSearchResult] = BS4SearchResultExtractor().extract(
+        YAHOO_LIKE_HTML, "dummy_user_id"
+    )
+
+    results: list[ExtractedSearchResult] = BS4SearchResultExtractor(parser).extract(
+        YAHOO_LIKE_HTML, "dummy_user_id"
+    )
+
+    assert _extracted_fields(expected_results) == [
+        (
+            "ir.tesla.com › press",
+            "Apr 23, 2024",
+            "Tesla Investor Relations Tesla & its Q1 2024 update",
+        ),
+        ("www.reuters.com", "", "Tesla misses estimates"),
+    ]
+    assert _extracted_fields(results) == _extracted_fields(expected_results)
+
+
+@pytest.mark.parametrize("parser", list(ParserBackend))
+def test_pruned_extraction_matches_the_full_walk(parser: ParserBackend) -> None:
+    expected_results: list[ExtractedSearchResult] = BS4SearchResultExtractor().extract(
+        YAHOO_LIKE_HTML, "dummy_user_id"
+    )
+
+    results: list[ExtractedSearchResult] = BS4SearchResultExtractor(
+        parser, prune=True
+    ).extract(YAHOO_LIKE_HTML, "dummy_user_id")
+
+    assert _extracted_fields(results) == _extracted_fields(expected_results)
+
+
+@pytest.mark.parametrize("parser", list(ParserBackend))
+def test_pruned_extraction_keeps_list_order_and_skips_scripts(
+    parser: ParserBackend,
+) -> None:
+    # the nested <ul> comes before the <ol>'s own <li> in document order
+    html: str = (
+        "<div><ol>"
+        "<div><ul><li><a>www.tesla.com</a><p>Nested</p></li></ul></div>"
+        "<li><a>www.reuters.com</a><script>var a = 'x.com';</script><p>Outer</p></li>"
+        "</ol></div>"
+    )
+
+    results: list[ExtractedSearchResult] = BS4SearchResultExtractor(
+        parser, prune=True
+    ).extract(html, "dummy_user_id")
+
+    assert _extracted_fields(results) == [
+        ("www.tesla.com", "", "Nested"),
+        ("www.reuters.com", "", "Outer"),
+    ]
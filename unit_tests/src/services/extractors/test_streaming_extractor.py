@@ -0,0 +1,47 @@
+import pytest
+
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.service.extractors.bs4_extractor import BS4SearchResultExtractor
+from src.service.extractors.streaming_extractor import StreamingSearchResultExtractor
+from unit_tests.src.services.extractors.test_parser_backends import (
+    YAHOO_LIKE_HTML,
+    _extracted_fields,
+)
+
+"""
+High Level: StreamingSearchResultExtractor never builds a tree, but must extract the
+same search results as BS4SearchResultExtractor, however the HTML is chunked.
+"""
+
+EDGE_CASE_HTML: list[str] = [
+    YAHOO_LIKE_HTML,
+    # void elements, with and without a redundant end tag, shift the <li> indexes
+    (
+        "<ul><br><li><a>www.tesla.com</a><br></br>Tesla body</li><img/>"
+        "<li><span>May 5, 2024</span><p>Body</p></li></ul>"
+    ),
+    # no implicit closing: the second <p> is inside the first one
+    "<ol><li><p>tesla.com<p>Tesla body</li><li>reuters.com</ol></li><p>reuters body",
+    # comments and character references are text
+    (
+        "<ol><!-- ad --><li>&#119;ww.tesla.com &amp; more<!-- c --></li>"
+        "<li>x.com &#x42;ody &foo; &nbsp;</li></ol>"
+    ),
+    # two <li> with the same parent tags, one after the other, form one group
+    "<div><ul><li>tesla.com</li></ul></div><div><ul><li>Tesla body</li></ul></div>",
+]
+
+
+@pytest.mark.parametrize("html", EDGE_CASE_HTML)
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_streaming_extractor_matches_bs4_extractor(html: str, chunk_size: int) -> None:
+    expected_results: list[ExtractedSearchResult] = BS4SearchResultExtractor().extract(
+        html, "dummy_user_id"
+    )
+
+    results: list[ExtractedSearchResult] = StreamingSearchResultExtractor(
+        chunk_size
+    ).extract(html, "dummy_user_id")
+
+    assert expected_results
+    assert _extracted_fields(results) == _extracted_fields(expected_results)
@@ -0,0 +1,45 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.compact_status_history import compact_status_history
+
+"""
+High Level: history is deleted in batches of batch_size, until a batch comes back
+short, all before the same cutoff
+"""
+
+
+@pytest.mark.asyncio_cooperative
+async def test_compact_status_history_deletes_until_a_short_batch() -> None:
+    last_extracted_user_dao: MagicMock = MagicMock()
+    last_extracted_user_dao.delete_status_history_before = AsyncMock(
+        side_effect=[2, 2, 1]
+    )
+
+    total_deleted: int = await compact_status_history(
+        last_extracted_user_dao,
+        retention_days=30,
+        batch_size=2,
+        now=datetime(2024, 6, 30),
+    )
+
+    assert total_deleted == 5
+    assert [
+        call.args
+        for call in last_extracted_user_dao.delete_status_history_before.call_args_list
+    ] == [(datetime(2024, 5, 31), 2)] * 3
+
+
+@pytest.mark.asyncio_cooperative
+async def test_compact_status_history_with_nothing_to_delete() -> None:
+    last_extracted_user_dao: MagicMock = MagicMock()
+    last_extracted_user_dao.delete_status_history_before = AsyncMock(return_value=0)
+
+    total_deleted: int = await compact_status_history(
+        last_extracted_user_dao, retention_days=30, batch_size=100
+    )
+
+    assert total_deleted == 0
+    last_extracted_user_dao.delete_status_history_before.assert_called_once()
@@ -0,0 +1,121 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.etl_daemon import ETLDaemon
+from src.utils.run_metrics import RunMetrics
+
+"""
+High Level: the daemon runs the pipeline one run at a time, survives failed runs,
+backs off while idle when adaptive, and stops only once the run in progress is over.
+"""
+
+
+class FakePipeline:
+    """
+    Records how many runs are in progress at once; raw_searches_per_run sets what
+    each run finds, and a run raises instead when it is "fail"
+    """
+
+    def __init__(self, raw_searches_per_run: list[int | str]) -> None:
+        self.run_metrics: RunMetrics = RunMetrics()
+        self.raw_searches_per_run: list[int | str] = raw_searches_per_run
+        self.in_progress: int = 0
+        self.max_in_progress: int = 0
+        self.finished_runs: int = 0
+        self.on_run: MagicMock = MagicMock()
+
+    async def run(self) -> None:
+        self.run_metrics = RunMetrics()
+        self.in_progress += 1
+        self.max_in_progress = max(self.max_in_progress, self.in_progress)
+        raw_searches: int | str = self.raw_searches_per_run[self.finished_runs]
+        self.on_run()
+        # yields to the event loop, as a run does
+        await asyncio.sleep(0)
+        self.in_progress -= 1
+        self.finished_runs += 1
+        if raw_searches == "fail":
+            raise RuntimeError("database is down")
+        self.run_metrics.increment("raw_searches", int(raw_searches))
+
+    def summary(self) -> list[str]:
+        return []
+
+
+@pytest.mark.asyncio_cooperative
+async def test_runs_never_overlap_and_survive_failures() -> None:
+    pipeline: FakePipeline = FakePipeline([1, "fail", 1, 0])
+    daemon: ETLDaemon = ETLDaemon(pipeline, interval_seconds=0)  # type: ignore[arg-type]
+    pipeline.on_run.side_effect = lambda: (
+        daemon.request_stop() if pipeline.finished_runs == 3 else None
+    )
+
+    await daemon.run_forever()
+
+    assert daemon.runs == 4
+    assert pipeline.finished_runs == 4
+    assert pipeline.max_in_progress == 1
+
+
+@pytest.mark.asyncio_cooperative
+async def test_stop_drains_the_run_in_progress() -> None:
+    pipeline: FakePipeline = FakePipeline([1])
+    daemon: ETLDaemon = ETLDaemon(pipeline, interval_seconds=3600)  # type: ignore[arg-type]
+    # requested while the first run is in progress
+    pipeline.on_run.side_effect = daemon.request_stop
+
+    # the hour-long wait after the run is cut short too
+    await asyncio.wait_for(daemon.run_forever(), 5)
+
+    assert pipeline.finished_runs == 1
+    assert pipeline.in_progress == 0
+
+
+def test_interval_schedule_subtracts_the_run() -> None:
+    daemon: ETLDaemon = ETLDaemon(
+        FakePipeline([]), "interval", interval_seconds=300  # type: ignore[arg-type]
+    )
+
+    assert daemon._next_delay(120, True) == 180
+    assert daemon._next_delay(400, False) == 0
+
+
+def test_adaptive_schedule_backs_off_while_idle() -> None:
+    daemon: ETLDaemon = ETLDaemon(
+        FakePipeline([]),  # type: ignore[arg-type]
+        "adaptive",
+        interval_seconds=60,
+        min_interval_seconds=10,
+    )
+
+    delays: list[float] = [
+        daemon._next_delay(1, found_searches)
+        for found_searches in (True, False, False, False, False, True)
+    ]
+
+    assert delays == [10, 20, 40, 60, 60, 10]
+
+
+def test_unknown_schedule_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        ETLDaemon(FakePipeline([]), "cron")  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio_cooperative
+async def test_tail_schedule_hands_over_to_run_tail() -> None:
+    pipeline: MagicMock = MagicMock()
+    pipeline.run_tail = AsyncMock()
+    listener: MagicMock = MagicMock()
+    daemon: ETLDaemon = ETLDaemon(
+        pipeline, "tail", listener=listener, tail_batch_size=50
+    )
+
+    await daemon.run_forever()
+
+    pipeline.run_tail.assert_awaited_once_with(
+        listener, daemon._stop_requested, 50, 0.5, 5, None, 300
+    )
+    with pytest.raises(ValueError):
+        ETLDaemon(pipeline, "tail")
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import tempfile
+from collections.abc import AsyncIterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src import etl_pipeline
+from src.etl_pipeline import ETLPipeline
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.models.last_extracted_user_status import LastExtractedUserStatus
+from src.models.search_results import SearchResults
+from src.service.extractors.bs4_extractor import BS4SearchResultExtractor
+from src.service.extractors.extraction_pool import ExtractionPool
+
+"""
+High Level: run_streaming must load the same results as run, while batching
+inserts as results arrive rather than after every document is extracted.
+"""
+
+SEARCH_RESULT_HTML: str = """
+<ol>
+    <li><a href="link">www.tesla.com › investors</a><p>Tesla body</p></li>
+    <li><a href="link">reuters.com</a><p>Reuters body</p></li>
+</ol>
+"""
+
+
+def _raw_search(search_id: str, user_id: str, result: str | None) -> SearchResults:
+    return SearchResults(
+        search_id=search_id,
+        user_id=user_id,
+        search_term="tesla",
+        result=result,
+        created_at=datetime(2024, 5, 21),
+    )
+
+
+async def _stream_searches_since_last_run() -> AsyncIterator[list[SearchResults]]:
+    yield [
+        _raw_search("search_1", "user_1", SEARCH_RESULT_HTML),
+        _raw_search("search_2", "user_1", None),
+    ]
+    yield [_raw_search("search_3", "user_2", SEARCH_RESULT_HTML)]
+
+
+def _build_pipeline(**kwargs: Any) -> tuple[ETLPipeline, MagicMock, AsyncMock]:
+    raw_search_dao: MagicMock = MagicMock()
+    raw_search_dao.stream_searches_since_last_run = _stream_searches_since_last_run
+    user_dao: AsyncMock = AsyncMock()
+    extracted_search_result_dao: AsyncMock = AsyncMock()
+    last_extracted_user_dao: AsyncMock = AsyncMock()
+    pipeline: ETLPipeline = ETLPipeline(
+        raw_search_dao,
+        last_extracted_user_dao,
+        user_dao,
+        BS4SearchResultExtractor(),
+        extracted_search_result_dao,
+        **kwargs,
+    )
+    return pipeline, extracted_search_result_dao, last_extracted_user_dao
+
+
+def _inserted_results(
+    extracted_search_result_dao: AsyncMock,
+) -> list[tuple[str, str | None, str | None]]:
+    inserted: list[ExtractedSearchResult] = [
+        result
+        for call in extracted_search_result_dao.bulk_insert.call_args_list
+        for result in call.args[0]
+    ]
+    return [(result.user_id, result.url, result.body) for result in inserted]
+
+
+@pytest.mark.asyncio_cooperative
+async def test_run_streaming_loads_every_result(monkeypatch) -> None:
+    pipeline, extracted_search_result_dao, last_extracted_user_dao = _build_pipeline()
+    # flush a batch every 3 results, to exercise batching mid-stream
+    monkeypatch.setattr(etl_pipeline, "BULK_INSERT_BATCH_SIZE", 3)
+
+    await pipeline.run_streaming(queue_size=1)
+
+    assert [
+        len(call.args[0])
+        for call in extracted_search_result_dao.bulk_insert.call_args_list
+    ] == [3, 1]
+    assert _inserted_results(extracted_search_result_dao) == [
+        ("user_1", "www.tesla.com › investors", "Tesla body"),
+        ("user_1", "reuters.com", "Reuters body"),
+        ("user_2", "www.tesla.com › investors", "Tesla body"),
+        ("user_2", "reuters.com", "Reuters body"),
+    ]
+    last_extracted_user_dao.bulk_upsert_status.assert_called_once()
+    # watermarks at each user's newest search, including searches without a result
+    statuses: list[LastExtractedUserStatus] = (
+        last_extracted_user_dao.bulk_upsert_status.call_args.args[0]
+    )
+    assert [
+        (status.user_id, status.last_run, status.last_search_id) for status in statuses
+    ] == [
+        ("user_1", datetime(2024, 5, 21), "search_2"),
+        ("user_2", datetime(2024, 5, 21), "search_3"),
+    ]
+
+
+EXPECTED_COUNTERS: dict[str, int] = {
+    "users": 2,
+    "raw_searches": 3,
+    "documents": 2,
+    "html_bytes": 2 * len(SEARCH_RESULT_HTML.encode()),
+    "groups_found": 4,
+    "groups_filtered": 0,
+    "search_results": 4,
+    "rows_inserted": 4,
+    "watermarks_advanced": 2,
+}
+
+
+def _pipeline_counters(counters: dict[str, int]) -> dict[str, int]:
+    # database_retries/failures are deltas of process-wide retry metrics, which
+    # tests running concurrently also move
+    return {
+        counter: count
+        for counter, count in counters.items()
+        if not counter.startswith("database_")
+    }
+
+
+@pytest.mark.asyncio_cooperative
+async def test_run_streaming_counts_the_run() -> None:
+    pipeline, _, _ = _build_pipeline()
+
+    await pipeline.run_streaming(queue_size=1)
+
+    assert pipeline.run_metrics.status == "succeeded"
+    assert _pipeline_counters(pipeline.run_metrics.counters) == EXPECTED_COUNTERS
+    assert pipeline.run_metrics.histograms["extract_seconds"].count == 2
+    assert set(pipeline.run_metrics.stage_seconds) == {"stage_two", "stage_three"}
+
+
+@pytest.mark.asyncio_cooperative
+async def test_concurrent_stage_twos_count_their_own_groups() -> None:
+    extraction_pool: ExtractionPool = ExtractionPool(
+        BS4SearchResultExtractor(), max_workers=2, chunk_size=1
+    )
+    pipeline, _, _ = _build_pipeline(extraction_pool=extraction_pool)
+    raw_searches: list[SearchResults] = [
+        _raw_search("search_1", "user_1", SEARCH_RESULT_HTML),
+        _raw_search("search_2", "user_2", SEARCH_RESULT_HTML),
+    ]
+
+    try:
+        # as run_streaming's consumers do, with several documents in flight
+        await asyncio.gather(
+            pipeline.stage_two(raw_searches), pipeline.stage_two(raw_searches)
+        )
+    finally:
+        extraction_pool.shutdown()
+
+    # 2 calls of 2 documents of 2 groups, each counted once
+    assert pipeline.run_metrics.counters["groups_found"] == 8
+    assert pipeline.run_metrics.counters["search_results"] == 8
+
+
+def _read_report(run_report_dir: str, pipeline: ETLPipeline) -> dict[str, Any]:
+    return json.loads(
+        Path(run_report_dir, f"etl_run_{pipeline.run_metrics.run_id}.json").read_text()
+    )
+
+
+@pytest.mark.asyncio_cooperative
+async def test_run_writes_and_records_its_report() -> None:
+    etl_run_dao: AsyncMock = AsyncMock()
+    with tempfile.TemporaryDirectory() as run_report_dir:
+        pipeline, _, _ = _build_pipeline(
+            run_report_dir=run_report_dir, etl_run_dao=etl_run_dao
+        )
+
+        await pipeline.run()
+
+        report: dict[str, Any] = _read_report(run_report_dir, pipeline)
+    assert report["status"] == "succeeded"
+    assert _pipeline_counters(report["counters"]) == EXPECTED_COUNTERS
+    assert set(report["stage_seconds"]) == {"stage_one", "stage_two", "stage_three"}
+    assert report["histograms"]["bulk_insert_seconds"]["count"] == 1
+    etl_run_dao.insert_run.assert_awaited_once_with(pipeline.run_metrics)
+
+
+@pytest.mark.asyncio_cooperative
+async def test_failed_run_is_reported() -> None:
+    etl_run_dao: AsyncMock = AsyncMock()
+    pipeline, extracted_search_result_dao, _ = _build_pipeline(etl_run_dao=etl_run_dao)
+    extracted_search_result_dao.bulk_insert.side_effect = RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        await pipeline.run()
+
+    assert pipeline.run_metrics.status == "failed"
+    assert "rows_inserted" not in pipeline.run_metrics.counters
+    etl_run_dao.insert_run.assert_awaited_once_with(pipeline.run_metrics)
+
+
+@pytest.mark.asyncio_cooperative
+async def test_run_streaming_tracks_the_freshness_lag(monkeypatch) -> None:
+    pipeline, _, _ = _build_pipeline(track_freshness_lag=True)
+    monkeypatch.setattr(
+        pipeline._raw_search_result_dao,
+        "fetch_oldest_unprocessed_created_at",
+        AsyncMock(return_value=datetime(2024, 5, 21)),
+    )
+
+    await pipeline.run_streaming(queue_size=1)
+
+    assert (
+        etl_pipeline.FRESHNESS_LAG.get()
+        >= (datetime.utcnow() - datetime(2024, 5, 21)).total_seconds() - 1
+    )
+    # the queues are gone once the run is over
+    assert etl_pipeline.RAW_SEARCH_QUEUE_DEPTH.get() == 0
+    assert etl_pipeline.EXTRACTED_QUEUE_DEPTH.get() == 0
@@ -0,0 +1,207 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable, Sequence
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.models.last_extracted_user_status import LastExtractedUserStatus
+from src.models.search_results import SearchResults
+from src.service.dao.search_notification_listener import ListenerDisconnectedError
+from unit_tests.src.test_etl_pipeline_streaming import (
+    SEARCH_RESULT_HTML,
+    _build_pipeline,
+    _inserted_results,
+)
+
+"""
+High Level: tail mode catches up with a watermark scan whenever it (re)connects, and
+in between, extracts and inserts only the searches it is notified of.
+"""
+
+
+class FakeListener:
+    """
+    next_batch replays batches: a list of search_ids, an exception to raise, or a
+    callable run before returning no search_ids (E.G to request a stop)
+    """
+
+    def __init__(self, batches: list[list[str] | Exception | Callable[[], None]]):
+        self.batches: list[list[str] | Exception | Callable[[], None]] = batches
+        self.connect: AsyncMock = AsyncMock()
+        self.close: AsyncMock = AsyncMock()
+        self.missed_notifications: bool = False
+
+    async def next_batch(
+        self,
+        max_batch_size: int,
+        window_seconds: float,
+        stop_requested: asyncio.Event,
+    ) -> list[str]:
+        batch: list[str] | Exception | Callable[[], None] = self.batches.pop(0)
+        if isinstance(batch, Exception):
+            raise batch
+        if callable(batch):
+            batch()
+            return []
+        return batch
+
+
+def _notified_search(
+    search_id: str = "search_4", created_at: datetime = datetime(2024, 5, 22)
+) -> SearchResults:
+    return SearchResults(
+        search_id=search_id,
+        user_id="user_1",
+        search_term="tesla",
+        result=SEARCH_RESULT_HTML,
+        created_at=created_at,
+    )
+
+
+def _fetch_searches_by_ids(searches: list[SearchResults]) -> AsyncMock:
+    """
+    Like the DAO: every notified search, whatever its watermark, in watermark order
+    """
+
+    async def fetch_searches_by_ids(search_ids: Sequence[str]) -> list[SearchResults]:
+        return sorted(
+            (search for search in searches if search.search_id in search_ids),
+            key=lambda search: (search.user_id, search.created_at, search.search_id),
+        )
+
+    return AsyncMock(side_effect=fetch_searches_by_ids)
+
+
+def _upserted_statuses(
+    last_extracted_user_dao: AsyncMock,
+) -> list[list[tuple[str, datetime, str | None]]]:
+    return [
+        [
+            (status.user_id, status.last_run, status.last_search_id)
+            for status in call.args[0]
+        ]
+        for call in last_extracted_user_dao.bulk_upsert_status.call_args_list
+    ]
+
+
+@pytest.mark.asyncio_cooperative
+async def test_run_tail_catches_up_on_every_connect(monkeypatch) -> None:
+    pipeline, extracted_search_result_dao, last_extracted_user_dao = _build_pipeline()
+    fetch_searches_by_ids: AsyncMock = AsyncMock(return_value=[_notified_search()])
+    monkeypatch.setattr(
+        pipeline._raw_search_result_dao, "fetch_searches_by_ids", fetch_searches_by_ids
+    )
+    stop_requested: asyncio.Event = asyncio.Event()
+    listener: FakeListener = FakeListener(
+        [["search_4"], ListenerDisconnectedError(), stop_requested.set]
+    )
+
+    await pipeline.run_tail(listener, stop_requested)  # type: ignore[arg-type]
+
+    assert listener.connect.await_count == 2
+    listener.close.assert_awaited_once()
+    fetch_searches_by_ids.assert_awaited_once_with(["search_4"])
+    # 2 documents per catch-up scan, and the notified one in between
+    assert _inserted_results(extracted_search_result_dao) == [
+        (user_id, url, body)
+        for user_id in ("user_1", "user_2", "user_1", "user_1", "user_2")
+        for url, body in (
+            ("www.tesla.com › investors", "Tesla body"),
+            ("reuters.com", "Reuters body"),
+        )
+    ]
+    tail_statuses: list[LastExtractedUserStatus] = (
+        last_extracted_user_dao.bulk_upsert_status.call_args_list[1].args[0]
+    )
+    assert [
+        (status.user_id, status.last_run, status.last_search_id)
+        for status in tail_statuses
+    ] == [("user_1", datetime(2024, 5, 22), "search_4")]
+    assert pipeline.run_metrics.status == "succeeded"
+
+
+@pytest.mark.asyncio_cooperative
+async def test_run_tail_retries_a_failed_connect() -> None:
+    pipeline, _, _ = _build_pipeline()
+    stop_requested: asyncio.Event = asyncio.Event()
+    listener: FakeListener = FakeListener([stop_requested.set])
+    listener.connect.side_effect = [OSError("connection refused"), None]
+
+    await pipeline.run_tail(
+        listener, stop_requested, reconnect_delay_seconds=0  # type: ignore[arg-type]
+    )
+
+    assert listener.connect.await_count == 2
+    listener.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio_cooperative
+async def test_run_tail_extracts_a_search_committed_after_a_newer_one(
+    monkeypatch,
+) -> None:
+    pipeline, extracted_search_result_dao, last_extracted_user_dao = _build_pipeline()
+    older_search: SearchResults = _notified_search("search_4", datetime(2024, 5, 22))
+    newer_search: SearchResults = _notified_search("search_5", datetime(2024, 5, 23))
+    monkeypatch.setattr(
+        pipeline._raw_search_result_dao,
+        "fetch_searches_by_ids",
+        _fetch_searches_by_ids([older_search, newer_search]),
+    )
+    stop_requested: asyncio.Event = asyncio.Event()
+    # the older search's transaction commits, and is notified, after the newer one's
+    listener: FakeListener = FakeListener(
+        [["search_5"], ["search_4"], stop_requested.set]
+    )
+
+    await pipeline.run_tail(listener, stop_requested)  # type: ignore[arg-type]
+
+    # 2 documents per search: the catch-up scan's 3, then the newer, then the older
+    assert len(_inserted_results(extracted_search_result_dao)) == 10
+    # the older search's watermark is behind the newer one's; the upsert is
+    # forward-only, so it does not move the watermark back
+    assert _upserted_statuses(last_extracted_user_dao)[1:] == [
+        [("user_1", datetime(2024, 5, 23), "search_5")],
+        [("user_1", datetime(2024, 5, 22), "search_4")],
+    ]
+    assert pipeline.run_metrics.counters["raw_searches"] == 2
+
+
+@pytest.mark.asyncio_cooperative
+async def test_run_tail_skips_notified_searches_the_catch_up_scan_extracted(
+    monkeypatch,
+) -> None:
+    pipeline, extracted_search_result_dao, _ = _build_pipeline()
+    # inserted while the catch-up scan ran: both scanned and notified
+    scanned_search: SearchResults = _notified_search("search_4", datetime.utcnow())
+    notified_search: SearchResults = _notified_search("search_5", datetime.utcnow())
+
+    async def stream_searches_since_last_run() -> AsyncIterator[list[SearchResults]]:
+        yield [scanned_search]
+
+    monkeypatch.setattr(
+        pipeline._raw_search_result_dao,
+        "stream_searches_since_last_run",
+        stream_searches_since_last_run,
+    )
+    fetch_searches_by_ids: AsyncMock = _fetch_searches_by_ids(
+        [scanned_search, notified_search]
+    )
+    monkeypatch.setattr(
+        pipeline._raw_search_result_dao, "fetch_searches_by_ids", fetch_searches_by_ids
+    )
+    stop_requested: asyncio.Event = asyncio.Event()
+    listener: FakeListener = FakeListener(
+        [["search_4", "search_5"], ["search_4"], stop_requested.set]
+    )
+
+    await pipeline.run_tail(listener, stop_requested)  # type: ignore[arg-type]
+
+    # search_4 is skipped once; a second notification of it is not expected, and
+    # extracts it
+    assert [call.args[0] for call in fetch_searches_by_ids.await_args_list] == [
+        ["search_5"],
+        ["search_4"],
+    ]
+    assert len(_inserted_results(extracted_search_result_dao)) == 6
+    assert pipeline.run_metrics.counters["caught_up_searches"] == 1
@@ -0,0 +1,201 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError, SQLAlchemyError
+
+from src.utils.async_retry import (
+    RETRY_METRICS,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryMetrics,
+    async_retry,
+)
+from src.utils.asyncpg_fast_path import is_transient_database_error
+
+"""
+High Level: async_retry must retry failures raised on await, give up after tries or
+its budget, and stop calling through an open circuit breaker.
+"""
+
+
+class FlakyOperation:
+    def __init__(self, failures: int) -> None:
+        self.failures: int = failures
+        self.calls: int = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+        return "ok"
+
+
+@pytest.mark.asyncio_cooperative
+async def test_retries_failures_raised_on_await() -> None:
+    operation: FlakyOperation = FlakyOperation(failures=2)
+
+    @async_retry(exceptions=SQLAlchemyError, tries=5, delay=0)
+    async def retried_operation() -> str:
+        return await operation()
+
+    assert await retried_operation() == "ok"
+    assert operation.calls == 3
+    metrics: RetryMetrics = RETRY_METRICS[retried_operation.__qualname__]
+    assert (metrics.attempts, metrics.retries, metrics.failures) == (3, 2, 0)
+
+
+@pytest.mark.asyncio_cooperative
+async def test_gives_up_after_tries() -> None:
+    operation: FlakyOperation = FlakyOperation(failures=10)
+    wrapped = async_retry(exceptions=SQLAlchemyError, tries=3, delay=0)(
+        operation.__call__
+    )
+
+    with pytest.raises(OperationalError):
+        await wrapped()
+    assert operation.calls == 3
+
+
+@pytest.mark.asyncio_cooperative
+async def test_does_not_retry_other_exceptions() -> None:
+    calls: list[int] = []
+
+    @async_retry(exceptions=SQLAlchemyError, tries=3, delay=0)
+    async def failing_operation() -> None:
+        calls.append(1)
+        raise ValueError("not a database error")
+
+    with pytest.raises(ValueError):
+        await failing_operation()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio_cooperative
+async def test_stops_retrying_past_budget() -> None:
+    operation: FlakyOperation = FlakyOperation(failures=10)
+    wrapped = async_retry(
+        exceptions=SQLAlchemyError, tries=10, delay=0.05, budget_seconds=0.12
+    )(operation.__call__)
+
+    with pytest.raises(OperationalError):
+        await wrapped()
+    # sleeps of 0.05 + 0.1 would exceed the 0.12 second budget; fewer calls if the
+    # event loop is busy with other tests
+    assert 1 <= operation.calls <= 2
+
+
+@pytest.mark.asyncio_cooperative
+async def test_open_circuit_fails_fast_then_recovers() -> None:
+    circuit_breaker: CircuitBreaker = CircuitBreaker(
+        failure_threshold=2, reset_timeout=60
+    )
+    operation: FlakyOperation = FlakyOperation(failures=2)
+    wrapped = async_retry(
+        exceptions=SQLAlchemyError,
+        tries=5,
+        delay=0,
+        circuit_breaker=circuit_breaker,
+    )(operation.__call__)
+
+    # the 2nd failure opens the circuit; the 3rd attempt is rejected
+    with pytest.raises(CircuitOpenError):
+        await wrapped()
+    assert operation.calls == 2
+    assert circuit_breaker.is_open
+
+    with pytest.raises(CircuitOpenError):
+        await wrapped()
+    assert operation.calls == 2
+
+    # after reset_timeout, a trial call goes through and closes the circuit
+    circuit_breaker._opened_at -= 60  # type: ignore[operator]
+    assert await wrapped() == "ok"
+    assert not circuit_breaker.is_open
+
+
+def _half_open_circuit_breaker() -> CircuitBreaker:
+    circuit_breaker: CircuitBreaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=60
+    )
+    circuit_breaker.record_failure()
+    circuit_breaker._opened_at -= 60  # type: ignore[operator]
+    return circuit_breaker
+
+
+@pytest.mark.asyncio_cooperative
+async def test_half_open_trial_raising_an_exception_not_retried_ends_the_trial() -> (
+    None
+):
+    circuit_breaker: CircuitBreaker = _half_open_circuit_breaker()
+
+    @async_retry(
+        exceptions=SQLAlchemyError, tries=3, delay=0, circuit_breaker=circuit_breaker
+    )
+    async def failing_operation() -> None:
+        raise ValueError("not a database error")
+
+    with pytest.raises(ValueError):
+        await failing_operation()
+
+    # the next call is a new trial, rather than rejected until restart
+    operation: FlakyOperation = FlakyOperation(failures=0)
+    wrapped = async_retry(
+        exceptions=SQLAlchemyError, tries=3, delay=0, circuit_breaker=circuit_breaker
+    )(operation.__call__)
+    assert await wrapped() == "ok"
+    assert not circuit_breaker.is_open
+
+
+@pytest.mark.asyncio_cooperative
+async def test_half_open_trial_cancelled_ends_the_trial() -> None:
+    circuit_breaker: CircuitBreaker = _half_open_circuit_breaker()
+    started: asyncio.Event = asyncio.Event()
+
+    @async_retry(
+        exceptions=SQLAlchemyError, tries=3, delay=0, circuit_breaker=circuit_breaker
+    )
+    async def hanging_operation() -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    task: asyncio.Task = asyncio.ensure_future(hanging_operation())
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    operation: FlakyOperation = FlakyOperation(failures=0)
+    wrapped = async_retry(
+        exceptions=SQLAlchemyError, tries=3, delay=0, circuit_breaker=circuit_breaker
+    )(operation.__call__)
+    assert await wrapped() == "ok"
+    assert not circuit_breaker.is_open
+
+
+@pytest.mark.asyncio_cooperative
+async def test_deterministic_errors_are_not_retried_nor_open_the_circuit() -> None:
+    circuit_breaker: CircuitBreaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=60
+    )
+    calls: list[int] = []
+
+    @async_retry(
+        exceptions=SQLAlchemyError,
+        tries=5,
+        delay=0,
+        circuit_breaker=circuit_breaker,
+        retry_if=is_transient_database_error,
+    )
+    async def duplicate_insert() -> None:
+        calls.append(1)
+        raise IntegrityError("INSERT", {}, Exception("duplicate key"))
+
+    with pytest.raises(IntegrityError):
+        await duplicate_insert()
+    with pytest.raises(IntegrityError):
+        await duplicate_insert()
+
+    # a retry_if miss is raised at once, and is not a failure of the database
+    assert len(calls) == 2
+    assert not circuit_breaker.is_open
+    assert RETRY_METRICS[duplicate_insert.__qualname__].failures == 2
@@ -0,0 +1,96 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import asyncpg
+import pytest
+from sqlalchemy.exc import (
+    DBAPIError,
+    IntegrityError,
+    OperationalError,
+    ProgrammingError,
+)
+
+from src.utils.asyncpg_fast_path import (
+    forget_prepared_statements,
+    is_transient_database_error,
+    prepare,
+    supports_fast_path,
+)
+
+"""
+High Level: a query is prepared once per connection, and prepared again after its
+connection's statements are forgotten. Only errors of a lost or refused connection
+are worth retrying.
+"""
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.prepare: AsyncMock = AsyncMock(side_effect=lambda query: object())
+
+
+@pytest.mark.asyncio_cooperative
+async def test_prepare_caches_per_connection() -> None:
+    connection: FakeConnection = FakeConnection()
+    other_connection: FakeConnection = FakeConnection()
+
+    statement = await prepare(connection, "SELECT 1")  # type: ignore[arg-type]
+    assert await prepare(connection, "SELECT 1") is statement  # type: ignore[arg-type]
+    assert await prepare(connection, "SELECT 2") is not statement  # type: ignore[arg-type]
+    assert connection.prepare.await_count == 2
+
+    await prepare(other_connection, "SELECT 1")  # type: ignore[arg-type]
+    assert other_connection.prepare.await_count == 1
+
+
+@pytest.mark.asyncio_cooperative
+async def test_forget_prepared_statements() -> None:
+    connection: FakeConnection = FakeConnection()
+    statement = await prepare(connection, "SELECT 1")  # type: ignore[arg-type]
+
+    forget_prepared_statements(connection)  # type: ignore[arg-type]
+
+    assert await prepare(connection, "SELECT 1") is not statement  # type: ignore[arg-type]
+    assert connection.prepare.await_count == 2
+
+
+def test_supports_fast_path() -> None:
+    engine: MagicMock = MagicMock()
+    engine.dialect.driver = "asyncpg"
+    assert supports_fast_path(engine)
+    engine.dialect.driver = "psycopg"
+    assert not supports_fast_path(engine)
+
+
+def _wrapped(driver_error: Exception) -> DBAPIError:
+    # as SQLAlchemy's asyncpg dialect raises them: the adapted DBAPI error is
+    # raised from asyncpg's own
+    adapted_error: Exception = Exception(str(driver_error))
+    adapted_error.__cause__ = driver_error
+    return DBAPIError("SELECT 1", {}, adapted_error)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        OperationalError("SELECT 1", {}, Exception("connection refused")),
+        DBAPIError("SELECT 1", {}, Exception("gone"), connection_invalidated=True),
+        _wrapped(asyncpg.AdminShutdownError("terminating connection")),
+        asyncpg.ConnectionDoesNotExistError("connection was closed"),
+        ConnectionResetError(),
+    ],
+)
+def test_connection_errors_are_transient(error: BaseException) -> None:
+    assert is_transient_database_error(error)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        IntegrityError("INSERT", {}, Exception("duplicate key")),
+        ProgrammingError("SELEC 1", {}, Exception("syntax error")),
+        _wrapped(asyncpg.UniqueViolationError("duplicate key")),
+        asyncpg.ForeignKeyViolationError("no such user"),
+    ],
+)
+def test_deterministic_errors_are_not_transient(error: BaseException) -> None:
+    assert not is_transient_database_error(error)
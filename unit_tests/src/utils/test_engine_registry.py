@@ -0,0 +1,26 @@
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.utils.engine_registry import get_async_engine
+
+DB_CONFIG: dict[str, Any] = {
+    "user": "test",
+    "password": "test",
+    "host": "localhost",
+    "port": 5432,
+    "database": "test_db",
+    "pool_size": 3,
+    "max_overflow": 2,
+}
+
+
+def test_same_dsn_shares_one_engine() -> None:
+    engine: AsyncEngine = get_async_engine(DB_CONFIG)
+    assert get_async_engine(dict(DB_CONFIG)) is engine
+    assert engine.pool.size() == 3  # type: ignore[attr-defined]
+
+
+def test_different_dsn_gets_its_own_engine() -> None:
+    other_config: dict[str, Any] = {**DB_CONFIG, "database": "other_test_db"}
+    assert get_async_engine(other_config) is not get_async_engine(DB_CONFIG)
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+import pytest
+from pydantic import BaseModel, PrivateAttr, ValidationError
+from sqlalchemy import Row, create_engine, text
+
+from src.models.extracted_search_results import ExtractedSearchResult
+from src.models.last_extracted_user_status import LastExtractedUserStatus
+from src.models.search_results import SearchResults
+from src.utils.model_hydration import RowHydrator
+
+"""
+High Level: trusted hydration must build the same models as validation, without
+validating; validation stays available for untrusted rows. Columns are matched to
+fields by name, whatever the order of the SELECT.
+"""
+
+SEARCH_ROW: dict = {
+    "search_id": "search_id",
+    "user_id": "user_id",
+    "search_term": "tesla",
+    "result": "<html></html>",
+    "created_at": datetime(2024, 5, 21),
+}
+
+
+def _select_row(query: str) -> Row:
+    # SQLAlchemy Rows, as the DAOs get them, from an in-memory database
+    with create_engine("sqlite://").connect() as connection:
+        row: Row | None = connection.execute(text(query)).fetchone()
+    assert row is not None
+    return row
+
+
+def test_trusted_hydration_matches_validation() -> None:
+    trusted: SearchResults = RowHydrator(SearchResults)(SEARCH_ROW)
+    validated: SearchResults = RowHydrator(SearchResults, validate_rows=True)(
+        SEARCH_ROW
+    )
+
+    assert trusted == validated
+    assert trusted.model_dump() == validated.model_dump()
+    assert trusted.model_fields_set == validated.model_fields_set
+
+
+def test_trusted_hydration_does_not_validate() -> None:
+    row: dict = {
+        "id": "id",
+        "user_id": "user_id",
+        "last_run": "not a datetime",
+        "last_search_id": None,
+    }
+
+    assert RowHydrator(LastExtractedUserStatus)(row).last_run == "not a datetime"
+    with pytest.raises(ValidationError):
+        RowHydrator(LastExtractedUserStatus, validate_rows=True)(row)
+
+
+def test_trusted_hydration_fields_set_is_per_instance() -> None:
+    hydrate: RowHydrator[SearchResults] = RowHydrator(SearchResults)
+    first: SearchResults = hydrate(SEARCH_ROW)
+    second: SearchResults = hydrate(SEARCH_ROW)
+
+    first.model_fields_set.discard("result")
+
+    assert "result" in second.model_fields_set
+
+
+def test_columns_are_matched_to_fields_by_name() -> None:
+    # the SELECT lists date before url, unlike ExtractedSearchResult
+    row: Row = _select_row(
+        "SELECT 'id' AS id, 'user_id' AS user_id, '3 days ago' AS date, "
+        "'www.tesla.com' AS url, 'Tesla body' AS body, "
+        "'2024-05-21 00:00:00' AS created_at"
+    )
+
+    for validate_rows in (False, True):
+        result: ExtractedSearchResult = RowHydrator(
+            ExtractedSearchResult, validate_rows
+        )(row)
+        assert (result.url, result.date) == ("www.tesla.com", "3 days ago")
+
+
+def test_columns_must_be_the_model_fields() -> None:
+    hydrate: RowHydrator[SearchResults] = RowHydrator(SearchResults)
+
+    with pytest.raises(ValueError):
+        hydrate({**SEARCH_ROW, "search_term_id": "term"})
+    with pytest.raises(ValueError):
+        hydrate(_select_row("SELECT 'search_id' AS search_id, 'user_id' AS user_id"))
+
+
+def test_private_attributes_get_their_defaults() -> None:
+    class WithPrivateAttribute(BaseModel):
+        value: int
+        _cache: dict = PrivateAttr(default_factory=dict)
+
+    model: WithPrivateAttribute = RowHydrator(WithPrivateAttribute)({"value": 1})
+
+    assert (model.value, model._cache) == (1, {})
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from src.utils.prometheus_metrics import MetricsRegistry, serve_metrics, write_textfile
+
+"""
+High Level: metrics render in the Prometheus text format, with cumulative histogram
+buckets, and are served over HTTP or written to a textfile.
+"""
+
+
+def test_render_counters_and_gauges() -> None:
+    registry: MetricsRegistry = MetricsRegistry()
+    registry.counter("rows_total", "Rows").labels().inc(3)
+    queue_depth = registry.gauge("queue_depth", "Depth", ("queue",))
+    queue_depth.labels("raw").set(2)
+    queue_depth.labels('say "hi"').set_function(lambda: 7)
+
+    assert registry.render() == (
+        "# HELP rows_total Rows\n"
+        "# TYPE rows_total counter\n"
+        "rows_total 3\n"
+        "# HELP queue_depth Depth\n"
+        "# TYPE queue_depth gauge\n"
+        'queue_depth{queue="raw"} 2\n'
+        'queue_depth{queue="say \\"hi\\""} 7\n'
+    )
+
+
+def test_render_cumulative_histogram() -> None:
+    registry: MetricsRegistry = MetricsRegistry()
+    histogram = registry.histogram("wait_seconds", "Wait", ("pool",), (0.1, 1.0))
+    for value in (0.05, 0.5, 2.0):
+        histogram.labels("main").observe(value)
+
+    assert registry.render().splitlines()[2:] == [
+        'wait_seconds_bucket{pool="main",le="0.1"} 1',
+        'wait_seconds_bucket{pool="main",le="1.0"} 2',
+        'wait_seconds_bucket{pool="main",le="+Inf"} 3',
+        'wait_seconds_sum{pool="main"} 2.55',
+        'wait_seconds_count{pool="main"} 3',
+    ]
+
+
+def test_unlabelled_metrics_are_exposed_before_any_update() -> None:
+    registry: MetricsRegistry = MetricsRegistry()
+    registry.histogram("wait_seconds", "Wait", buckets=(1.0,))
+
+    assert "wait_seconds_count 0" in registry.render()
+
+
+def test_misuse_is_rejected() -> None:
+    registry: MetricsRegistry = MetricsRegistry()
+    queue_depth = registry.gauge("queue_depth", "Depth", ("queue",))
+
+    with pytest.raises(ValueError):
+        registry.counter("queue_depth", "Again")
+    with pytest.raises(ValueError):
+        queue_depth.labels()
+
+
+def test_write_textfile() -> None:
+    registry: MetricsRegistry = MetricsRegistry()
+    registry.counter("rows_total", "Rows").inc()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path: str = os.path.join(directory, "etl.prom")
+        write_textfile(path, registry)
+        with open(path) as file:
+            assert file.read() == registry.render()
+        # nothing left behind by the atomic rename
+        assert os.listdir(directory) == ["etl.prom"]
+
+
+@pytest.mark.asyncio_cooperative
+async def test_serve_metrics() -> None:
+    registry: MetricsRegistry = MetricsRegistry()
+    registry.counter("rows_total", "Rows").inc(5)
+    server: asyncio.Server = await serve_metrics("127.0.0.1", 0, registry)
+    port: int = server.sockets[0].getsockname()[1]
+    try:
+        responses: list[bytes] = []
+        for path in ("/metrics", "/missing"):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            responses.append(await reader.read())
+            writer.close()
+    finally:
+        server.close()
+
+    assert responses[0].startswith(b"HTTP/1.1 200 OK\r\n")
+    assert responses[0].endswith(b"\r\n\r\n" + registry.render().encode())
+    assert responses[1].startswith(b"HTTP/1.1 404 Not Found\r\n")
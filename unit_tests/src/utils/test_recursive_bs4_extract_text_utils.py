@@ -0,0 +1,39 @@
+import sys
+
+from src.models.extracted_text import ExtractedText
+from src.utils.recursive_bs4_extract_text_utils import _bs4_recursive_extract_text
+
+
+def test_extract_text_keeps_document_order_and_parent_tags() -> None:
+    html: str = (
+        "<div>intro<ol>"
+        "<li><a>www.tesla.com</a> Tesla body</li>"
+        "<li><span>May 5, 2024</span></li>"
+        "</ol>outro</div>"
+    )
+
+    extracted_texts: list[ExtractedText] = _bs4_recursive_extract_text(html)
+
+    assert extracted_texts == [
+        ExtractedText(parent_tags=("div", "str"), text="intro"),
+        ExtractedText(
+            parent_tags=("div", "ol", "0_li", "a", "str"), text="www.tesla.com"
+        ),
+        ExtractedText(parent_tags=("div", "ol", "0_li", "str"), text="Tesla body"),
+        ExtractedText(
+            parent_tags=("div", "ol", "1_li", "span", "str"), text="May 5, 2024"
+        ),
+        ExtractedText(parent_tags=("div", "str"), text="outro"),
+    ]
+    # texts directly inside the same element share one parent_tags tuple
+    assert extracted_texts[0].parent_tags is extracted_texts[4].parent_tags
+
+
+def test_extract_text_handles_nesting_deeper_than_the_recursion_limit() -> None:
+    depth: int = sys.getrecursionlimit() + 100
+    html: str = "<div>" * depth + "deep text" + "</div>" * depth
+
+    extracted_texts: list[ExtractedText] = _bs4_recursive_extract_text(html)
+
+    assert [extracted_text.text for extracted_text in extracted_texts] == ["deep text"]
+    assert len(extracted_texts[0].parent_tags) == depth + 1
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+from typing import Any
+
+from src.utils.run_metrics import Histogram, RunMetrics, write_run_report
+
+"""
+High Level: stage timers accumulate, histograms bucket by upper bound, and a
+finished run is reported as JSON.
+"""
+
+
+def test_histogram_buckets_by_upper_bound() -> None:
+    histogram: Histogram = Histogram(buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.bucket_counts == [2, 1, 1]
+    assert histogram.count == 4
+    assert histogram.max_value == 2.0
+
+
+def test_histogram_quantile_is_a_bucket_bound() -> None:
+    histogram: Histogram = Histogram(buckets=(0.1, 1.0))
+    for _ in range(98):
+        histogram.observe(0.01)
+    histogram.observe(0.5)
+    histogram.observe(3.0)
+
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.99) == 1.0
+    assert histogram.quantile(1.0) == 3.0
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_time_stage_accumulates() -> None:
+    run_metrics: RunMetrics = RunMetrics()
+
+    with run_metrics.time_stage("stage_two"):
+        pass
+    first: float = run_metrics.stage_seconds["stage_two"]
+    with run_metrics.time_stage("stage_two"):
+        pass
+
+    assert run_metrics.stage_seconds["stage_two"] >= first
+
+
+def test_write_run_report() -> None:
+    run_metrics: RunMetrics = RunMetrics()
+    run_metrics.increment("documents", 2)
+    run_metrics.increment("documents")
+    run_metrics.observe("extract_seconds", 0.002)
+    run_metrics.finish("succeeded")
+
+    with tempfile.TemporaryDirectory() as report_dir:
+        path: str = write_run_report(run_metrics, os.path.join(report_dir, "reports"))
+        with open(path) as file:
+            report: dict[str, Any] = json.load(file)
+
+    assert os.path.basename(path) == f"etl_run_{run_metrics.run_id}.json"
+    assert report["status"] == "succeeded"
+    assert report["counters"]["documents"] == 3
+    assert {"database_retries", "database_failures"} <= set(report["counters"])
+    assert report["histograms"]["extract_seconds"]["count"] == 1
+    assert report["histograms"]["extract_seconds"]["p50"] == 0.005
+    assert report["seconds"] == run_metrics.seconds
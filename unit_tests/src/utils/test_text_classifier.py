@@ -0,0 +1,35 @@
+import pytest
+
+from src.models.text_classification_enum import TextClassification
+from src.utils.text_classifier import classify_text, classify_texts
+
+
+@pytest.mark.parametrize(
+    "text,classification",
+    [
+        ("May 5, 2024", TextClassification.date),
+        ("www.tesla.com", TextClassification.url),
+        ("Tesla › investors", TextClassification.url),
+        ("Tesla reported revenue of $21B", TextClassification.body),
+        ("Tesla reported revenue.", TextClassification.body),
+        ("", TextClassification.body),
+        # the date wins, wherever it is relative to the url
+        ("May 5, 2024 · tesla.com", TextClassification.date),
+        ("tesla.com · May 5, 2024", TextClassification.date),
+        # a date starting inside the leftmost url match
+        ("x.Jan 5, 2024", TextClassification.date),
+        # digits without a date, dots without a url
+        ("tesla.com 2024", TextClassification.url),
+        ("Q1 2024. Revenue 21", TextClassification.body),
+    ],
+)
+def test_classify_text(text: str, classification: TextClassification) -> None:
+    assert classify_text(text) == classification
+
+
+def test_classify_texts_keeps_order() -> None:
+    assert classify_texts(["www.tesla.com", "body", "Jan 1, 2023"]) == [
+        TextClassification.url,
+        TextClassification.body,
+        TextClassification.date,
+    ]
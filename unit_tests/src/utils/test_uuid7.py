@@ -0,0 +1,71 @@
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from src.utils import uuid7 as uuid7_module
+from src.utils.uuid7 import uuid7, uuid7_batch
+
+"""
+High Level: ids are valid UUIDv7s, strictly increasing within the process, even
+within one millisecond or when the clock goes backwards.
+"""
+
+# 2100-01-01, in nanoseconds
+FIXED_TIME_NS: int = 4_102_444_800 * 10**9
+
+
+@contextmanager
+def fixed_clock(time_ns: int) -> Iterator[None]:
+    """
+    Mints from a fresh generator state, restored on exit, so that ids minted by
+    other tests are not affected by the fixed clock
+    """
+    with patch.object(uuid7_module, "_last_timestamp_ms", -1), patch.object(
+        uuid7_module, "_last_counter", 0
+    ), patch.object(uuid7_module.time, "time_ns", return_value=time_ns):
+        yield
+
+
+def test_uuid7_is_a_version_7_uuid() -> None:
+    parsed: uuid.UUID = uuid.UUID(uuid7())
+
+    assert parsed.version == 7
+    assert parsed.variant == uuid.RFC_4122
+
+
+def test_uuid7_batch_is_increasing_across_batches() -> None:
+    ids: list[str] = uuid7_batch(1000) + [uuid7()] + uuid7_batch(10)
+
+    assert len(ids) == 1011
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_uuid7_batch_shares_the_clock_reading() -> None:
+    with fixed_clock(FIXED_TIME_NS):
+        ids: list[str] = uuid7_batch(5)
+
+    assert {identifier[:13] for identifier in ids} == {"03bb2cc3-d800"}
+
+
+def test_uuid7_is_monotonic_when_the_clock_goes_backwards() -> None:
+    with fixed_clock(FIXED_TIME_NS):
+        newer: str = uuid7()
+        with patch.object(uuid7_module.time, "time_ns", return_value=0):
+            older_clock: str = uuid7()
+
+    assert older_clock > newer
+
+
+def test_uuid7_counter_overflow_moves_the_timestamp_forward() -> None:
+    with fixed_clock(FIXED_TIME_NS), patch.object(
+        uuid7_module, "_random_counter", return_value=uuid7_module._MAX_COUNTER
+    ):
+        ids: list[str] = uuid7_batch(2)
+
+    assert ids[0] < ids[1]
+    assert [int(identifier.replace("-", "")[:12], 16) for identifier in ids] == [
+        FIXED_TIME_NS // 1_000_000,
+        FIXED_TIME_NS // 1_000_000 + 1,
+    ]